@@ -0,0 +1,57 @@
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+
+from accounts.tokens import ROLE_CLAIM, ClaimsUser, current_version, is_current
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that rejects revoked tokens (see accounts.tokens).
+
+    Read requests to views that set `token_user_reads = True` get a
+    ClaimsUser built from the token, so they authorize without querying
+    the User row. Writes and every other view get the full User.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.user_for_token(validated_token, claims_only=self.claims_suffice(request, validated_token)), validated_token
+
+    def claims_suffice(self, request, validated_token):
+        view = getattr(request, 'parser_context', None) and request.parser_context.get('view')
+        return (request.method in SAFE_METHODS and getattr(view, 'token_user_reads', False)
+                and ROLE_CLAIM in validated_token)
+
+    def user_for_token(self, validated_token, claims_only=False):
+        if claims_only:
+            user = ClaimsUser(validated_token)
+            version = current_version(user.id)
+        else:
+            user = self.get_user(validated_token)
+            version = user.token_version
+        if not is_current(validated_token, version):
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        return user
+
+
+def request_token(request):
+    """
+    The request's validated JWT, or None. For middleware, which runs before
+    DRF authenticates the request; revocation is not checked here.
+    """
+    auth = VersionedJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return auth.get_validated_token(raw_token)
+    except (AuthenticationFailed, TokenError):
+        return None
@@ -0,0 +1,44 @@
+from djoser import email
+from notifications.outbound import queue_email
+
+
+class QueuedEmailMixin:
+    """
+    Render Djoser emails in the request (tokens and links need it) but hand
+    the SMTP delivery to the outbound queue (see `send_emails`) instead of
+    sending inline.
+    """
+
+    def send(self, to, fail_silently=False, **kwargs):
+        self.render()
+        queue_email(
+            subject=self.subject,
+            body=self.body,
+            html=self.html,
+            to=list(to),
+            from_email=kwargs.get('from_email'),
+        )
+
+
+class ActivationEmail(QueuedEmailMixin, email.ActivationEmail):
+    pass
+
+
+class ConfirmationEmail(QueuedEmailMixin, email.ConfirmationEmail):
+    pass
+
+
+class PasswordResetEmail(QueuedEmailMixin, email.PasswordResetEmail):
+    pass
+
+
+class PasswordChangedConfirmationEmail(QueuedEmailMixin, email.PasswordChangedConfirmationEmail):
+    pass
+
+
+class UsernameChangedConfirmationEmail(QueuedEmailMixin, email.UsernameChangedConfirmationEmail):
+    pass
+
+
+class UsernameResetEmail(QueuedEmailMixin, email.UsernameResetEmail):
+    pass
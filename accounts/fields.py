@@ -0,0 +1,88 @@
+"""
+A Cloudinary model field that imports the SDK on first use.
+
+`cloudinary` pulls in urllib3, certifi and its API client (about 30 ms), which
+every cold start paid for in settings.py and accounts.models even though most
+requests never touch an image. `CloudinaryField` here is only a stand-in: it
+stores a CharField column and hands every value conversion to a
+`cloudinary.models.CloudinaryField` built from the same arguments the first
+time a value is read, written or edited, after configuring the SDK from
+settings.CLOUDINARY. All behaviour comes from the upstream field, and it
+deconstructs to that path, so migrations are unchanged.
+"""
+import inspect
+from functools import cache
+
+from django.conf import settings
+from django.db import models
+from django.utils.functional import cached_property
+
+_FIELD_KWARGS = set(inspect.signature(models.Field.__init__).parameters)
+
+
+@cache
+def cloudinary_sdk():
+    """The configured `cloudinary` module."""
+    import cloudinary
+
+    cloudinary.config(**settings.CLOUDINARY)
+    return cloudinary
+
+
+class CloudinaryField(models.Field):
+    description = "A resource stored in Cloudinary"
+
+    def __init__(self, *args, **kwargs):
+        self._upstream_args = (args, dict(kwargs))
+        # Cloudinary's own options (type, resource_type, upload options) are for the upstream field only
+        kwargs = {key: value for key, value in kwargs.items() if key in _FIELD_KWARGS}
+        kwargs['max_length'] = 255
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def upstream(self):
+        cloudinary_sdk()
+        from cloudinary.models import CloudinaryField as UpstreamField
+
+        args, kwargs = self._upstream_args
+        field = UpstreamField(*args, **kwargs)
+        field.set_attributes_from_name(self.name)
+        field.model = self.model
+        return field
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'cloudinary.models.CloudinaryField', args, kwargs
+
+    def get_internal_type(self):
+        return 'CharField'
+
+    # None and stored strings (most users have no picture) are passed through as
+    # upstream would, without loading the SDK
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return self.upstream.from_db_value(value, expression, connection)
+
+    def to_python(self, value):
+        return self.upstream.to_python(value)
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if not value or isinstance(value, str):
+            return value
+        return self.upstream.pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if value and isinstance(value, str):
+            return value
+        if not value:
+            return self.get_default()
+        return self.upstream.get_prep_value(value)
+
+    def value_to_string(self, obj):
+        return self.upstream.value_to_string(obj)
+
+    def formfield(self, **kwargs):
+        return self.upstream.formfield(**kwargs)
@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from accounts.tokens import UserAccessToken
+
+EMAIL = 'bench-auth@example.invalid'
+PATH = '/api/v1/jobs/'
+
+
+class Command(BaseCommand):
+    help = ("Requests per second on authenticated GET /jobs/ with a plain token (User row loaded per request) "
+            "versus a token with role/version claims (no user query), then check that revocation still works.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email=EMAIL).exists():
+            raise CommandError(f"{EMAIL} already exists; remove the leftovers of an interrupted run first.")
+        user = User.objects.create(email=EMAIL, role=User.Job_Seeker, password=make_password(None), is_active=True)
+        client = Client(HTTP_HOST='127.0.0.1')
+        try:
+            plain = self.measure(client, AccessToken.for_user(user), options['requests'], "user lookup")
+            claims = self.measure(client, UserAccessToken.for_user(user), options['requests'], "token claims")
+            self.stdout.write(f"Speed-up: {claims / plain:.2f}x")
+            self.check_revocation(client, user)
+        finally:
+            user.delete()
+
+    def measure(self, client, token, requests, label):
+        headers = {'Authorization': f'JWT {token}'}
+        # Warm up caches (token version, query plans) before timing
+        for _ in range(20):
+            self.get(client, headers)
+        # execute_wrapper rather than CaptureQueriesContext: each request resets connection.queries
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            self.get(client, headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            self.get(client, headers)
+        rate = requests / (time.perf_counter() - start)
+        user_queries = sum('"accounts_user"' in sql for sql in queries)
+        self.stdout.write(f"{label:>12}: {rate:8.0f} req/s, {len(queries)} queries per request "
+                          f"({user_queries} on accounts_user)")
+        return rate
+
+    def get(self, client, headers, expected=200):
+        response = client.get(PATH, headers=headers)
+        if response.status_code != expected:
+            raise CommandError(f"GET {PATH} returned {response.status_code}, expected {expected}.")
+        return response
+
+    def check_revocation(self, client, user):
+        headers = {'Authorization': f'JWT {UserAccessToken.for_user(user)}'}
+        self.get(client, headers)
+        user.set_password('benchmark-new-password')
+        user.save()
+        self.get(client, headers, expected=401)
+        self.get(client, {'Authorization': f'JWT {UserAccessToken.for_user(user)}'})
+        self.stdout.write(self.style.SUCCESS("Password change revoked the old token; a new token works."))
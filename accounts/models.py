@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from accounts.managers import CustomUserManager
-from cloudinary.models import CloudinaryField
+from accounts.fields import CloudinaryField
 
 # Create your models here.
 
@@ -33,11 +33,29 @@ class User(AbstractUser):
     portfolio_website = models.URLField(blank=True, null=True)
     is_verified = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
+    # Embedded in JWTs; bumping it revokes every token issued before (see accounts.tokens)
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+    CREDENTIAL_FIELDS = ('password', 'role', 'is_active')
+    # Counted on the admin dashboard (dashboard.counters)
+    DASHBOARD_FIELDS = ('role',)
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the issued tokens were based on, so a change can revoke them
+        instance._loaded_credentials = tuple(instance.__dict__.get(field) for field in cls.CREDENTIAL_FIELDS)
+        instance._loaded_dashboard = tuple(instance.__dict__.get(field) for field in cls.DASHBOARD_FIELDS)
+        return instance
+
     def __str__(self):
         return self.email
\ No newline at end of file
@@ -1,5 +1,8 @@
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 from djoser.serializers import UserSerializer as BaseUserSerializer
+from rest_framework import serializers
+from accounts.models import User
+from reviews.serializers import RatingSummarySerializer
 
 class UserCreateSerializer(BaseUserCreateSerializer):
     class Meta(BaseUserCreateSerializer.Meta):
@@ -11,4 +14,16 @@ class UserSerializer(BaseUserSerializer):
         ref_name = "CustomUser"
         fields = ('id', 'email', 'first_name', 'last_name', 'address', 'phone_number')
         model = BaseUserSerializer.Meta.model
-        read_only_fields = ('email',)
\ No newline at end of file
+        read_only_fields = ('email',)
+
+class EmployerProfileSerializer(serializers.ModelSerializer):
+    rating_summary = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'first_name', 'last_name', 'bio', 'location', 'linkedin_profile',
+                  'portfolio_website', 'is_verified', 'rating_summary')
+        read_only_fields = fields
+
+    def get_rating_summary(self, obj):
+        return RatingSummarySerializer.for_instance(obj)
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_migrate, post_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.contrib.auth.models import Group
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from tasks.queue import enqueue
+from accounts.tokens import forget_version
 
 User = get_user_model()
 
@@ -17,15 +21,28 @@ def create_default_groups(sender, **kwargs):
 
 @receiver(post_save, sender=User)
 def assign_user_group(sender, instance, created, **kwargs):
-    if created:
-        group_name = None
-        if instance.role == "admin":
-            group_name = "Admin"
-        elif instance.role == "employer":
-            group_name = "Employer"
-        elif instance.role == "seeker":
-            group_name = "Job Seeker"
-
-        if group_name:
-            group = Group.objects.get(name=group_name)
-            instance.groups.add(group)
+    # Group membership isn't used for API permissions, so it is applied by the task worker
+    if created and instance.role:
+        enqueue('accounts.assign_user_group', user_id=instance.pk, role=instance.role)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_credential_change(sender, instance, created, update_fields=None, **kwargs):
+    # A new password, role or deactivation invalidates every token issued so far
+    current = tuple(getattr(instance, field) for field in User.CREDENTIAL_FIELDS)
+    loaded = getattr(instance, '_loaded_credentials', None)
+    if created or loaded is None:
+        # No tokens yet (or nothing to compare with); later saves of this instance compare against now
+        instance._loaded_credentials = current
+        return
+    if current == loaded:
+        return
+    User.objects.filter(pk=instance.pk).update(token_version=F('token_version') + 1)
+    instance.token_version += 1
+    instance._loaded_credentials = current
+    transaction.on_commit(lambda: forget_version(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user_version(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_version(instance.pk))
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from tasks.queue import task
+
+User = get_user_model()
+
+ROLE_GROUPS = {
+    'admin': 'Admin',
+    'employer': 'Employer',
+    'seeker': 'Job Seeker',
+}
+
+
+@task('accounts.assign_user_group', batch=True)
+def assign_user_group(payloads):
+    groups = dict(Group.objects.filter(name__in=ROLE_GROUPS.values()).values_list('name', 'id'))
+    memberships = [
+        User.groups.through(user_id=payload['user_id'], group_id=groups[ROLE_GROUPS[payload['role']]])
+        for payload in payloads
+        if ROLE_GROUPS.get(payload['role']) in groups
+    ]
+    User.groups.through.objects.bulk_create(memberships, ignore_conflicts=True)
@@ -1,3 +1,76 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.tokens import UserAccessToken, _version_key, current_version
 
 # Create your tests here.
+
+
+class TokenAuthenticationTests(TestCase):
+    read_path = '/api/v1/notifications/'  # token_user_reads
+    write_path = '/api/v1/notifications/mark-read/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'JWT {UserAccessToken.for_user(user)}')
+        return client
+
+    def user_queries(self, queries):
+        return [query['sql'] for query in queries if 'FROM "accounts_user"' in query['sql']]
+
+    def test_reads_are_authorized_from_claims(self):
+        client = self.client_for(self.user)
+        current_version(self.user.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.read_path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_queries(queries), [])
+
+    def test_writes_load_the_user(self):
+        client = self.client_for(self.user)
+        current_version(self.user.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(self.write_path, {'all': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.user_queries(queries)), 1)
+
+    def test_credential_changes_revoke_tokens(self):
+        changes = {
+            'password': lambda user: user.set_password('changed'),
+            'role': lambda user: setattr(user, 'role', User.Employer),
+            'deactivation': lambda user: setattr(user, 'is_active', False),
+        }
+        for name, change in changes.items():
+            with self.subTest(name):
+                user = User.objects.create_user(email=f'{name}@example.com', password='x', role=User.Job_Seeker)
+                client = self.client_for(user)
+                # The version is cached by the first request
+                self.assertEqual(client.get(self.read_path).status_code, 200)
+                self.assertIsNotNone(cache.get(_version_key(user.id)))
+
+                user = User.objects.get(pk=user.pk)
+                change(user)
+                with self.captureOnCommitCallbacks(execute=True):
+                    user.save()
+                self.assertEqual(User.objects.get(pk=user.pk).token_version, 1)
+                self.assertEqual(client.get(self.read_path).status_code, 401)
+                self.assertEqual(client.post(self.write_path, {'all': True}, format='json').status_code, 401)
+                if user.is_active:
+                    self.assertEqual(self.client_for(user).get(self.read_path).status_code, 200)
+
+    def test_other_saves_keep_tokens(self):
+        client = self.client_for(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Ada'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).token_version, 0)
+        self.assertEqual(client.get(self.read_path).status_code, 200)
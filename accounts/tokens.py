@@ -0,0 +1,113 @@
+"""
+JWT claims and revocation.
+
+Tokens carry the user's `role` and `ver` (User.token_version) next to the
+user id, so read endpoints can authorize from the token alone (see
+accounts.authentication). A password, role or active-flag change bumps
+token_version (accounts.signals), which revokes every token issued before.
+The current version is cached per user: checking it is a cache read, and
+at most one query per user every AUTH_VERSION_CACHE_TTL seconds.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+from accounts.models import User
+
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+# Cached for deleted or deactivated users; never matches a token
+REVOKED = -1
+
+
+def _version_key(user_id):
+    return f'auth:ver:{user_id}'
+
+
+def add_user_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def current_version(user_id):
+    """The user's token_version, or REVOKED if the user is gone or inactive."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (User.objects.filter(pk=user_id, is_active=True)
+                   .values_list('token_version', flat=True).first())
+        version = REVOKED if version is None else version
+        cache.set(key, version, timeout=getattr(settings, 'AUTH_VERSION_CACHE_TTL', 300))
+    return version
+
+
+def forget_version(user_id):
+    cache.delete(_version_key(user_id))
+
+
+def is_current(token, version=None):
+    """Whether `token` was issued for the user's current token_version. Tokens without the claim count as version 0."""
+    if version is None:
+        version = current_version(token[api_settings.USER_ID_CLAIM])
+    return token.get(VERSION_CLAIM, 0) == version
+
+
+class UserRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class UserAccessToken(AccessToken):
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class StreamTicket(Token):
+    """
+    Short-lived credential for the event stream only. Browsers' EventSource
+    cannot send headers, so it goes in the URL, where proxies and access logs
+    keep it. Its token type keeps the API from accepting it.
+    """
+    token_type = 'stream'
+    lifetime = timedelta(seconds=settings.SSE_TICKET_SECONDS)
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    # Access tokens minted from the refresh token copy its role and version claims
+    token_class = UserRefreshToken
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    def validate(self, attrs):
+        if not is_current(self.token_class(attrs['refresh'])):
+            raise InvalidToken("Token has been revoked.")
+        return super().validate(attrs)
+
+
+class ClaimsUser(TokenUser):
+    """request.user built from token claims (id, role) without loading the User row."""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
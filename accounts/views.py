@@ -1,3 +1,26 @@
-from django.shortcuts import render
+from rest_framework.viewsets import ReadOnlyModelViewSet
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from accounts.models import User
+from accounts.serializers import EmployerProfileSerializer
+from jobs.paginations import DefaultPagination
+from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
+
+class EmployerViewSet(ReadOnlyModelViewSet):
+    """
+    Public employer profiles with their precomputed rating summary.
+    """
+    queryset = User.objects.filter(role=User.Employer).select_related('rating_summary').order_by('id')
+    serializer_class = EmployerProfileSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = DefaultPagination
+    token_user_reads = True
+
+    @swagger_auto_schema(operation_summary="List employers with rating summaries")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(operation_summary="Retrieve employer profile with rating summary")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.test import Client
+
+from api.pooling import counters
+
+# mode -> settings applied to every database for the run (None: as configured)
+MODES = {
+    'fresh': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'pool': False},
+    'persistent': {'CONN_MAX_AGE': None, 'CONN_HEALTH_CHECKS': True, 'pool': False},
+    'configured': None,
+}
+
+
+class Command(BaseCommand):
+    help = ("Measure per-request connection overhead: serve the same request with a new connection each "
+            "time (fresh), with a reused, health-checked connection (persistent), and with the configured "
+            "settings (e.g. the psycopg pool). Connections are opened and closed as the WSGI handler does.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per mode.")
+        parser.add_argument('--path', default='/api/v1/job-categories/', help="A cheap GET endpoint.")
+        parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated, from {', '.join(MODES)}.")
+
+    def handle(self, *args, **options):
+        modes = [mode for mode in options['modes'].split(',') if mode]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}.")
+
+        database = connections[DEFAULT_DB_ALIAS]
+        self.stdout.write(f"{options['requests']} requests per mode to GET {options['path']} "
+                          f"({database.vendor}, {database.settings_dict.get('HOST') or database.settings_dict['NAME']})")
+        self.stdout.write(f"{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'connects/req':>13} {'connect ms':>11}")
+        results = {}
+        for mode in modes:
+            results[mode] = self.run(mode, options['path'], options['requests'])
+            p50, p95, per_request, connect_ms = results[mode]
+            self.stdout.write(f"{mode:<12} {p50:>8.2f} {p95:>8.2f} {per_request:>13.2f} {connect_ms:>11.2f}")
+
+        if 'fresh' in results and len(results) > 1:
+            for mode, (p50, *_rest) in results.items():
+                if mode != 'fresh':
+                    self.stdout.write(f"Reusing connections ({mode}) saves {results['fresh'][0] - p50:.2f} ms "
+                                      f"at p50 per request.")
+
+    def run(self, mode, path, count):
+        overrides = MODES[mode]
+        saved = {alias: dict(connections.settings[alias]) for alias in connections}
+        connections.close_all()
+        try:
+            if overrides is not None:
+                for alias in connections:
+                    settings_dict = connections.settings[alias]
+                    settings_dict['CONN_MAX_AGE'] = overrides['CONN_MAX_AGE']
+                    settings_dict['CONN_HEALTH_CHECKS'] = overrides['CONN_HEALTH_CHECKS']
+                    settings_dict['OPTIONS'] = {key: value for key, value in settings_dict['OPTIONS'].items()
+                                                if key != 'pool'}
+            return self.measure(path, count)
+        finally:
+            connections.close_all()
+            for alias, settings_dict in saved.items():
+                connections.settings[alias].clear()
+                connections.settings[alias].update(settings_dict)
+
+    def measure(self, path, count):
+        client = Client(HTTP_HOST='127.0.0.1')
+        # Warm up imports, URL resolution and caches so only connection handling differs
+        for _ in range(3):
+            self.request(client, path)
+        counters.reset()
+        durations = []
+        for _ in range(count):
+            started = time.perf_counter()
+            self.request(client, path)
+            durations.append(time.perf_counter() - started)
+        _, opened = counters.snapshot()
+        connects, seconds, _ = opened.get(DEFAULT_DB_ALIAS, (0, 0.0, 0.0))
+        durations.sort()
+        return (
+            statistics.median(durations) * 1000,
+            durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+            connects / count,
+            seconds / connects * 1000 if connects else 0.0,
+        )
+
+    def request(self, client, path):
+        # The test client doesn't run close_old_connections around requests; the WSGI handler does
+        close_old_connections()
+        try:
+            response = client.get(path)
+        finally:
+            close_old_connections()
+        if response.status_code >= 400:
+            raise CommandError(f"GET {path} returned {response.status_code}.")
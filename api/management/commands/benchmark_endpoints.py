@@ -0,0 +1,421 @@
+import gc
+import json
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib import request as urllib_request
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+import api.urls
+from accounts.models import User
+from accounts.tokens import UserAccessToken, UserRefreshToken
+from applications.models import Application, ApplicationExport
+from jobs.models import Job, JobCategory, SavedSearch
+from payments.models import FeaturedCheckout
+from reviews.models import EmployerReview
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'endpoints.json'
+LOAD_DATA_DOMAIN = 'load.example'
+
+# (name, url name, method, role, query string or request body)
+SCENARIOS = [
+    ('api-root', 'api-root', 'get', 'anonymous', ''),
+    ('jobs.list', 'jobs-list', 'get', 'anonymous', ''),
+    ('jobs.list.seeker', 'jobs-list', 'get', 'seeker', ''),
+    ('jobs.list.search', 'jobs-list', 'get', 'seeker', 'search=engineer&ordering=-created_at'),
+    ('jobs.list.category', 'jobs-list', 'get', 'seeker', 'category_id={category}&salary__gt=30000'),
+    ('jobs.detail', 'jobs-detail', 'get', 'seeker', ''),
+    ('jobs.create', 'jobs-list', 'post', 'employer', {
+        'employer': '{employer}', 'title': 'Benchmark engineer', 'company_name': 'Benchmark', 'description': 'Benchmark listing.',
+        'category_id': '{category}', 'salary': '50000.00',
+    }),
+    ('job-categories.list', 'job-categories-list', 'get', 'seeker', ''),
+    ('job-categories.detail', 'job-categories-detail', 'get', 'seeker', ''),
+    ('saved-searches.list', 'saved-searches-list', 'get', 'seeker', ''),
+    ('saved-searches.detail', 'saved-searches-detail', 'get', 'seeker', ''),
+    ('dashboard.admin', 'dashboard-list', 'get', 'admin', ''),
+    ('dashboard.employer', 'dashboard-list', 'get', 'employer', ''),
+    ('dashboard.seeker', 'dashboard-list', 'get', 'seeker', ''),
+    ('dashboard.stats', 'dashboard-stats', 'get', 'admin', 'days=30'),
+    ('dashboard.timeseries.admin', 'dashboard-timeseries', 'get', 'admin', 'interval=week&days=90'),
+    ('dashboard.timeseries.employer', 'dashboard-timeseries', 'get', 'employer', 'interval=day&days=30'),
+    ('dashboard.funnel.admin', 'dashboard-funnel', 'get', 'admin', 'days=90&group_by=category'),
+    ('dashboard.funnel.employer', 'dashboard-funnel', 'get', 'employer', 'days=90&group_by=job'),
+    ('dashboard.cache-stats', 'dashboard-cache-stats', 'get', 'admin', ''),
+    ('employers.list', 'employers-list', 'get', 'anonymous', ''),
+    ('employers.detail', 'employers-detail', 'get', 'anonymous', ''),
+    ('employer-reviews.list', 'employer-reviews-list', 'get', 'anonymous', ''),
+    ('employer-reviews.detail', 'employer-reviews-detail', 'get', 'anonymous', ''),
+    ('applicants.search', 'applicants-list', 'get', 'employer', 'q=python django'),
+    ('application-exports.list', 'application-exports-list', 'get', 'employer', ''),
+    ('application-exports.detail', 'application-exports-detail', 'get', 'employer', ''),
+    ('notifications.list', 'notifications-list', 'get', 'seeker', ''),
+    ('notifications.unread-count', 'notifications-unread-count', 'get', 'seeker', ''),
+    ('notifications.mark-read', 'notifications-mark-read', 'post', 'seeker', {'all': True}),
+    ('featured-checkouts.list', 'featured-checkouts-list', 'get', 'employer', ''),
+    ('featured-checkouts.detail', 'featured-checkouts-detail', 'get', 'employer', ''),
+    ('job-reviews.list', 'job-reviews-list', 'get', 'seeker', ''),
+    ('job-reviews.detail', 'job-reviews-detail', 'get', 'seeker', ''),
+    ('job-reviews.create', 'job-reviews-list', 'post', 'reviewer', {'rating': 4, 'comment': 'Benchmark review.'}),
+    ('job-applications.list', 'job-applications-list', 'get', 'employer', ''),
+    ('job-applications.detail', 'job-applications-detail', 'get', 'employer', ''),
+    ('job-applications.withdraw', 'job-applications-withdraw', 'post', 'seeker', {}),
+    ('users.me', 'user-me', 'get', 'seeker', ''),
+    ('users.list', 'user-list', 'get', 'seeker', ''),
+    ('users.detail', 'user-detail', 'get', 'seeker', ''),
+    ('jwt.create', 'jwt-create', 'post', 'anonymous', {'email': '{seeker_email}', 'password': '{password}'}),
+    ('jwt.refresh', 'jwt-refresh', 'post', 'anonymous', {'refresh': '{refresh}'}),
+    ('jwt.verify', 'jwt-verify', 'post', 'anonymous', {'token': '{access}'}),
+]
+
+# URL keyword argument -> fixture, per url name
+PATH_ARGS = {
+    'jobs-detail': {'pk': 'job'},
+    'job-categories-detail': {'pk': 'category'},
+    'saved-searches-detail': {'pk': 'saved_search'},
+    'employers-detail': {'pk': 'employer'},
+    'employer-reviews-list': {'employer_pk': 'employer'},
+    'employer-reviews-detail': {'employer_pk': 'employer', 'pk': 'review'},
+    'application-exports-detail': {'pk': 'export'},
+    'featured-checkouts-detail': {'pk': 'checkout'},
+    'job-reviews-list': {'job_pk': 'job'},
+    'job-reviews-detail': {'job_pk': 'job', 'pk': 'review'},
+    'job-applications-list': {'job_pk': 'job'},
+    'job-applications-detail': {'job_pk': 'job', 'pk': 'application'},
+    'job-applications-withdraw': {'job_pk': 'job', 'pk': 'application'},
+    'user-detail': {'id': 'seeker'},
+}
+
+# Routes measured by their own load tests, or that can't be replayed safely
+NOT_COVERED = {
+    'event-stream': "long-lived SSE stream; see loadtest_events",
+    'payment-webhook': "signed gateway events; see loadtest_payment_webhooks",
+    'job-applications-resumes-zip': "streams stored resume files",
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def read_body(response):
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+def iter_routes(patterns, prefix=''):
+    """(url name, HTTP methods) for every route, without the format-suffix duplicates."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif 'format' not in pattern.pattern.regex.groupindex:
+            callback = pattern.callback
+            if getattr(callback, 'actions', None):
+                methods = callback.actions
+            else:
+                view_class = getattr(callback, 'view_class', None) or getattr(callback, 'cls', None)
+                methods = [m for m in ('get', 'post', 'put', 'patch', 'delete') if hasattr(view_class, m)] or ['get']
+            yield pattern.name, [m for m in methods if m not in ('head', 'options')]
+
+
+class Command(BaseCommand):
+    help = ("Drive the routes in api/urls.py as each role, record latency percentiles, queries and bytes per "
+            "response, and compare them with a JSON baseline. Exits non-zero when an endpoint regressed. "
+            "Writes run in-process only, each inside a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help="Timed requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--only', help="Run scenarios whose name contains this text.")
+        parser.add_argument('--url', help="Base URL of a running server, e.g. http://127.0.0.1:8000. Read-only "
+                                          "scenarios only; query counts are not available.")
+        parser.add_argument('--scale', type=float, default=0,
+                            help="Seed generate_load_data at this scale (1 = 10k users, 1k jobs, 30k applications) "
+                                 "when the database has no generated data yet.")
+        parser.add_argument('--password', default='loadtest-password', help="Password of the generated users.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save', action='store_true', help="Write this run as the new baseline.")
+        parser.add_argument('--threshold', type=float, default=0.3,
+                            help="Allowed relative growth of p50/p95 latency and response size.")
+        parser.add_argument('--min-delta-ms', type=float, default=10.0,
+                            help="Latency growth below this is noise, whatever the ratio.")
+
+    def handle(self, *args, **options):
+        self.seed(options)
+        fixtures = self.fixtures(options)
+        scenarios = [s for s in SCENARIOS if not options['only'] or options['only'] in s[0]]
+        results, skipped = {}, []
+        for scenario in scenarios:
+            reason = self.skip_reason(scenario, fixtures, options)
+            if reason:
+                skipped.append((scenario[0], reason))
+                continue
+            results[scenario[0]] = self.measure(scenario, fixtures, options)
+            self.print_result(scenario[0], results[scenario[0]])
+
+        for name, reason in skipped:
+            self.stdout.write(f"  skipped {name}: {reason}")
+        self.report_uncovered(options)
+
+        run = {'meta': self.meta(options), 'endpoints': results}
+        baseline = Path(options['baseline'])
+        if options['save']:
+            baseline.parent.mkdir(parents=True, exist_ok=True)
+            baseline.write_text(json.dumps(run, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline}"))
+        elif baseline.exists():
+            self.compare(json.loads(baseline.read_text()), run, options)
+        else:
+            self.stdout.write(f"No baseline at {baseline}; run with --save to create one.")
+
+    def seed(self, options):
+        if not options['scale'] or User.objects.filter(email__endswith=f'@{LOAD_DATA_DOMAIN}').exists():
+            return
+        scale = options['scale']
+        call_command('generate_load_data', users=int(10_000 * scale), jobs=int(1_000 * scale),
+                     applications=int(30_000 * scale), password=options['password'], stdout=self.stdout)
+        call_command('rollup_daily_stats', stdout=self.stdout)
+        call_command('rollup_funnel', stdout=self.stdout)
+
+    def fixtures(self, options):
+        """Representative rows: the busiest employer, its most applied-to job, and people around it."""
+        employer = (User.objects.filter(role=User.Employer, is_active=True).annotate(posted=Count('jobs'))
+                    .order_by('-posted', 'id').first())
+        if employer is None:
+            raise CommandError("No employers in the database; seed it first (--scale or generate_load_data).")
+        job = Job.objects.filter(employer=employer).order_by('-applications_count', 'id').first()
+        if job is None:
+            raise CommandError(f"{employer.email} has no jobs; seed the database first.")
+        applications = Application.objects.filter(job=job, applicant__is_active=True).select_related('applicant')
+        application = applications.filter(status__in=[Application.PENDING, Application.REVIEWED]).order_by('id').first()
+        reviewed_ids = EmployerReview.objects.filter(job=job).values('job_seeker_id')
+        reviewer = applications.filter(status=Application.ACCEPTED).exclude(applicant_id__in=reviewed_ids).first()
+        seeker = application.applicant if application else (
+            User.objects.filter(role=User.Job_Seeker, is_active=True).order_by('id').first())
+        fixtures = {
+            'admin': User.objects.filter(role=User.Admin, is_active=True).order_by('id').first(),
+            'employer': employer,
+            'seeker': seeker,
+            'reviewer': reviewer.applicant if reviewer else None,
+            'job': job,
+            'application': application,
+            'category': job.category or JobCategory.objects.order_by('id').first(),
+            'review': EmployerReview.objects.filter(job=job).order_by('-created_at').first(),
+            'saved_search': SavedSearch.objects.filter(user=seeker).first() if seeker else None,
+            'export': ApplicationExport.objects.filter(requested_by=employer).first(),
+            'checkout': FeaturedCheckout.objects.filter(employer=employer).first(),
+        }
+        refresh = UserRefreshToken.for_user(seeker) if seeker else None
+        fixtures['tokens'] = {role: str(UserAccessToken.for_user(fixtures[role]))
+                              for role in ('admin', 'employer', 'seeker', 'reviewer') if fixtures[role]}
+        fixtures['values'] = {
+            'category': fixtures['category'].id if fixtures['category'] else '',
+            'employer': employer.id,
+            'seeker_email': seeker.email if seeker else '',
+            'password': options['password'],
+            'refresh': str(refresh) if refresh else '',
+            'access': str(refresh.access_token) if refresh else '',
+        }
+        return fixtures
+
+    def skip_reason(self, scenario, fixtures, options):
+        name, url_name, method, role, _ = scenario
+        if options['url'] and method != 'get':
+            return "writes are only replayed in-process, where they can be rolled back"
+        if role != 'anonymous' and not fixtures[role]:
+            return f"no {role} user in the database"
+        for fixture in PATH_ARGS.get(url_name, {}).values():
+            if fixtures[fixture] is None:
+                return f"no {fixture.replace('_', ' ')} row in the database"
+        if name.startswith('jwt.') and not fixtures['seeker'].check_password(options['password']):
+            return "--password is not the seeker's password"
+        return None
+
+    def build(self, scenario, fixtures):
+        """(path, query or body, headers) with fixture placeholders filled in."""
+        _, url_name, method, role, payload = scenario
+        kwargs = {arg: fixtures[fixture].pk for arg, fixture in PATH_ARGS.get(url_name, {}).items()}
+        path = reverse(url_name, kwargs=kwargs)
+        if isinstance(payload, dict):
+            payload = {key: value.format(**fixtures['values']) if isinstance(value, str) else value
+                       for key, value in payload.items()}
+        else:
+            payload = payload.format(**fixtures['values'])
+        headers = {'Authorization': f"JWT {fixtures['tokens'][role]}"} if role != 'anonymous' else {}
+        return path, payload, headers
+
+    def measure(self, scenario, fixtures, options):
+        path, payload, headers = self.build(scenario, fixtures)
+        method = scenario[2]
+        local = threading.local()
+
+        def send():
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_HOST='127.0.0.1')
+            started = time.perf_counter()
+            if options['url']:
+                status, body = self.fetch(options['url'], path, payload, headers)
+            elif method == 'get':
+                response = local.client.get(f'{path}?{payload}' if payload else path, headers=headers)
+                status, body = response.status_code, read_body(response)
+            else:
+                status, body = self.write(local.client, method, path, payload, headers)
+            if status >= 400:
+                raise CommandError(f"{scenario[0]}: {method.upper()} {path} returned {status}: {body[:300]!r}")
+            return len(body), time.perf_counter() - started
+
+        def worker(count):
+            try:
+                return [send() for _ in range(count)]
+            finally:
+                connection.close()
+
+        for _ in range(options['warmup']):
+            send()
+        queries = None
+        if not options['url']:
+            # execute_wrapper rather than CaptureQueriesContext: each request resets connection.queries
+            captured = []
+            with connection.execute_wrapper(lambda execute, sql, *args: captured.append(sql) or execute(sql, *args)):
+                send()
+            queries = len(captured)
+
+        concurrency = max(1, options['concurrency'])
+        if method != 'get' and connection.vendor == 'sqlite' and not options['url']:
+            # SQLite allows one writer at a time
+            concurrency = 1
+        shares = [options['requests'] // concurrency + (i < options['requests'] % concurrency) for i in range(concurrency)]
+        # Long-lived objects from setup and earlier scenarios would otherwise make full collections
+        # (tens of ms) land in whichever scenario happens to trigger them
+        gc.collect()
+        gc.freeze()
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                samples = [sample for batch in executor.map(worker, shares) for sample in batch]
+        finally:
+            gc.unfreeze()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in samples)
+        return {
+            'method': method.upper(),
+            'path': path,
+            'role': scenario[3],
+            'requests': len(samples),
+            'rps': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.5), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'queries': queries,
+            'bytes': max(size for size, _ in samples),
+        }
+
+    @staticmethod
+    def write(client, method, path, payload, headers):
+        try:
+            with transaction.atomic():
+                response = getattr(client, method)(path, data=payload, content_type='application/json', headers=headers)
+                raise Rollback(response)
+        except Rollback as rollback:
+            response = rollback.args[0]
+        return response.status_code, read_body(response)
+
+    @staticmethod
+    def fetch(base_url, path, query, headers):
+        url = base_url.rstrip('/') + path + (f'?{query}' if query else '')
+        req = urllib_request.Request(url, headers=headers)
+        try:
+            with urllib_request.urlopen(req, timeout=30) as response:
+                return response.status, response.read()
+        except urllib_request.HTTPError as exc:
+            return exc.code, exc.read()
+
+    def print_result(self, name, result):
+        queries = '-' if result['queries'] is None else result['queries']
+        self.stdout.write(f"{name:<32} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                          f"p99 {result['p99_ms']:8.2f} ms  {queries:>3} queries  {result['bytes']:>8} B  "
+                          f"{result['rps']:7.1f} req/s")
+
+    def report_uncovered(self, options):
+        covered = {(url_name, method) for _, url_name, method, _, _ in SCENARIOS}
+        uncovered = sorted({
+            (method, name) for name, methods in iter_routes(api.urls.urlpatterns) for method in methods
+            if (name, method) not in covered and name not in NOT_COVERED
+        })
+        for name, reason in NOT_COVERED.items():
+            self.stdout.write(f"  not covered {name}: {reason}")
+        if options['only']:
+            return
+        reads = [name for method, name in uncovered if method == 'get']
+        if reads:
+            self.stdout.write(self.style.WARNING(f"  no scenario for GET {', '.join(reads)}"))
+        writes = [f"{method.upper()} {name}" for method, name in uncovered if method != 'get']
+        if options['verbosity'] > 1:
+            self.stdout.write(f"  no scenario for {', '.join(writes)}")
+        else:
+            self.stdout.write(f"  {len(writes)} write routes have no scenario (-v 2 lists them)")
+
+    def meta(self, options):
+        return {
+            'created': timezone.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'mode': 'server' if options['url'] else 'in-process',
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'dataset': {
+                'users': User.objects.count(),
+                'jobs': Job.objects.count(),
+                'applications': Application.objects.count(),
+                'reviews': EmployerReview.objects.count(),
+            },
+        }
+
+    def compare(self, baseline, run, options):
+        same_data = baseline['meta'].get('dataset') == run['meta']['dataset']
+        if not same_data:
+            self.stdout.write(self.style.WARNING(
+                f"Dataset differs from the baseline ({baseline['meta'].get('dataset')} vs {run['meta']['dataset']}); "
+                f"response sizes are not compared."))
+        regressions = []
+        for name, result in run['endpoints'].items():
+            before = baseline['endpoints'].get(name)
+            if before is None:
+                self.stdout.write(f"  new {name} (not in the baseline)")
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                grown = result[metric] - before[metric]
+                if grown > options['min_delta_ms'] and result[metric] > before[metric] * (1 + options['threshold']):
+                    regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]}")
+            if None not in (result['queries'], before['queries']) and result['queries'] > before['queries']:
+                regressions.append(f"{name}: queries {before['queries']} -> {result['queries']}")
+            if same_data and result['bytes'] > before['bytes'] * (1 + options['threshold']):
+                regressions.append(f"{name}: bytes {before['bytes']} -> {result['bytes']}")
+
+        if not options['only']:
+            for name in sorted(set(baseline['endpoints']) - set(run['endpoints'])):
+                self.stdout.write(self.style.WARNING(f"  missing {name} (in the baseline, not measured)"))
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f"  REGRESSION {line}"))
+            raise CommandError(f"{len(regressions)} regressions against {options['baseline']}.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
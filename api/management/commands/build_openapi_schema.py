@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = ("Generate the OpenAPI schema at build time into OPENAPI_SCHEMA_FILE, which /swagger.json, "
+            "/swagger/ and /redoc/ serve without introspecting the API per request.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Where to write the schema (default: OPENAPI_SCHEMA_FILE).")
+        parser.add_argument('--check', action='store_true',
+                            help="Don't write; fail if the existing file differs from a fresh build (for CI).")
+
+    def handle(self, *args, **options):
+        path = Path(options['output'] or settings.OPENAPI_SCHEMA_FILE)
+        content = build_schema()
+
+        if options['check']:
+            if not path.exists() or path.read_bytes() != content:
+                raise CommandError(f"{path} is out of date; run `manage.py build_openapi_schema`.")
+            self.stdout.write(f"{path} is up to date.")
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Replace atomically so a running process never reads a partial file
+        partial = path.with_name(f'.{path.name}.partial')
+        partial.write_bytes(content)
+        partial.replace(path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(content) / 1024:.0f} KB OpenAPI schema to {path}."))
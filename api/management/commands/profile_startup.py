@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: import the WSGI app (django.setup(), settings, apps,
+# models) and resolve one URL, which imports the URLconf and every view it routes to.
+# That is what a serverless cold start does before serving its first request.
+CHILD = """
+import json, resource, sys, time
+started, cpu_started = time.perf_counter(), time.process_time()
+from importlib import import_module
+module, _, attribute = sys.argv[1].rpartition('.')
+getattr(import_module(module), attribute)
+loaded = time.perf_counter()
+from django.urls import resolve
+resolve(sys.argv[2])
+finished, cpu_finished = time.perf_counter(), time.process_time()
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'app_ms': (loaded - started) * 1000,
+    'total_ms': (finished - started) * 1000,
+    'cpu_ms': (cpu_finished - cpu_started) * 1000,
+    'rss_mb': maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'modules': len(sys.modules),
+}))
+"""
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class Command(BaseCommand):
+    help = ("Measure cold-start cost: import the WSGI app and resolve a URL in fresh interpreters, "
+            "report wall time and peak RSS, and break import time down per module (python -X importtime). "
+            "With --budget-ms/--budget-mb it fails when a budget is exceeded, for CI.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time (median is reported).")
+        parser.add_argument('--path', default='/api/v1/jobs/', help="URL resolved as the first request.")
+        parser.add_argument('--top', type=int, default=25, help="Modules/packages to list.")
+        parser.add_argument('--by', choices=['module', 'package'], default='package',
+                            help="Group import self-time by module or by top-level package.")
+        parser.add_argument('--budget-ms', type=float, help="Fail if the median startup time exceeds this.")
+        parser.add_argument('--budget-mb', type=float, help="Fail if the peak resident memory exceeds this.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        runs = [self.run_child(env, options['path'])[0] for _ in range(max(options['runs'], 1))]
+        imports = self.import_times(env, options['path'])
+
+        total_ms = statistics.median(run['total_ms'] for run in runs)
+        app_ms = statistics.median(run['app_ms'] for run in runs)
+        cpu_ms = statistics.median(run['cpu_ms'] for run in runs)
+        rss_mb = max(run['rss_mb'] for run in runs)
+        self.stdout.write(f"Cold start over {len(runs)} runs (median): {total_ms:.0f} ms "
+                          f"({app_ms:.0f} ms WSGI app + {total_ms - app_ms:.0f} ms URLconf for {options['path']}), "
+                          f"{cpu_ms:.0f} ms CPU, peak RSS {rss_mb:.1f} MB, {runs[0]['modules']} modules")
+
+        grouped = defaultdict(lambda: [0, 0])
+        for name, own in imports:
+            key = name if options['by'] == 'module' else name.split('.')[0]
+            grouped[key][0] += own
+            grouped[key][1] += 1
+        import_ms = sum(own for _, own in imports) / 1000
+        self.stdout.write(f"\nImport self-time by {options['by']} ({import_ms:.0f} ms under -X importtime):")
+        self.stdout.write(f"  {'ms':>8} {'share':>6} {'modules':>7}  {options['by']}")
+        for key, (own, count) in sorted(grouped.items(), key=lambda item: item[1][0], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {own / 1000:>8.1f} {own / 10 / import_ms:>5.1f}% {count:>7}  {key}")
+
+        failures = []
+        if options['budget_ms'] is not None and total_ms > options['budget_ms']:
+            failures.append(f"startup {total_ms:.0f} ms > budget {options['budget_ms']:g} ms")
+        if options['budget_mb'] is not None and rss_mb > options['budget_mb']:
+            failures.append(f"peak RSS {rss_mb:.1f} MB > budget {options['budget_mb']:g} MB")
+        if failures:
+            raise CommandError("Cold start over budget: " + "; ".join(failures))
+
+    def run_child(self, env, path, *flags):
+        result = subprocess.run(
+            [sys.executable, *flags, '-c', CHILD, settings.WSGI_APPLICATION, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Startup failed:\n{result.stderr[-4000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+    def import_times(self, env, path):
+        """[(module, self microseconds)] for one cold start under -X importtime."""
+        _, stderr = self.run_child(env, path, '-X', 'importtime')
+        imports = []
+        for line in stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                imports.append((match[4], int(match[1])))
+        return imports
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.profiling import function_times, iter_profiles
+
+
+class Command(BaseCommand):
+    help = ("List request profiles saved by ProfilingMiddleware and aggregate the hottest functions "
+            "across them (self and total time, summed over the matching profiles).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help="Only profiles whose view contains this text, e.g. JobViewSet.list.")
+        parser.add_argument('--hours', type=float, help="Only profiles from the last N hours.")
+        parser.add_argument('--limit', type=int, default=20, help="Most recent profiles to list.")
+        parser.add_argument('--top', type=int, default=25, help="Functions to show.")
+        parser.add_argument('--sort', choices=['self', 'total'], default='self')
+        parser.add_argument('--project-only', action='store_true',
+                            help="Only functions from this repository, not the standard library or packages.")
+        parser.add_argument('--prune-days', type=float, help="Delete profiles older than N days and exit.")
+
+    def handle(self, *args, **options):
+        profiles = iter_profiles()
+        if options['prune_days'] is not None:
+            return self.prune(profiles, options['prune_days'])
+
+        if options['view']:
+            profiles = [meta for meta in profiles if options['view'] in meta['view']]
+        if options['hours']:
+            since = timezone.now() - timedelta(hours=options['hours'])
+            profiles = [meta for meta in profiles if parse_datetime(meta['created']) >= since]
+        if not profiles:
+            self.stdout.write(f"No profiles in {settings.PROFILING_DIR}.")
+            return
+
+        self.stdout.write(f"{len(profiles)} profiles (most recent {min(len(profiles), options['limit'])}):")
+        for meta in profiles[-options['limit']:]:
+            self.stdout.write(f"  {meta['created']}  {meta['mode']:<8} {meta['duration_ms']:>9.1f} ms  "
+                              f"{meta['status']}  {meta['method']} {meta['path']}  [{meta['id']}]")
+
+        totals = defaultdict(lambda: [0.0, 0.0, 0])
+        for meta in profiles:
+            for key, (own, total) in function_times(meta).items():
+                entry = totals[key]
+                entry[0] += own
+                entry[1] += total
+                entry[2] += 1
+
+        base_dir = str(settings.BASE_DIR)
+        if options['project_only']:
+            totals = {key: value for key, value in totals.items()
+                      if key[0].startswith(base_dir) and 'site-packages' not in key[0]}
+        column = 0 if options['sort'] == 'self' else 1
+        hottest = sorted(totals.items(), key=lambda item: item[1][column], reverse=True)[:options['top']]
+
+        self.stdout.write(f"\nHottest functions by {options['sort']} time:")
+        self.stdout.write(f"  {'self ms':>10} {'total ms':>10} {'profiles':>8}  function")
+        for (filename, line, function), (own, total, seen) in hottest:
+            if filename.startswith(base_dir):
+                filename = str(Path(filename).relative_to(base_dir))
+            self.stdout.write(f"  {own:>10.1f} {total:>10.1f} {seen:>8}  {function} ({filename}:{line})")
+
+    def prune(self, profiles, days):
+        cutoff = timezone.now() - timedelta(days=days)
+        removed = 0
+        for meta in profiles:
+            if parse_datetime(meta['created']) < cutoff:
+                meta['profile'].unlink(missing_ok=True)
+                meta['sidecar'].unlink(missing_ok=True)
+                removed += 1
+        self.stdout.write(f"Removed {removed} profiles older than {days:g} days.")
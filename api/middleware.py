@@ -0,0 +1,245 @@
+"""
+Per-request performance metrics and profiling.
+
+`RequestMetricsMiddleware` instruments a sampled fraction of requests
+(PERF_SAMPLE_RATE): query count and time on every database alias, time
+spent building serializer data, and total time. Sampled responses carry a
+`Server-Timing` header and are logged as one JSON line each. Queries slower
+than PERF_SLOW_QUERY_MS are logged on every request, with a normalized SQL
+fingerprint and the view that ran them.
+
+`ProfilingMiddleware` runs a request under a profiler when an admin asks for
+it with an `X-Profile` header, or for PROFILING_SAMPLE_RATE of requests
+(see api.profiling).
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from accounts.authentication import VersionedJWTAuthentication, request_token
+from accounts.tokens import ROLE_CLAIM
+from api import profiling
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(f'{__name__}.slow_queries')
+
+_current = ContextVar('request_metrics', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?|\$\d+')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    (id, normalized SQL) with literals, placeholders and IN/VALUES lists
+    collapsed, so the same query shape groups together whatever its values.
+    """
+    normalized = _STRING.sub('?', sql)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _LIST.sub('(...)', normalized)
+    normalized = _ROWS.sub(r'\1, ...', normalized)
+    normalized = _SPACE.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def view_name(request):
+    """Dotted name of the view that handled `request`, with the DRF action for viewsets."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match._func_path
+    name = f'{view_class.__module__}.{view_class.__qualname__}'
+    action = (getattr(match.func, 'actions', None) or {}).get(request.method.lower())
+    return f'{name}.{action}' if action else name
+
+
+class RequestMetrics:
+    """Counters for one request; also the execute_wrapper installed on each connection."""
+
+    def __init__(self, request, sampled, slow_query):
+        self.request = request
+        self.sampled = sampled
+        self.slow_query = slow_query
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db += duration
+            if self.slow_query is not None and duration >= self.slow_query:
+                self.log_slow_query(sql, duration, context['connection'].alias)
+
+    def log_slow_query(self, sql, duration, alias):
+        fingerprint_id, normalized = fingerprint(sql)
+        slow_query_logger.warning(json.dumps({
+            'event': 'slow_query',
+            'fingerprint': fingerprint_id,
+            'ms': round(duration * 1000, 2),
+            'database': alias,
+            'view': view_name(self.request),
+            'method': self.request.method,
+            'path': self.request.path,
+            'sql': normalized[:2000],
+        }))
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+
+def _timed_data(data):
+    def timed(self):
+        metrics = _current.get()
+        # Only the outermost serializer is timed; nested fields are part of its work
+        if metrics is None or metrics.serializing:
+            return data.fget(self)
+        metrics.serializing = True
+        started, db_before = time.perf_counter(), metrics.db
+        try:
+            return data.fget(self)
+        finally:
+            metrics.serializing = False
+            # Lazy loads during serialization are already counted as db time
+            metrics.serialize += time.perf_counter() - started - (metrics.db - db_before)
+    timed.timed = True
+    return property(timed)
+
+
+def install_serializer_timing():
+    """Time BaseSerializer.data, which every Serializer and ListSerializer goes through."""
+    if not getattr(serializers.BaseSerializer.data.fget, 'timed', False):
+        serializers.BaseSerializer.data = _timed_data(serializers.BaseSerializer.data)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PERF_SAMPLE_RATE
+        self.slow_query = settings.PERF_SLOW_QUERY_MS / 1000 if settings.PERF_SLOW_QUERY_MS > 0 else None
+        if self.sample_rate <= 0 and self.slow_query is None:
+            raise MiddlewareNotUsed
+        if self.sample_rate > 0:
+            install_serializer_timing()
+
+    def __call__(self, request):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_query is None:
+            return self.get_response(request)
+
+        metrics = RequestMetrics(request, sampled, self.slow_query)
+        token = _current.set(metrics) if sampled else None
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            if token is not None:
+                _current.reset(token)
+        if sampled:
+            self.report(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def report(self, request, response, metrics, total):
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing(total)
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': view_name(request),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db * 1000, 2),
+            'queries': metrics.queries,
+            'serialize_ms': round(metrics.serialize * 1000, 2),
+            # Streaming bodies are produced after this point and aren't included
+            'streaming': response.streaming,
+        }))
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.allow_header = settings.PROFILING_ALLOW_HEADER
+        if self.sample_rate <= 0 and not self.allow_header:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        profiler = profiling.make_profiler(mode)
+        if not profiler.start():
+            # Another request is already under cProfile
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        rid = profiling.request_id(request)
+        try:
+            profile_id = profiling.save(profiler, view_name(request), rid, {
+                'mode': mode,
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        except OSError as exc:
+            logger.warning("Could not save profile for %s: %s", request.path, exc)
+            return response
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def requested_mode(self, request):
+        header = request.headers.get('X-Profile')
+        if header and self.allow_header and self.is_admin(request):
+            return header if header in profiling.MODES else settings.PROFILING_MODE
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return settings.PROFILING_MODE
+        return None
+
+    @staticmethod
+    def is_admin(request):
+        """Authenticate the JWT here: DRF only does it inside the view, after profiling has to start."""
+        validated_token = request_token(request)
+        if validated_token is None:
+            return False
+        try:
+            user = VersionedJWTAuthentication().user_for_token(validated_token, claims_only=ROLE_CLAIM in validated_token)
+        except AuthenticationFailed:
+            return False
+        return getattr(user, 'role', None) == 'admin'
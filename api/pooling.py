@@ -0,0 +1,98 @@
+"""
+Database connection reuse.
+
+Opening a PostgreSQL connection (TCP, TLS, authentication) is often the
+largest part of a fast request, and every request used to pay it. The
+settings now keep connections open. With DB_POOL they use Django's psycopg 3
+pool; otherwise each worker keeps one persistent connection for
+DB_CONN_MAX_AGE seconds. Either way the connection outlives the request, so
+a warm serverless instance reuses it across invocations. Each connection is
+checked before reuse, by the pool's `check` or by CONN_HEALTH_CHECKS.
+
+`install()` counts, per process and database alias, the connections opened
+and the time spent opening them (or checking one out of the pool), and the
+requests served. `connection_stats()` reports those counts together with the
+pool's own statistics. `manage.py benchmark_connections` measures what
+connecting costs per request.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+class ConnectionCounters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            # alias -> [connects, total seconds, slowest seconds]
+            self.aliases = defaultdict(lambda: [0, 0.0, 0.0])
+
+    def request_started(self, **kwargs):
+        with self.lock:
+            self.requests += 1
+
+    def connected(self, alias, seconds):
+        with self.lock:
+            entry = self.aliases[alias]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return self.requests, {alias: tuple(entry) for alias, entry in self.aliases.items()}
+
+
+counters = ConnectionCounters()
+
+
+def _timed_connect(connect):
+    def timed(self):
+        started = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            counters.connected(self.alias, time.perf_counter() - started)
+    timed.timed = True
+    return timed
+
+
+def install():
+    """Time BaseDatabaseWrapper.connect, which every backend opens (or checks out) connections through."""
+    if not getattr(BaseDatabaseWrapper.connect, 'timed', False):
+        BaseDatabaseWrapper.connect = _timed_connect(BaseDatabaseWrapper.connect)
+        request_started.connect(counters.request_started, dispatch_uid='api.pooling.request_started')
+
+
+def connection_stats():
+    """Connection reuse in this process, per database alias, with psycopg pool stats where pooling is on."""
+    requests, opened = counters.snapshot()
+    databases = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        connects, seconds, slowest = opened.get(alias, (0, 0.0, 0.0))
+        pooled = bool(settings_dict['OPTIONS'].get('pool'))
+        entry = {
+            'vendor': connections[alias].vendor,
+            'pooled': pooled,
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'server_side_cursors': not settings_dict.get('DISABLE_SERVER_SIDE_CURSORS', False),
+            'connects': connects,
+            'connects_per_request': round(connects / requests, 4) if requests else None,
+            'avg_connect_ms': round(seconds / connects * 1000, 2) if connects else None,
+            'max_connect_ms': round(slowest * 1000, 2),
+        }
+        pool = connections[alias].pool if pooled else None
+        if pool is not None:
+            entry['pool'] = pool.get_stats()
+        databases[alias] = entry
+    return {'requests': requests, 'databases': databases}
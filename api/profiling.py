@@ -0,0 +1,185 @@
+"""
+On-demand profiling of live requests.
+
+A request is profiled when an admin sends `X-Profile: 1` (or `cprofile` /
+`sample` to choose the profiler), or at random for PROFILING_SAMPLE_RATE of
+requests (see api.middleware.ProfilingMiddleware).
+
+- `cprofile` is deterministic (every call) and writes a .pstats file.
+- `sample` reads the request thread's stack every PROFILING_INTERVAL_MS from
+  a background thread and writes speedscope JSON (https://www.speedscope.app).
+  It is much cheaper, but misses work shorter than the interval.
+
+Profiles are saved as PROFILING_DIR/<view>/<time>-<request id>.<ext> with a
+.meta.json sidecar. `manage.py profiles` lists and aggregates them.
+"""
+import cProfile
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+CPROFILE = 'cprofile'
+SAMPLE = 'sample'
+MODES = (CPROFILE, SAMPLE)
+META_SUFFIX = '.meta.json'
+
+# cProfile hooks are process-wide from Python 3.12; profile one request at a time
+_cprofile_lock = threading.Lock()
+
+
+class DeterministicProfiler:
+    suffix = '.pstats'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        self.profile.enable()
+        return True
+
+    def stop(self):
+        self.profile.disable()
+        _cprofile_lock.release()
+
+    def dump(self, path, name):
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    suffix = '.speedscope.json'
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000
+        self.thread_id = threading.get_ident()
+        self.frames = {}
+        self.samples = []
+        self.weights = []
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.run, name='request-profiler', daemon=True)
+
+    def start(self):
+        # Record stacks from the caller (the middleware) down, not the server frames above it
+        self.skip, frame = 0, sys._getframe(2)
+        while frame is not None:
+            self.skip += 1
+            frame = frame.f_back
+        self.started = time.perf_counter()
+        self.sampler.start()
+        return True
+
+    def stop(self):
+        self.stopped.set()
+        self.sampler.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+                stack.append(self.frames.setdefault(key, len(self.frames)))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack[self.skip:])
+            self.weights.append((now - last) * 1000)
+            last = now
+
+    def dump(self, path, name):
+        frames = sorted(self.frames, key=self.frames.get)
+        document = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'talent-bridge',
+            'shared': {'frames': [{'name': n, 'file': f, 'line': line} for n, f, line in frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': self.elapsed * 1000,
+                'samples': self.samples,
+                'weights': self.weights,
+            }],
+        }
+        Path(path).write_text(json.dumps(document))
+
+
+def make_profiler(mode):
+    if mode == SAMPLE:
+        return SamplingProfiler(settings.PROFILING_INTERVAL_MS)
+    return DeterministicProfiler()
+
+
+def request_id(request):
+    """The caller's X-Request-ID when it is safe to use in a file name, otherwise a new one."""
+    given = request.headers.get('X-Request-ID', '')
+    return given if re.fullmatch(r'[A-Za-z0-9_-]{1,64}', given) else uuid.uuid4().hex
+
+
+def save(profiler, view, rid, meta):
+    """Write the profile and its sidecar. Returns the profile id (<view>/<stem>)."""
+    view = re.sub(r'[^A-Za-z0-9_.-]', '_', view or 'unresolved')
+    directory = Path(settings.PROFILING_DIR) / view
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f'{timezone.now():%Y%m%dT%H%M%S}-{rid}'
+    profile_path = directory / f'{stem}{profiler.suffix}'
+    profiler.dump(profile_path, f"{meta['method']} {meta['path']}")
+    meta = {**meta, 'id': f'{view}/{stem}', 'view': view, 'request_id': rid, 'file': profile_path.name,
+            'created': timezone.now().isoformat(timespec='seconds')}
+    (directory / f'{stem}{META_SUFFIX}').write_text(json.dumps(meta))
+    return meta['id']
+
+
+def iter_profiles(directory=None):
+    """Sidecar metadata of every saved profile, oldest first, with `profile` set to the profile file."""
+    root = Path(directory or settings.PROFILING_DIR)
+    profiles = []
+    for sidecar in root.glob(f'*/*{META_SUFFIX}'):
+        try:
+            meta = json.loads(sidecar.read_text())
+        except (OSError, ValueError):
+            continue
+        meta['profile'] = sidecar.parent / meta['file']
+        meta['sidecar'] = sidecar
+        if meta['profile'].exists():
+            profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta['created'])
+
+
+def function_times(meta):
+    """{(file, line, function): (self ms, total ms)} for one saved profile."""
+    path = meta['profile']
+    if path.name.endswith('.pstats'):
+        stats = pstats.Stats(str(path)).stats
+        return {key: (tt * 1000, ct * 1000) for key, (_, _, tt, ct, _) in stats.items()}
+
+    document = json.loads(path.read_text())
+    frames = document['shared']['frames']
+    profile = document['profiles'][0]
+    own, total = defaultdict(float), defaultdict(float)
+    for stack, weight in zip(profile['samples'], profile['weights']):
+        if stack:
+            own[stack[-1]] += weight
+        for index in set(stack):
+            total[index] += weight
+    return {
+        (frames[i]['file'], frames[i]['line'], frames[i]['name']): (own.get(i, 0.0), total[i])
+        for i in total
+    }
@@ -0,0 +1,116 @@
+"""
+Read replicas.
+
+`ReplicaMiddleware` picks a database for each request and `ReplicaRouter`
+sends the request's reads there:
+
+- GET/HEAD/OPTIONS read from one of DATABASE_REPLICAS, chosen once per
+  request so a page and its count come from the same replica.
+- Views with a `read_replica` attribute naming a configured alias (the
+  dashboards use 'analytics') read from that database instead.
+- Other methods, and everything after the first write of a request, read
+  from the primary. So do reads inside a transaction on the primary.
+- A user who wrote is read from the primary for REPLICA_STICKY_SECONDS,
+  so they see their own changes despite replication lag. The user comes
+  from the request's JWT, and the flag is kept in the cache.
+
+Writes always go to the primary. Writes inside `untracked_writes()` (view
+counters and similar bookkeeping) don't move the request or the user to the
+primary. Outside a request (management commands, background tasks, the
+shell) everything uses the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.authentication import request_token
+
+_routing = ContextVar('replica_routing', default=None)
+_untracked = ContextVar('replica_untracked_writes', default=False)
+
+
+def _sticky_key(user_id):
+    return f'replica:sticky:{user_id}'
+
+
+@contextmanager
+def untracked_writes():
+    token = _untracked.set(True)
+    try:
+        yield
+    finally:
+        _untracked.reset(token)
+
+
+class RequestRouting:
+    def __init__(self, alias, pinnable):
+        self.alias = alias
+        # False once the request must read from the primary
+        self.pinnable = pinnable
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return routing.alias
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None and not _untracked.get():
+            routing.wrote = True
+            routing.alias = DEFAULT_DB_ALIAS
+            routing.pinnable = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = list(settings.DATABASE_REPLICAS)
+        if len(connections.settings) == 1:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        validated_token = request_token(request)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM) if validated_token else None
+        primary = request.method not in SAFE_METHODS or (user_id is not None and cache.get(_sticky_key(user_id)))
+        if primary or not self.replicas:
+            routing = RequestRouting(DEFAULT_DB_ALIAS, pinnable=not primary)
+        else:
+            routing = RequestRouting(random.choice(self.replicas), pinnable=True)
+
+        request.replica_routing = routing
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and user_id is not None:
+            cache.set(_sticky_key(user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = request.replica_routing
+        pinned = getattr(getattr(view_func, 'cls', view_func), 'read_replica', None)
+        # A pin doesn't override reading from the primary (writes, stickiness)
+        if pinned in connections.settings and routing.pinnable:
+            routing.alias = pinned
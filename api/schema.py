@@ -0,0 +1,128 @@
+"""
+OpenAPI schema for the Swagger and ReDoc pages.
+
+Generating the schema makes drf_yasg introspect every viewset and serializer,
+which costs seconds on a cold start. So it is built ahead of time by
+`manage.py build_openapi_schema` into OPENAPI_SCHEMA_FILE, and `openapi_schema`
+serves that file with an ETag and a long Cache-Control max-age. The UIs fetch
+it through SWAGGER_SETTINGS / REDOC_SETTINGS['SPEC_URL'].
+
+With OPENAPI_SCHEMA_RUNTIME the schema is generated in-process instead, once
+per process, when the artifact is missing or older than the project's code.
+Without it a missing artifact is a 503.
+"""
+import hashlib
+from functools import cache, lru_cache
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+from rest_framework import permissions
+
+# format= values on the UI URLs that ask for the JSON document rather than the page
+SPEC_FORMATS = ('openapi', 'json')
+
+
+def schema_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Talent Bridge API",
+        default_version='v1',
+        description="Comprehensive API documentation for the Talent Bridge project.",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="support@talentbridge.com"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+@cache
+def schema_view():
+    """drf_yasg's schema view class; only the UI pages use it, which don't generate paths."""
+    from drf_yasg.views import get_schema_view
+
+    return get_schema_view(schema_info(), public=True, permission_classes=(permissions.AllowAny,))
+
+
+def build_schema():
+    """The full schema as JSON bytes, for every endpoint (no request, so nothing is filtered by user)."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    generator = OpenAPISchemaGenerator(schema_info(), version='v1')
+    return OpenAPICodecJson(validators=[]).encode(generator.get_schema(request=None, public=True))
+
+
+@lru_cache(maxsize=1)
+def _read(path, mtime_ns):
+    content = Path(path).read_bytes()
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+@cache
+def _generate():
+    content = build_schema()
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+@cache
+def source_mtime_ns():
+    """Newest modification time of the project code the schema is generated from."""
+    base = Path(settings.BASE_DIR)
+    sources = [Path(import_module(settings.ROOT_URLCONF).__file__)]
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path)
+        if base in path.parents:
+            sources.extend(source for source in path.rglob('*.py')
+                           if source.name != 'tests.py' and not {'migrations', 'management'} & set(source.parts))
+    return max(source.stat().st_mtime_ns for source in sources)
+
+
+def load_schema():
+    """(JSON bytes, ETag) of the schema, or None when there is no artifact and runtime generation is off."""
+    path = Path(settings.OPENAPI_SCHEMA_FILE)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _generate() if settings.OPENAPI_SCHEMA_RUNTIME else None
+    if settings.OPENAPI_SCHEMA_RUNTIME and mtime_ns < source_mtime_ns():
+        # Built before the code last changed
+        return _generate()
+    # Keyed on mtime so a rebuilt artifact is picked up without a restart
+    return _read(str(path), mtime_ns)
+
+
+def _etag(request):
+    schema = load_schema()
+    return schema[1] if schema else None
+
+
+@require_safe
+@condition(etag_func=_etag)
+def openapi_schema(request):
+    schema = load_schema()
+    if schema is None:
+        return HttpResponse("OpenAPI schema has not been built; run `manage.py build_openapi_schema`.",
+                            status=503, content_type='text/plain')
+    response = HttpResponse(schema[0], content_type='application/json')
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+def schema_ui(renderer):
+    """Swagger/ReDoc page view; `?format=openapi` gets the prebuilt document."""
+    ui_view = cache(lambda: schema_view().with_ui(renderer, cache_timeout=0))
+
+    def view(request, *args, **kwargs):
+        spec_format = request.GET.get('format')
+        if spec_format in SPEC_FORMATS:
+            return openapi_schema(request)
+        if spec_format == 'yaml' and not settings.OPENAPI_SCHEMA_RUNTIME:
+            # drf_yasg would generate it on every request
+            raise Http404("Only the prebuilt JSON schema is served.")
+        return ui_view()(request, *args, **kwargs)
+    return view
@@ -1,3 +1,253 @@
-from django.test import TestCase
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.tokens import UserAccessToken
+from api.management.commands.benchmark_connections import Command as BenchmarkConnections
+from api import schema
+from api.pooling import connection_stats
+from api.replicas import ReplicaMiddleware
+from jobs.models import Job, JobCategory
 
 # Create your tests here.
+
+
+class ColdStartTests(SimpleTestCase):
+    """The budgets are generous: they catch a heavy import creeping back in, not noise."""
+
+    def test_startup_within_budget(self):
+        call_command('profile_startup', runs=1, budget_ms=3000, budget_mb=150, stdout=StringIO())
+
+    def test_over_budget_fails(self):
+        with self.assertRaisesMessage(CommandError, 'Cold start over budget'):
+            call_command('profile_startup', runs=1, budget_ms=1, stdout=StringIO())
+
+    def test_deferred_modules_not_imported(self):
+        code = ("import sys; from importlib import import_module; from django.urls import resolve; "
+                "module, _, app = sys.argv[1].rpartition('.'); getattr(import_module(module), app); "
+                "resolve('/api/v1/jobs/'); "
+                "print(sorted(m for m in ('cloudinary', 'drf_yasg.views', 'jobs.admin') if m in sys.modules))")
+        result = subprocess.run([sys.executable, '-c', code, settings.WSGI_APPLICATION], cwd=settings.BASE_DIR,
+                                env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE},
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], '[]')
+
+
+class AdminChecksTests(SimpleTestCase):
+    """With SimpleAdminConfig the ModelAdmins are registered lazily, so `manage.py check`
+    alone doesn't see them. Discover them here so their system checks still run in CI."""
+
+    def test_model_admins_pass_checks(self):
+        admin.autodiscover()
+        self.assertTrue(admin.site._registry)
+        call_command('check', stdout=StringIO())
+
+
+REPLICA_ALIASES = ('replica_1', 'analytics')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routing with a replica and an analytics alias: extra SQLite connections to
+    the test database. Not wrapped in a transaction, so they see its rows.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Added after the test runner has collected the databases to create, as
+        # mirrors: they share the test database and aren't flushed separately
+        for alias in REPLICA_ALIASES:
+            connections.settings[alias] = {**connections.settings['default'], 'TEST': {'MIRROR': 'default'}}
+        cls.databases = {'default', *REPLICA_ALIASES}
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in REPLICA_ALIASES:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        cls.databases = {'default'}
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.category = JobCategory.objects.create(name='Engineering')
+        self.job = Job.objects.create(employer=self.employer, title='Engineer', company_name='Acme', description='x',
+                                      category=self.category)
+
+    def request(self, method, path, user=None, data=None):
+        """The response and the number of queries each database served."""
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'JWT {UserAccessToken.for_user(user)}')
+        with ExitStack() as stack:
+            captured = {alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                        for alias in ('default', *REPLICA_ALIASES)}
+            response = getattr(client, method)(path, data, format='json')
+        return response, {alias: len(queries) for alias, queries in captured.items()}
+
+    def test_safe_reads_use_a_replica(self):
+        response, queries = self.request('get', '/api/v1/jobs/', self.employer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual((queries['default'], queries['analytics']), (0, 0))
+        self.assertGreater(queries['replica_1'], 0)
+
+    def test_dashboards_are_pinned_to_analytics(self):
+        response, queries = self.request('get', '/api/v1/dashboard/', self.employer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['jobs_posted'], 1)
+        self.assertEqual((queries['default'], queries['replica_1']), (0, 0))
+        self.assertGreater(queries['analytics'], 0)
+
+    def test_write_moves_request_and_user_to_primary(self):
+        response, queries = self.request('post', '/api/v1/jobs/', self.employer, {
+            'title': 'Designer', 'company_name': 'Acme', 'description': 'x', 'category_id': self.category.id,
+            'employer': self.employer.id,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((queries['replica_1'], queries['analytics']), (0, 0))
+
+        # Sticky: the writer reads from the primary, even on a pinned view; others don't
+        for path in ('/api/v1/jobs/', '/api/v1/dashboard/'):
+            response, queries = self.request('get', path, self.employer)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((queries['replica_1'], queries['analytics']), (0, 0))
+            self.assertGreater(queries['default'], 0)
+        _, queries = self.request('get', '/api/v1/jobs/')
+        self.assertEqual(queries['default'], 0)
+
+    def test_reads_after_a_write_in_a_safe_request_use_the_primary(self):
+        read_from = []
+
+        def view(request):
+            read_from.append(Job.objects.all().db)
+            JobCategory.objects.create(name='Design')
+            read_from.append(Job.objects.all().db)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(view)
+        token = UserAccessToken.for_user(self.employer)
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'JWT {token}')
+        middleware(request)
+        self.assertEqual(read_from, ['replica_1', 'default'])
+
+        read_from.clear()
+        middleware(RequestFactory().get('/', HTTP_AUTHORIZATION=f'JWT {token}'))
+        self.assertEqual(read_from[0], 'default')
+
+    def test_untracked_writes_do_not_pin_the_user(self):
+        response, queries = self.request('get', f'/api/v1/jobs/{self.job.id}/', self.employer)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(queries['default'], 0)  # the view counter
+        self.assertEqual(Job.objects.get().views_count, 1)
+
+        _, queries = self.request('get', '/api/v1/jobs/', self.employer)
+        self.assertEqual(queries['default'], 0)
+        self.assertGreater(queries['replica_1'], 0)
+
+
+class ConnectionReuseTests(TransactionTestCase):
+    """benchmark_connections, run against the test database."""
+    path = '/api/v1/job-categories/'
+
+    def test_persistent_connections_are_reused(self):
+        _, _, per_request, _ = BenchmarkConnections().run('persistent', self.path, 20)
+        self.assertEqual(per_request, 0)
+
+    def test_fresh_connects_every_request(self):
+        _, _, per_request, _ = BenchmarkConnections().run('fresh', self.path, 20)
+        # SQLite never closes an in-memory database's connection
+        in_memory = connection.vendor == 'sqlite' and connection.is_in_memory_db()
+        self.assertEqual(per_request, 0 if in_memory else 1)
+
+    def test_configured_connections_are_reused(self):
+        _, _, per_request, _ = BenchmarkConnections().run('configured', self.path, 20)
+        if connection.settings_dict['OPTIONS'].get('pool'):
+            # Every request checks a connection out of the pool
+            self.assertEqual(per_request, 1)
+        else:
+            self.assertEqual(per_request, 0)
+
+    @skipUnless(connection.settings_dict['OPTIONS'].get('pool'), "needs DB_POOL=True on PostgreSQL")
+    def test_pool_stays_within_its_size(self):
+        BenchmarkConnections().run('configured', self.path, 50)
+        stats = connection_stats()['databases']['default']
+        self.assertTrue(stats['pooled'])
+        self.assertLessEqual(stats['pool']['pool_size'], settings.DB_POOL_MAX_SIZE)
+
+
+class SchemaViewTests(SimpleTestCase):
+    """/swagger.json from a prebuilt file, and the runtime fallback."""
+    path = '/swagger.json'
+    generated = b'{"swagger": "2.0", "generated": true}'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.file = Path(directory.name) / 'openapi.json'
+        self.file.write_bytes(b'{"swagger": "2.0"}')
+        patcher = mock.patch.object(schema, 'build_schema', return_value=self.generated)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        schema._generate.cache_clear()
+        self.addCleanup(schema._generate.cache_clear)
+
+    def get(self, runtime=False, **headers):
+        with override_settings(OPENAPI_SCHEMA_FILE=str(self.file), OPENAPI_SCHEMA_RUNTIME=runtime):
+            return self.client.get(self.path, **headers)
+
+    def test_prebuilt_file_is_served_with_an_etag(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.file.read_bytes())
+        self.assertTrue(response['ETag'])
+        self.assertIn(f'max-age={settings.OPENAPI_SCHEMA_MAX_AGE}', response['Cache-Control'])
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # A rebuilt file is picked up without a restart
+        self.file.write_bytes(b'{"swagger": "2.0", "rebuilt": true}')
+        os.utime(self.file, ns=(self.file.stat().st_atime_ns, self.file.stat().st_mtime_ns + 10 ** 9))
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"swagger": "2.0", "rebuilt": true}')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_file_is_generated_at_runtime_only(self):
+        self.file.unlink()
+        self.assertEqual(self.get().status_code, 503)
+        response = self.get(runtime=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.generated)
+        self.assertEqual(self.get(runtime=True, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_file_older_than_the_code_is_regenerated_at_runtime(self):
+        os.utime(self.file, ns=(0, 0))
+        self.assertEqual(self.get(runtime=True).content, self.generated)
+        self.assertEqual(self.get().content, self.file.read_bytes())
+
+        os.utime(self.file, ns=(schema.source_mtime_ns(), schema.source_mtime_ns()))
+        self.assertEqual(self.get(runtime=True).content, self.file.read_bytes())
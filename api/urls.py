@@ -1,23 +1,40 @@
 from django.urls import path, include
-from jobs.views import JobViewSet, JobCategoryViewSet
-from reviews.views import EmployerReviewViewSet
-from applications.views import ApplicationViewSet
+from jobs.views import JobViewSet, JobCategoryViewSet, SavedSearchViewSet
+from reviews.views import EmployerReviewViewSet, EmployerReviewFeedViewSet
+from applications.views import ApplicationViewSet, ApplicantSearchViewSet, ApplicationExportViewSet
 from dashboard.views import DashboardViewSet
+from accounts.views import EmployerViewSet
+from notifications.views import NotificationViewSet, event_stream, stream_ticket
+from payments.views import FeaturedCheckoutViewSet, payment_webhook
 from rest_framework_nested import routers
 
 router = routers.DefaultRouter()
 router.register('jobs', JobViewSet, basename='jobs')
 router.register('job-categories', JobCategoryViewSet, basename='job-categories')
+router.register('saved-searches', SavedSearchViewSet, basename='saved-searches')
 router.register('dashboard', DashboardViewSet, basename='dashboard')
+router.register('employers', EmployerViewSet, basename='employers')
+router.register('applicants', ApplicantSearchViewSet, basename='applicants')
+router.register('application-exports', ApplicationExportViewSet, basename='application-exports')
+router.register('notifications', NotificationViewSet, basename='notifications')
+router.register('featured-checkouts', FeaturedCheckoutViewSet, basename='featured-checkouts')
 
 # Nested routers for jobs
 jobs_router = routers.NestedDefaultRouter(router, 'jobs', lookup='job')
 jobs_router.register('reviews', EmployerReviewViewSet, basename='job-reviews')
 jobs_router.register('applications', ApplicationViewSet, basename='job-applications')
 
+# Nested routers for employers
+employers_router = routers.NestedDefaultRouter(router, 'employers', lookup='employer')
+employers_router.register('reviews', EmployerReviewFeedViewSet, basename='employer-reviews')
+
 urlpatterns = [
     path('', include(router.urls)),
     path('', include(jobs_router.urls)),
+    path('', include(employers_router.urls)),
+    path('events/ticket/', stream_ticket, name='event-ticket'),
+    path('events/stream/', event_stream, name='event-stream'),
+    path('payments/webhook/', payment_webhook, name='payment-webhook'),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.jwt')),
 ]
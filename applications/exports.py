@@ -0,0 +1,155 @@
+"""
+Application exports for reporting.
+
+Rows are read with `.values()` (joins to job and applicant, no model
+instances) through `.iterator()` and written straight to the response, so
+memory stays flat however many applications match. Cells are user text:
+CSV cells that a spreadsheet would read as a formula are quoted with `'`,
+and XLSX cells drop the control characters XML 1.0 forbids.
+"""
+import csv
+import re
+from xml.sax.saxutils import escape
+
+from applications.filters import ApplicationExportFilter
+from applications.models import Application
+from applications.streaming import iter_zip
+
+CSV = 'csv'
+XLSX = 'xlsx'
+FORMATS = (CSV, XLSX)
+
+CONTENT_TYPES = {
+    CSV: 'text/csv',
+    XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+ITERATOR_CHUNK_SIZE = 2000
+
+# Spreadsheet apps run a CSV cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Characters XML 1.0 does not allow, even escaped
+XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+COLUMNS = [
+    ('id', 'Application ID'),
+    ('job_id', 'Job ID'),
+    ('job__title', 'Job Title'),
+    ('job__company_name', 'Company'),
+    ('applicant__email', 'Applicant Email'),
+    ('applicant__first_name', 'First Name'),
+    ('applicant__last_name', 'Last Name'),
+    ('status', 'Status'),
+    ('applied_at', 'Applied At'),
+    ('portfolio_link', 'Portfolio'),
+]
+
+
+def export_queryset(user, params):
+    """
+    Applications visible to `user` filtered by `params` (job, status, applied_after,
+    applied_before). Returns (queryset, errors).
+    """
+    if user.role == 'admin':
+        queryset = Application.objects.all()
+    else:
+        queryset = Application.objects.filter(job__employer_id=user.id)
+
+    filterset = ApplicationExportFilter(params, queryset=queryset)
+    if not filterset.is_valid():
+        return None, filterset.errors
+    return filterset.qs.order_by('id'), None
+
+
+def iter_rows(queryset):
+    """Yield the header followed by one list of strings per application."""
+    yield [label for _, label in COLUMNS]
+    fields = [field for field, _ in COLUMNS]
+    for row in queryset.values_list(*fields).iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield ['' if value is None else value.isoformat() if hasattr(value, 'isoformat') else str(value)
+               for value in row]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    """Quote user text that a spreadsheet would otherwise evaluate (=HYPERLINK(...), @SUM(...))."""
+    return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row]).encode('utf-8')
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def xlsx_text(value):
+    return escape(XML_INVALID.sub('', value))
+
+
+def _iter_sheet(rows):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+    ).encode()
+    for row in rows:
+        cells = ''.join(f'<c t="inlineStr"><is><t>{xlsx_text(value)}</t></is></c>' for value in row)
+        yield f'<row>{cells}</row>'.encode('utf-8')
+    yield b'</sheetData></worksheet>'
+
+
+def iter_xlsx(rows):
+    """Write a minimal single-sheet XLSX workbook incrementally (inline strings, no shared table)."""
+    members = [
+        ('[Content_Types].xml', [XLSX_CONTENT_TYPES.encode()]),
+        ('_rels/.rels', [XLSX_ROOT_RELS.encode()]),
+        ('xl/workbook.xml', [XLSX_WORKBOOK.encode()]),
+        ('xl/_rels/workbook.xml.rels', [XLSX_WORKBOOK_RELS.encode()]),
+        ('xl/worksheets/sheet1.xml', _iter_sheet(rows)),
+    ]
+    return iter_zip(members)
+
+
+def iter_export(rows, file_format):
+    if file_format == XLSX:
+        return iter_xlsx(rows)
+    return iter_csv(rows)
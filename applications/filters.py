@@ -0,0 +1,17 @@
+from django_filters.rest_framework import FilterSet, BaseInFilter, CharFilter, NumberFilter, DateTimeFilter
+from applications.models import Application
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    pass
+
+
+class ApplicationExportFilter(FilterSet):
+    job = NumberFilter(field_name='job_id')
+    status = CharInFilter(field_name='status', lookup_expr='in')
+    applied_after = DateTimeFilter(field_name='applied_at', lookup_expr='gte')
+    applied_before = DateTimeFilter(field_name='applied_at', lookup_expr='lte')
+
+    class Meta:
+        model = Application
+        fields = ['job', 'status', 'applied_after', 'applied_before']
@@ -0,0 +1,160 @@
+"""
+Resume text extraction and the applicant inverted index.
+
+Extraction only relies on the standard library: DOCX files are zip archives
+with a `word/document.xml` part, and PDF text is pulled out of the (usually
+Flate-compressed) content streams. This is good enough for keyword search
+and keeps the serverless bundle small.
+"""
+import math
+import re
+import zipfile
+import zlib
+from collections import Counter
+from xml.etree import ElementTree
+
+from django.db import transaction
+from django.utils import timezone
+
+from applications.models import ResumeDocument, ResumePosting
+
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+MAX_TEXT_LENGTH = 100_000
+MAX_TERM_LENGTH = 64
+
+# Terms declared in the profile `skills` field count more than resume mentions
+SKILL_BOOST = 3
+# Term-frequency saturation constant (BM25 style)
+TF_SATURATION = 1.2
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or our that the their
+this to was were will with you your we i me my he she they them his her not no yes
+""".split())
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.DOTALL)
+PDF_TEXT_RE = re.compile(rb"\((?:\\.|[^\\)])*\)\s*(?:Tj|'|\")|\[(?:[^\]]*)\]\s*TJ", re.DOTALL)
+PDF_STRING_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.DOTALL)
+PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'', b'f': b'', b'(': b'(', b')': b')', b'\\': b'\\'}
+
+
+def tokenize(text):
+    """Lowercase `text` and split it into index terms."""
+    if not text:
+        return []
+    terms = []
+    for token in TOKEN_RE.findall(text.lower()):
+        token = token.rstrip('.')
+        if len(token) < 2 and token not in ('c', 'r'):
+            continue
+        if token in STOP_WORDS or len(token) > MAX_TERM_LENGTH:
+            continue
+        terms.append(token)
+    return terms
+
+
+def _extract_docx(data):
+    with zipfile.ZipFile(data) as archive:
+        with archive.open('word/document.xml') as document:
+            parts = []
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == WORD_NAMESPACE + 't' and element.text:
+                    parts.append(element.text)
+                elif element.tag == WORD_NAMESPACE + 'p':
+                    parts.append('\n')
+                element.clear()
+    return ' '.join(parts)
+
+
+def _unescape_pdf_string(raw):
+    out = bytearray()
+    i = 0
+    while i < len(raw):
+        char = raw[i:i + 1]
+        if char == b'\\' and i + 1 < len(raw):
+            nxt = raw[i + 1:i + 2]
+            if nxt.isdigit():
+                octal = re.match(rb"[0-7]{1,3}", raw[i + 1:i + 4]).group(0)
+                out.append(int(octal, 8) & 0xFF)
+                i += 1 + len(octal)
+                continue
+            out += PDF_ESCAPES.get(nxt, nxt)
+            i += 2
+            continue
+        out += char
+        i += 1
+    return out.decode('latin-1')
+
+
+def _extract_pdf(data):
+    raw = data.read(MAX_RESUME_BYTES)
+    parts = []
+    for match in PDF_STREAM_RE.finditer(raw):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            pass
+        for operator in PDF_TEXT_RE.finditer(stream):
+            strings = PDF_STRING_RE.findall(operator.group(0))
+            parts.append(''.join(_unescape_pdf_string(s) for s in strings))
+    return ' '.join(parts)
+
+
+def extract_text(file_field):
+    """Return the plain text of an uploaded resume (PDF, DOCX or plain text)."""
+    name = (file_field.name or '').lower()
+    with file_field.open('rb') as data:
+        if name.endswith('.docx'):
+            text = _extract_docx(data)
+        elif name.endswith('.pdf'):
+            text = _extract_pdf(data)
+        elif name.endswith('.txt'):
+            text = data.read(MAX_RESUME_BYTES).decode('utf-8', errors='ignore')
+        else:
+            text = ''
+    return text[:MAX_TEXT_LENGTH]
+
+
+def build_postings(application, text):
+    """Build unsaved ResumePosting rows for an application from its resume text and profile."""
+    applicant = application.applicant
+    counts = Counter(tokenize(text))
+    counts.update(tokenize(applicant.experience))
+    for term in tokenize(applicant.skills):
+        counts[term] += SKILL_BOOST
+
+    employer_id = application.job.employer_id
+    return [
+        ResumePosting(
+            application_id=application.id,
+            employer_id=employer_id,
+            term=term,
+            frequency=frequency,
+            weight=frequency / (frequency + TF_SATURATION),
+        )
+        for term, frequency in counts.items()
+    ]
+
+
+def index_application(document, text):
+    """Replace the postings of `document.application` and mark the document indexed."""
+    postings = build_postings(document.application, text)
+    with transaction.atomic():
+        ResumePosting.objects.filter(application_id=document.application_id).delete()
+        ResumePosting.objects.bulk_create(postings, batch_size=1000)
+        document.text = text
+        document.status = ResumeDocument.INDEXED
+        document.error = ''
+        document.locked_at = None
+        document.indexed_at = timezone.now()
+        document.save(update_fields=['text', 'status', 'error', 'locked_at', 'indexed_at'])
+    return len(postings)
+
+
+def inverse_document_frequency(total_documents, document_frequency):
+    return math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
@@ -0,0 +1,131 @@
+import io
+import random
+import time
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from faker import Faker
+
+from accounts.models import User
+from applications.indexing import extract_text, index_application
+from applications.models import Application, ResumeDocument
+from jobs.models import Job
+
+SKILLS = [
+    "python", "django", "drf", "postgresql", "react", "typescript", "docker", "kubernetes", "aws",
+    "gcp", "sql", "excel", "tableau", "figma", "seo", "flutter", "java", "spring", "go", "rust",
+    "c++", "c#", "node.js", "airflow", "spark", "pandas", "linux", "terraform", "redis", "kafka",
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def pdf_resume(lines):
+    """A one-page PDF with a Flate-compressed text stream, the layout most uploaded resumes have."""
+    operators = [b"BT /F1 11 Tf 72 760 Td 14 TL"]
+    for line in lines:
+        text = line.encode('latin-1', errors='replace').replace(b'\\', b'\\\\')
+        operators.append(b"(" + text.replace(b'(', b'\\(').replace(b')', b'\\)') + b") '")
+    operators.append(b"ET")
+    stream = zlib.compress(b"\n".join(operators))
+    return (b"%PDF-1.4\n4 0 obj\n<< /Length " + str(len(stream)).encode() + b" /Filter /FlateDecode >>\n"
+            b"stream\n" + stream + b"\nendstream\nendobj\n%%EOF\n")
+
+
+def docx_resume(lines):
+    paragraphs = ''.join(f'<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{paragraphs}</w:body></w:document>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+
+def txt_resume(lines):
+    return '\n'.join(lines).encode()
+
+
+FORMATS = {'pdf': pdf_resume, 'docx': docx_resume, 'txt': txt_resume}
+
+
+class Command(BaseCommand):
+    help = ("Measure resume indexing throughput on synthetic resumes, through the same extract_text and "
+            "index_application calls the index_resumes worker makes. All rows are rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100_000)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--format', choices=FORMATS, default='pdf', help="Resume file type to generate.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        fake = Faker()
+        Faker.seed(options['seed'])
+        rng = random.Random(options['seed'])
+        total = options['documents']
+        chunk_size = options['chunk_size']
+        render = FORMATS[options['format']]
+        extension = options['format']
+
+        try:
+            with transaction.atomic():
+                employer = User(email='bench-employer@example.invalid', role=User.Employer)
+                employer.set_unusable_password()
+                employer.save()
+                seeker = User(email='bench-seeker@example.invalid', role=User.Job_Seeker,
+                              skills=', '.join(rng.sample(SKILLS, 8)), experience=fake.paragraph())
+                seeker.set_unusable_password()
+                seeker.save()
+                job = Job.objects.create(employer=employer, title='Benchmark', company_name='Benchmark',
+                                         description='Benchmark')
+
+                setup_time = extract_time = index_time = 0.0
+                postings_written = 0
+                for start in range(0, total, chunk_size):
+                    count = min(chunk_size, total - start)
+                    resumes = [
+                        ContentFile(render(fake.paragraphs(nb=6) + [' '.join(rng.sample(SKILLS, 6))]),
+                                    name=f'resume-{start + i}.{extension}')
+                        for i in range(count)
+                    ]
+
+                    t0 = time.perf_counter()
+                    applications = Application.objects.bulk_create(
+                        [Application(job=job, applicant=seeker, resume=f'resumes/benchmark.{extension}')
+                         for _ in range(count)]
+                    )
+                    documents = ResumeDocument.objects.bulk_create(
+                        [ResumeDocument(application=application) for application in applications]
+                    )
+                    setup_time += time.perf_counter() - t0
+
+                    for document, resume in zip(documents, resumes):
+                        # As the worker's select_related('application__applicant', 'application__job') loads it
+                        document.application.applicant = seeker
+                        document.application.job = job
+                        t1 = time.perf_counter()
+                        text = extract_text(resume)
+                        t2 = time.perf_counter()
+                        postings_written += index_application(document, text)
+                        t3 = time.perf_counter()
+                        extract_time += t2 - t1
+                        index_time += t3 - t2
+
+                raise Rollback
+        except Rollback:
+            pass
+
+        elapsed = extract_time + index_time
+        self.stdout.write(f"Documents:        {total} ({extension})")
+        self.stdout.write(f"Postings:         {postings_written}")
+        self.stdout.write(f"Setup time:       {setup_time:.2f}s (not counted)")
+        self.stdout.write(f"Extract time:     {extract_time:.2f}s")
+        self.stdout.write(f"Index time:       {index_time:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Throughput:       {total / elapsed:.0f} resumes/s"))
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from applications.indexing import extract_text, index_application
+from applications.models import Application, ResumeDocument
+from tasks.queue import claim_rows
+
+
+class Command(BaseCommand):
+    help = "Worker that extracts resume text and builds the applicant search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--sleep', type=float, default=5.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--max-attempts', type=int, default=3)
+        parser.add_argument('--lock-timeout', type=int, default=600,
+                            help="Seconds after which a document stuck in processing is claimed again.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--reindex', action='store_true',
+                            help="Queue every application (including ones without a document) before running.")
+
+    def handle(self, *args, **options):
+        if options['reindex']:
+            self.requeue_all()
+
+        while True:
+            documents = self.claim_batch(options['batch_size'], options['lock_timeout'])
+            if not documents:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            for document in documents:
+                self.process(document, options['max_attempts'])
+
+    def requeue_all(self):
+        missing = Application.objects.filter(resume_document__isnull=True).values_list('id', flat=True)
+        ResumeDocument.objects.bulk_create(
+            [ResumeDocument(application_id=application_id) for application_id in missing.iterator()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        queued = ResumeDocument.objects.update(status=ResumeDocument.PENDING, attempts=0, locked_at=None)
+        self.stdout.write(f"Queued {queued} resumes for indexing.")
+
+    def claim_batch(self, batch_size, lock_timeout):
+        return claim_rows(
+            ResumeDocument.objects.select_related('application__applicant', 'application__job'),
+            Q(status=ResumeDocument.PENDING), ResumeDocument.PROCESSING, ('id',), batch_size, lock_timeout,
+        )
+
+    def process(self, document, max_attempts):
+        try:
+            text = extract_text(document.application.resume)
+            terms = index_application(document, text)
+        except Exception as exc:
+            document.status = ResumeDocument.FAILED if document.attempts >= max_attempts else ResumeDocument.PENDING
+            document.error = str(exc)[:1000]
+            document.locked_at = None
+            document.save(update_fields=['status', 'error', 'locked_at'])
+            self.stderr.write(f"Application {document.application_id}: {exc}")
+            return
+        self.stdout.write(f"Indexed application {document.application_id} ({terms} terms)")
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('indexed', 'Indexed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('text', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('indexed_at', models.DateTimeField(blank=True, null=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resume_document', to='applications.application')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='resume_doc_status_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumePosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('weight', models.FloatField(default=0)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_postings', to='applications.application')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employer', 'term'], name='resume_posting_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('application', 'term'), name='unique_resume_posting_term')],
+            },
+        ),
+    ]
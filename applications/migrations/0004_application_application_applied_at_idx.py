@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_application_export'),
+        ('jobs', '0002_job_job_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applied_at'], name='application_applied_at_idx'),
+        ),
+    ]
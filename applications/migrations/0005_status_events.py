@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_events(apps, schema_editor):
+    """Log each existing application as submitted plus, if it has moved on, its current status."""
+    from django.db.models import OuterRef, Subquery
+
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatusEvent = apps.get_model('applications', 'ApplicationStatusEvent')
+    events = []
+    for application_id, job_id, status in Application.objects.order_by('id').values_list('id', 'job_id', 'status').iterator():
+        events.append(ApplicationStatusEvent(application_id=application_id, job_id=job_id, to_status='pending'))
+        if status != 'pending':
+            events.append(ApplicationStatusEvent(application_id=application_id, job_id=job_id,
+                                                 from_status='pending', to_status=status))
+        if len(events) >= 1000:
+            ApplicationStatusEvent.objects.bulk_create(events)
+            events = []
+    ApplicationStatusEvent.objects.bulk_create(events)
+    # The transition times are unknown; date everything at the application date
+    ApplicationStatusEvent.objects.update(created_at=Subquery(
+        Application.objects.filter(pk=OuterRef('application_id')).values('applied_at')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_application_application_applied_at_idx'),
+        ('jobs', '0002_job_job_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=50)),
+                ('to_status', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='applications.application')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'created_at'], name='status_event_job_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+def mark_rolled_up(apps, schema_editor):
+    """Events up to the funnel's old id checkpoint are already in JobFunnelDay."""
+    RollupCheckpoint = apps.get_model('dashboard', 'RollupCheckpoint')
+    ApplicationStatusEvent = apps.get_model('applications', 'ApplicationStatusEvent')
+    last_id = RollupCheckpoint.objects.filter(name='job_funnel').values_list('last_id', flat=True).first()
+    if last_id:
+        ApplicationStatusEvent.objects.filter(id__lte=last_id).update(rolled_up=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_status_events'),
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationstatusevent',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_rolled_up, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='applicationstatusevent',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['created_at'], name='status_event_unrolled_idx'),
+        ),
+    ]
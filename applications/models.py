@@ -31,5 +31,130 @@ class Application(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default=PENDING)
 
+    # Shown on the cached dashboards; dashboard.signals ignores saves that change none of them
+    DASHBOARD_FIELDS = ('job_id', 'applicant_id', 'status', 'applied_at')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['applied_at'], name='application_applied_at_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so a save can be logged as a status transition
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_dashboard = tuple(instance.__dict__.get(field) for field in cls.DASHBOARD_FIELDS)
+        return instance
+
+    def __str__(self):
+        return f"Application of {self.applicant.email} for {self.job.title}"
+
+
+class ApplicationStatusEvent(models.Model):
+    """
+    Append-only log of application status transitions. `from_status` is blank
+    for the initial submission. Rolled up into dashboard.JobFunnelDay;
+    `rolled_up` is set in the same transaction that adds the event there.
+    """
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_events')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    from_status = models.CharField(max_length=50, blank=True)
+    to_status = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rolled_up = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'created_at'], name='status_event_job_idx'),
+            # The few events not yet rolled up, read on every funnel query
+            models.Index(fields=['created_at'], condition=models.Q(rolled_up=False), name='status_event_unrolled_idx'),
+        ]
+
+    def __str__(self):
+        return f"Application {self.application_id}: {self.from_status or 'new'} -> {self.to_status}"
+
+class ResumeDocument(models.Model):
+    """
+    Queue entry and extracted text for an application's resume.
+    Rows are created on apply and picked up by the `index_resumes` worker.
+    """
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    INDEXED = 'indexed'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (INDEXED, 'Indexed'),
+        (FAILED, 'Failed'),
+    ]
+
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name='resume_document')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    text = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    indexed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='resume_doc_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Resume document for application {self.application_id} ({self.status})"
+
+
+class ResumePosting(models.Model):
+    """
+    Inverted index entry: one row per (application, term).
+    `employer` is denormalized from the job so searches never join through jobs.
+    """
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='resume_postings')
+    employer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField(default=1)
+    weight = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'term'], name='unique_resume_posting_term')
+        ]
+        indexes = [
+            models.Index(fields=['employer', 'term'], name='resume_posting_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> application {self.application_id}"
+
+
+class ApplicationExport(models.Model):
+    """An export handed to the background worker; `file` holds the result when completed."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='application_exports')
+    file_format = models.CharField(max_length=10, default='csv')
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to='exports/', blank=True, null=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
-        return f"Application of {self.applicant.email} for {self.job.title}"
\ No newline at end of file
+        return f"Export {self.id} by {self.requested_by_id} ({self.status})"
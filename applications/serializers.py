@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from applications.models import Application
+from applications.models import Application, ApplicationExport
+from applications.exports import CSV, FORMATS
 
 class ApplicationSerializer(serializers.ModelSerializer):
     applicant = serializers.StringRelatedField(read_only=True)
@@ -11,3 +12,41 @@ class ApplicationSerializer(serializers.ModelSerializer):
                   'portfolio_link', 'applied_at', 'status']
         
         read_only_fields = ['applied_at', 'status']
+
+
+class ApplicantSearchResultSerializer(serializers.Serializer):
+    application_id = serializers.IntegerField()
+    job_id = serializers.IntegerField()
+    job_title = serializers.CharField()
+    applicant_id = serializers.IntegerField()
+    applicant_email = serializers.EmailField()
+    applicant_name = serializers.CharField()
+    skills = serializers.CharField(allow_null=True)
+    status = serializers.CharField()
+    score = serializers.FloatField()
+    matched_terms = serializers.IntegerField()
+
+
+class ApplicationExportRequestSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=FORMATS, default=CSV)
+    job = serializers.CharField(required=False)
+    status = serializers.CharField(required=False, help_text="Comma separated, e.g. interviewed,offered")
+    applied_after = serializers.CharField(required=False)
+    applied_before = serializers.CharField(required=False)
+
+
+class ApplicationExportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ApplicationExport
+        fields = ['id', 'file_format', 'filters', 'status', 'row_count', 'error',
+                  'created_at', 'completed_at', 'download_url']
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != ApplicationExport.COMPLETED or not obj.file:
+            return None
+        request = self.context.get('request')
+        url = obj.file.url
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from applications.models import Application, ApplicationStatusEvent, ResumeDocument
+
+
+@receiver(post_save, sender=Application)
+def queue_resume_indexing(sender, instance, created, **kwargs):
+    # Text extraction is slow, so the apply request only enqueues it for the index_resumes worker
+    if created:
+        ResumeDocument.objects.create(application=instance)
+
+
+@receiver(post_save, sender=Application)
+def log_status_transition(sender, instance, created, **kwargs):
+    previous = '' if created else getattr(instance, '_loaded_status', None)
+    if previous is not None and previous != instance.status:
+        ApplicationStatusEvent.objects.create(
+            application=instance, job_id=instance.job_id, from_status=previous, to_status=instance.status
+        )
+    instance._loaded_status = instance.status
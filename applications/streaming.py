@@ -0,0 +1,108 @@
+"""
+Streaming ZIP archives built entry by entry.
+
+`zipfile` supports unseekable output: it writes each member with a data
+descriptor, so the archive can be yielded to the client while it is being
+built. Files are fetched from storage by a bounded thread pool and only a
+fixed window of them is held in memory at any time.
+"""
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _StreamBuffer:
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(members, compression=zipfile.ZIP_DEFLATED):
+    """
+    Yield a ZIP archive built from `members`, an iterable of (arcname, chunks)
+    where `chunks` is an iterable of bytes. Members are consumed lazily.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=compression) as archive:
+        for arcname, chunks in members:
+            with archive.open(arcname, mode='w') as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory is written when the archive closes
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def _read_file(name, storage):
+    with storage.open(name, 'rb') as fh:
+        return fh.read()
+
+
+def _split(data):
+    for offset in range(0, len(data), CHUNK_SIZE):
+        yield data[offset:offset + CHUNK_SIZE]
+
+
+def _fetched_members(entries, storage, executor, window):
+    pending = deque()
+    errors = []
+    entries = iter(entries)
+
+    def fill():
+        while len(pending) < window:
+            try:
+                arcname, name = next(entries)
+            except StopIteration:
+                return
+            pending.append((arcname, name, executor.submit(_read_file, name, storage)))
+
+    fill()
+    while pending:
+        arcname, name, future = pending.popleft()
+        fill()
+        try:
+            data = future.result()
+        except Exception as exc:
+            errors.append(f"{arcname}: {name} could not be read ({exc})")
+            continue
+        yield arcname, _split(data)
+
+    if errors:
+        yield 'errors.txt', [('\n'.join(errors) + '\n').encode()]
+
+
+def stream_zip(entries, storage=None, max_workers=4, window=8):
+    """
+    Yield a ZIP archive containing `entries`, an iterable of (arcname, storage_name).
+
+    At most `window` files are fetched ahead of the writer, so memory use depends on
+    the window and file sizes, never on the number of entries.
+    """
+    storage = storage or default_storage
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from iter_zip(_fetched_members(entries, storage, executor, window))
@@ -0,0 +1,43 @@
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+
+from applications.exports import export_queryset, iter_export, iter_rows
+from applications.models import ApplicationExport
+from tasks.queue import task
+
+
+@task('applications.export', max_attempts=3)
+def export_applications(export_id):
+    export = ApplicationExport.objects.select_related('requested_by').get(pk=export_id)
+    export.status = ApplicationExport.RUNNING
+    export.save(update_fields=['status'])
+
+    try:
+        queryset, errors = export_queryset(export.requested_by, export.filters)
+        if errors:
+            raise ValueError(errors)
+
+        def counted(rows):
+            export.row_count = 0
+            yield next(rows)  # header
+            for row in rows:
+                export.row_count += 1
+                yield row
+
+        with tempfile.TemporaryFile() as tmp:
+            for chunk in iter_export(counted(iter_rows(queryset)), export.file_format):
+                tmp.write(chunk)
+            tmp.seek(0)
+            name = f"applications-{export.id}.{export.file_format}"
+            export.file.save(name, File(tmp, name=name), save=False)
+    except Exception as exc:
+        export.status = ApplicationExport.FAILED
+        export.error = str(exc)[:2000]
+        export.save(update_fields=['status', 'error'])
+        raise
+
+    export.status = ApplicationExport.COMPLETED
+    export.completed_at = timezone.now()
+    export.save(update_fields=['file', 'row_count', 'status', 'completed_at'])
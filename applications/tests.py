@@ -1,3 +1,143 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+import zipfile
+from xml.etree import ElementTree
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from applications.models import Application, ApplicationExport
+from jobs.models import Job
+from tasks.models import Task
 
 # Create your tests here.
+
+
+class ApplicantSearchTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_non_numeric_job_is_rejected(self):
+        response = self.client.get('/api/v1/applicants/', {'q': 'python', 'job': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('job', response.data)
+
+    def test_numeric_job_filters(self):
+        response = self.client.get('/api/v1/applicants/', {'q': 'python', 'job': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+
+class ResumesZipTests(TestCase):
+    files = 1000
+    file_size = 32 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        cls.job = Job.objects.create(employer=cls.employer, title='Engineer', company_name='Acme', description='x')
+        seekers = User.objects.bulk_create(
+            [User(email=f'seeker{i}@example.com', role=User.Job_Seeker)
+             for i in range(cls.files)]
+        )
+        Application.objects.bulk_create(
+            [Application(job=cls.job, applicant=seeker, resume=f'resumes/{i}.pdf') for i, seeker in enumerate(seekers)]
+        )
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.mkdir(os.path.join(self.media_root, 'resumes'))
+        for i in range(self.files):
+            with open(os.path.join(self.media_root, 'resumes', f'{i}.pdf'), 'wb') as fh:
+                fh.write(os.urandom(self.file_size))
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_peak_memory_does_not_grow_with_archive_size(self):
+        total = self.files * self.file_size
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = self.client.get(f'/api/v1/jobs/{self.job.id}/applications/resumes.zip/')
+            self.assertEqual(response.status_code, 200)
+            tracemalloc.start()
+            try:
+                streamed = sum(len(chunk) for chunk in response.streaming_content)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertGreater(streamed, total)
+        # A bounded window of files in flight, not the archive
+        self.assertLess(peak, total / 8, f"peak {peak / 1024:.0f} KiB for a {total / 1024:.0f} KiB archive")
+
+
+class ApplicationExportTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_get_streams_without_queueing(self):
+        response = self.client.get('/api/v1/application-exports/', {'async': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines()[0].split(',')[0],
+                         'Application ID')
+        self.assertFalse(ApplicationExport.objects.exists())
+        self.assertFalse(Task.objects.filter(name='applications.export').exists())
+
+    def test_post_queues_export(self):
+        response = self.client.post('/api/v1/application-exports/',
+                                    {'file_format': 'xlsx', 'status': 'accepted'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        export = ApplicationExport.objects.get(pk=response.data['id'])
+        self.assertEqual((export.file_format, export.filters), ('xlsx', {'status': 'accepted'}))
+        self.assertEqual(Task.objects.get(name='applications.export').payload, {'export_id': export.id})
+
+        status = self.client.get(f'/api/v1/application-exports/{export.id}/')
+        self.assertEqual(status.data['status'], ApplicationExport.PENDING)
+
+    def test_post_validates_filters(self):
+        response = self.client.post('/api/v1/application-exports/', {'applied_after': 'soon'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ApplicationExport.objects.exists())
+
+
+class ExportEscapingTests(TestCase):
+    """Applicant-supplied text can't run as a formula or break the workbook."""
+
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        seeker = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker,
+                                          first_name='=HYPERLINK("http://evil.example","x")', last_name='@SUM(A1)')
+        job = Job.objects.create(employer=self.employer, title='Engineer', company_name='Acme', description='x')
+        Application.objects.create(job=job, applicant=seeker, resume='resumes/r.pdf',
+                                   portfolio_link='+cmd|\x01bell\x07|tab\x0b')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def export(self, file_format):
+        response = self.client.get('/api/v1/application-exports/', {'file_format': file_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_formulas_are_quoted(self):
+        header, row = csv.reader(io.StringIO(self.export('csv').decode()))
+        row = dict(zip(header, row))
+        self.assertEqual(row['First Name'], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row['Last Name'], "'@SUM(A1)")
+        self.assertTrue(row['Portfolio'].startswith("'+cmd"))
+        self.assertEqual(row['Applicant Email'], 'seeker@example.com')
+
+    def test_xlsx_drops_characters_xml_forbids(self):
+        with zipfile.ZipFile(io.BytesIO(self.export('xlsx'))) as workbook:
+            sheet = ElementTree.fromstring(workbook.read('xl/worksheets/sheet1.xml'))
+        texts = [node.text for node in sheet.iter('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}t')]
+        self.assertIn('+cmd|bell|tab', texts)
+        self.assertIn('=HYPERLINK("http://evil.example","x")', texts)
@@ -1,13 +1,25 @@
+import os
 from django.forms import ValidationError
-from rest_framework.viewsets import ModelViewSet
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
-from applications.models import Application
-from applications.serializers import ApplicationSerializer
+from rest_framework.exceptions import ValidationError as APIValidationError
+from applications.models import Application, ApplicationExport, ResumePosting
+from applications.serializers import (
+    ApplicationSerializer, ApplicantSearchResultSerializer, ApplicationExportSerializer, ApplicationExportRequestSerializer
+)
 from applications.permissions import IsJobSeekerOrReadOnly
+from applications.indexing import tokenize, inverse_document_frequency
+from applications.streaming import stream_zip
+from applications import exports
+from tasks.queue import enqueue
 from jobs.models import Job
+from jobs.paginations import DefaultPagination
 from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
@@ -21,6 +33,7 @@ class ApplicationViewSet(ModelViewSet):
     """
     serializer_class = ApplicationSerializer
     permission_classes = [IsAuthenticated, IsJobSeekerOrReadOnly]
+    token_user_reads = True
 
     def get_queryset(self):
         # Avoid executing logic during drf_yasg schema generation
@@ -32,17 +45,21 @@ class ApplicationViewSet(ModelViewSet):
         if not user.is_authenticated:
             return Application.objects.none()
 
+        # The job is loaded with the application: the serializer shows it and the
+        # dashboard signals read its employer on save
+        applications = Application.objects.select_related("job")
+
         # Job seekers see only their own applications
         if getattr(user, "role", None) == "seeker":
-            return Application.objects.filter(applicant=user)
+            return applications.filter(applicant_id=user.id)
 
         # Employers see applications to their own jobs
         if getattr(user, "role", None) == "employer":
-            return Application.objects.filter(job__employer=user)
+            return applications.filter(job__employer_id=user.id)
 
         # Admin sees everything
         if getattr(user, "role", None) == "admin":
-            return Application.objects.all()
+            return applications.all()
 
         return Application.objects.none()
 
@@ -98,3 +115,189 @@ class ApplicationViewSet(ModelViewSet):
         application.status = "withdrawn"
         application.save()
         return Response({"detail": "Application successfully withdrawn."})
+
+    @swagger_auto_schema(
+        operation_summary="Download all resumes for a job as a ZIP",
+        operation_description="Streams a ZIP archive of every resume submitted to the job. "
+                              "Optional `status` filter, e.g. ?status=interviewed,offered"
+    )
+    @action(detail=False, methods=["get"], url_path="resumes.zip")
+    def resumes_zip(self, request, job_pk=None):
+        user = request.user
+        job = get_object_or_404(Job.objects.only("id", "employer_id"), pk=job_pk)
+
+        if getattr(user, "role", None) == "employer" and job.employer_id != user.id:
+            raise PermissionDenied("You can only download resumes for your own jobs.")
+        elif getattr(user, "role", None) not in ["employer", "admin"]:
+            raise PermissionDenied("Only employers or admins can download resumes.")
+
+        applications = Application.objects.filter(job_id=job.id).exclude(resume="")
+        status_param = request.query_params.get("status")
+        if status_param:
+            statuses = [value.strip() for value in status_param.split(",") if value.strip()]
+            valid = {choice for choice, _ in Application.STATUS_CHOICES}
+            invalid = [value for value in statuses if value not in valid]
+            if invalid:
+                raise APIValidationError({"status": f"Unknown status: {', '.join(invalid)}"})
+            applications = applications.filter(status__in=statuses)
+
+        rows = applications.order_by("id").values_list("id", "resume", "applicant__email")
+        entries = (
+            (f"{application_id}_{email.split('@')[0]}{os.path.splitext(resume)[1]}", resume)
+            for application_id, resume, email in rows.iterator(chunk_size=500)
+        )
+
+        response = StreamingHttpResponse(stream_zip(entries), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="job-{job.id}-resumes.zip"'
+        return response
+
+
+class ApplicantSearchViewSet(GenericViewSet):
+    """
+    Ranked keyword search over the applicants of the current employer's jobs.
+    Admins search across all employers. Backed by the resume inverted index.
+    """
+    serializer_class = ApplicantSearchResultSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = DefaultPagination
+    max_query_terms = 20
+    token_user_reads = True
+
+    @swagger_auto_schema(
+        operation_summary="Search applicants by skill",
+        operation_description="Example: /applicants/?q=django postgresql&job=12. "
+                              "Results are ranked by BM25-style relevance over resume text, skills and experience."
+    )
+    def list(self, request):
+        user = request.user
+        role = getattr(user, "role", None)
+        if role not in ["employer", "admin"]:
+            raise PermissionDenied("Only employers or admins can search applicants.")
+
+        terms = list(dict.fromkeys(tokenize(request.query_params.get("q", ""))))[:self.max_query_terms]
+        if not terms:
+            raise APIValidationError({"q": "Provide at least one search term."})
+
+        postings = ResumePosting.objects.filter(term__in=terms)
+        applications = Application.objects.all()
+        if role == "employer":
+            postings = postings.filter(employer_id=user.id)
+            applications = applications.filter(job__employer_id=user.id)
+
+        job_id = request.query_params.get("job")
+        if job_id:
+            try:
+                job_id = int(job_id)
+            except ValueError:
+                raise APIValidationError({"job": "Must be a job id."})
+            postings = postings.filter(application__job_id=job_id)
+            applications = applications.filter(job_id=job_id)
+
+        total_documents = applications.count()
+        document_frequency = dict(postings.values_list("term").annotate(df=Count("id")))
+        idf = Case(
+            *[When(term=term, then=Value(inverse_document_frequency(total_documents, df)))
+              for term, df in document_frequency.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+        ranked = (
+            postings.values("application_id")
+            .annotate(score=Sum(F("weight") * idf, output_field=FloatField()), matched_terms=Count("id"))
+            .order_by("-score", "-application_id")
+        )
+        page = self.paginate_queryset(ranked)
+        matches = Application.objects.select_related("applicant", "job").in_bulk(
+            [row["application_id"] for row in page]
+        )
+
+        results = []
+        for row in page:
+            application = matches[row["application_id"]]
+            applicant = application.applicant
+            results.append({
+                "application_id": application.id,
+                "job_id": application.job_id,
+                "job_title": application.job.title,
+                "applicant_id": applicant.id,
+                "applicant_email": applicant.email,
+                "applicant_name": applicant.get_full_name(),
+                "skills": applicant.skills,
+                "status": application.status,
+                "score": round(row["score"], 4),
+                "matched_terms": row["matched_terms"],
+            })
+
+        serializer = self.get_serializer(results, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ApplicationExportViewSet(GenericViewSet):
+    """
+    Reporting exports of applications for employers (their own jobs) and admins.
+    - GET /application-exports/ streams the export directly.
+    - POST /application-exports/ queues it and returns a job to poll.
+    - GET /application-exports/{id}/ shows a queued export and its download link.
+    """
+    serializer_class = ApplicationExportSerializer
+    permission_classes = [IsAuthenticated]
+    filter_params = ["job", "status", "applied_after", "applied_before"]
+    token_user_reads = True
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ApplicationExport.objects.none()
+        return ApplicationExport.objects.filter(requested_by_id=self.request.user.id)
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if getattr(request.user, "role", None) not in ["employer", "admin"]:
+            raise PermissionDenied("Only employers or admins can export applications.")
+
+    @swagger_auto_schema(
+        operation_summary="Export applications as CSV or XLSX",
+        operation_description="Filters: job, status (comma separated), applied_after, applied_before. "
+                              "Use file_format=csv|xlsx; POST very large exports to run them in the background."
+    )
+    def list(self, request):
+        file_format = request.query_params.get("file_format", exports.CSV)
+        if file_format not in exports.FORMATS:
+            raise APIValidationError({"file_format": f"Choose one of: {', '.join(exports.FORMATS)}."})
+
+        queryset, errors = exports.export_queryset(request.user, request.query_params)
+        if errors:
+            raise APIValidationError(errors)
+
+        response = StreamingHttpResponse(
+            exports.iter_export(exports.iter_rows(queryset), file_format),
+            content_type=exports.CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="applications.{file_format}"'
+        return response
+
+    @swagger_auto_schema(
+        operation_summary="Queue an export for the background worker",
+        operation_description="Same filters as the streaming export, in the body. Poll the returned export for its download link.",
+        request_body=ApplicationExportRequestSerializer,
+        responses={202: ApplicationExportSerializer},
+    )
+    def create(self, request):
+        serializer = ApplicationExportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = {key: serializer.validated_data[key] for key in self.filter_params if key in serializer.validated_data}
+        _, errors = exports.export_queryset(request.user, filters)
+        if errors:
+            raise APIValidationError(errors)
+
+        export = ApplicationExport.objects.create(
+            requested_by_id=request.user.id, file_format=serializer.validated_data["file_format"], filters=filters
+        )
+        enqueue("applications.export", export_id=export.id)
+        return Response(self.get_serializer(export).data, status=202)
+
+    @swagger_auto_schema(operation_summary="Get a queued export and its download link")
+    def retrieve(self, request, pk=None):
+        export = get_object_or_404(self.get_queryset(), pk=pk)
+        serializer = self.get_serializer(export)
+        return Response(serializer.data)
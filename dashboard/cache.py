@@ -0,0 +1,84 @@
+"""
+Per-user dashboard response cache.
+
+Entries are keyed by role, owner and a per-owner version. Signals bump the
+version when the owner's jobs or applications change (see dashboard.signals),
+which makes the old entry unreachable instead of deleting it. Within the hard
+TTL a stale entry is still served while a single request (holding a short
+lock) rebuilds it, so a burst of polling clients never stampedes the database.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PREFIX = 'dashboard'
+ADMIN_OWNER = 'admin'
+STATS_KEYS = ('hit', 'stale', 'miss')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _owner(role, user_id):
+    # Admins all see the same platform-wide dashboard
+    return ADMIN_OWNER if role == 'admin' else user_id
+
+
+def _version_key(owner):
+    return f'{PREFIX}:ver:{owner}'
+
+
+def get_version(owner):
+    return cache.get(_version_key(owner), 0)
+
+
+def bump_versions(*owners):
+    """Invalidate the cached dashboards of `owners` (user ids, or ADMIN_OWNER)."""
+    version = time.time_ns()
+    timeout = _setting('DASHBOARD_CACHE_STALE_TTL', 300) * 2
+    cache.set_many({_version_key(owner): version for owner in owners if owner is not None}, timeout=timeout)
+
+
+def _record(outcome):
+    key = f'{PREFIX}:stats:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_or_build(role, user_id, build):
+    """Return the cached dashboard payload for this user, calling `build()` when needed."""
+    fresh_ttl = _setting('DASHBOARD_CACHE_TTL', 30)
+    stale_ttl = _setting('DASHBOARD_CACHE_STALE_TTL', 300)
+    owner = _owner(role, user_id)
+    key = f'{PREFIX}:data:{role}:{owner}:{get_version(owner)}'
+
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None:
+        if entry['fresh_until'] > now:
+            _record('hit')
+            return entry['payload']
+        # Stale: one request rebuilds, everyone else keeps getting the stale copy
+        if not cache.add(f'{key}:lock', 1, timeout=max(fresh_ttl, 5)):
+            _record('stale')
+            return entry['payload']
+
+    _record('miss')
+    payload = build()
+    cache.set(key, {'payload': payload, 'fresh_until': now + fresh_ttl}, timeout=stale_ttl)
+    cache.delete(f'{key}:lock')
+    return payload
+
+
+def cache_stats():
+    counts = cache.get_many([f'{PREFIX}:stats:{outcome}' for outcome in STATS_KEYS])
+    stats = {outcome: counts.get(f'{PREFIX}:stats:{outcome}', 0) for outcome in STATS_KEYS}
+    total = sum(stats.values())
+    stats['requests'] = total
+    stats['hit_rate'] = round((stats['hit'] + stats['stale']) / total, 4) if total else None
+    return stats
@@ -0,0 +1,52 @@
+"""
+Current-state counters for the admin dashboard.
+
+Users per role, jobs and applications per status are kept in PlatformCounter
+rows by dashboard.signals. Like the rating summaries, they use F() updates in
+the writer's transaction, so the admin dashboard reads a few rows instead of
+counting three tables. A metric's total is the sum of its dimensions, so
+creating an application updates one row, not two.
+`reconcile_dashboard_counters` rebuilds the rows from the tables if they
+drift (bulk_create and queryset updates send no signals).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from dashboard.models import PlatformCounter
+
+USERS = 'users'
+JOBS = 'jobs'
+APPLICATIONS = 'applications'
+
+
+def adjust(changes):
+    """Apply {(metric, dimension): delta} to the counters."""
+    with transaction.atomic():
+        for (metric, dimension), delta in changes.items():
+            if not delta:
+                continue
+            counter = PlatformCounter.objects.filter(metric=metric, dimension=dimension)
+            # Only create on add: a cascade may remove what was never counted
+            if not counter.update(value=F('value') + delta) and delta > 0:
+                PlatformCounter.objects.bulk_create([PlatformCounter(metric=metric, dimension=dimension)],
+                                                    ignore_conflicts=True)
+                counter.update(value=F('value') + delta)
+
+
+def current_counts():
+    """{metric: {dimension: value}} in one query."""
+    counts = defaultdict(dict)
+    for metric, dimension, value in PlatformCounter.objects.values_list('metric', 'dimension', 'value'):
+        counts[metric][dimension] = value
+    return counts
+
+
+def count_from_tables(User, Job, Application):
+    """{(metric, dimension): value} counted from the tables (models passed in for migrations)."""
+    counts = {(JOBS, ''): Job.objects.count()}
+    for metric, model, field in ((USERS, User, 'role'), (APPLICATIONS, Application, 'status')):
+        for dimension, value in model.objects.order_by().values_list(field).annotate(Count('pk')):
+            counts[(metric, dimension or '')] = value
+    return counts
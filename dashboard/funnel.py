@@ -0,0 +1,148 @@
+"""
+Hiring funnel (view -> apply -> interview -> offer -> accept) analytics.
+
+Application status transitions are logged to ApplicationStatusEvent and
+rolled up per job and day into JobFunnelDay by `rollup_funnel`, which marks
+each event it folds in. Queries read the rollups and add the few events
+not rolled up yet in the same statement, so they never scan applications.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from applications.models import ApplicationStatusEvent
+from dashboard.rollups import claim_unrolled, start_of_day
+from dashboard.models import JobFunnelDay, RollupCheckpoint
+from jobs.models import Job
+
+CHECKPOINT = 'job_funnel'
+STAGES = ('views', 'applied', 'reviewed', 'interviewed', 'offered', 'accepted', 'rejected', 'withdrawn')
+EVENT_STAGES = STAGES[1:]
+CONVERSIONS = (
+    ('view_to_apply', 'views', 'applied'),
+    ('apply_to_interview', 'applied', 'interviewed'),
+    ('interview_to_offer', 'interviewed', 'offered'),
+    ('offer_to_accept', 'offered', 'accepted'),
+)
+# group_by -> (JobFunnelDay field, ApplicationStatusEvent expression)
+GROUPINGS = {
+    'job': ('job_id', F('job_id')),
+    'category': ('job__category_id', F('job__category_id')),
+    'day': ('day', TruncDate('created_at')),
+}
+
+
+def record_job_view(job_id):
+    """Count a job detail view on the job and in today's funnel row."""
+    Job.objects.filter(pk=job_id).update(views_count=F('views_count') + 1)
+    today = timezone.localdate()
+    if JobFunnelDay.objects.filter(job_id=job_id, day=today).update(views=F('views') + 1):
+        return
+    try:
+        with transaction.atomic():
+            JobFunnelDay.objects.create(job_id=job_id, day=today, views=1)
+    except IntegrityError:
+        # Another request created today's row first
+        JobFunnelDay.objects.filter(job_id=job_id, day=today).update(views=F('views') + 1)
+
+
+def _stage_expression():
+    # The initial submission is the "applied" stage; later transitions use the new status
+    return Case(When(from_status='', then=Value('applied')), default=F('to_status'), output_field=CharField())
+
+
+def rollup_funnel(batch_size=10000):
+    """Fold events not rolled up yet into JobFunnelDay, one batch per transaction."""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            # Serializes rollups, so two runs never create the same JobFunnelDay row
+            RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT)
+            batch = claim_unrolled(ApplicationStatusEvent, batch_size)
+            counts = defaultdict(lambda: dict.fromkeys(EVENT_STAGES, 0))
+            claimed = 0
+            rows = (
+                batch.annotate(day=TruncDate('created_at'), stage=_stage_expression())
+                .values('job_id', 'day', 'stage')
+                .annotate(value=Count('pk'))
+            )
+            for row in rows:
+                if row['stage'] in EVENT_STAGES:
+                    counts[(row['job_id'], row['day'])][row['stage']] += row['value']
+                claimed += row['value']
+            if not claimed:
+                return processed
+            processed += claimed
+
+            existing = {
+                (day.job_id, day.day): day
+                for day in JobFunnelDay.objects.select_for_update().filter(
+                    job_id__in={job_id for job_id, _ in counts}, day__in={day for _, day in counts})
+            }
+            created, updated = [], []
+            for (job_id, day), stages in counts.items():
+                funnel_day = existing.get((job_id, day))
+                if funnel_day is None:
+                    created.append(JobFunnelDay(job_id=job_id, day=day, **stages))
+                    continue
+                for stage, value in stages.items():
+                    setattr(funnel_day, stage, getattr(funnel_day, stage) + value)
+                updated.append(funnel_day)
+
+            JobFunnelDay.objects.bulk_create(created, batch_size=1000)
+            JobFunnelDay.objects.bulk_update(updated, EVENT_STAGES, batch_size=1000)
+
+
+def _conversions(stages):
+    return {
+        name: round(stages[after] / stages[before], 4) if stages[before] else None
+        for name, before, after in CONVERSIONS
+    }
+
+
+def build_funnel(since_day, employer_id=None, job_id=None, category_id=None, group_by=None):
+    """
+    Funnel counts and conversion rates from `since_day` to today, optionally
+    grouped by job, category or day. One UNION of the rollups and the events
+    not rolled up yet, so a rollup committing meanwhile is seen whole or not at all.
+    """
+    funnel_days = JobFunnelDay.objects.filter(day__gte=since_day)
+    events = ApplicationStatusEvent.objects.filter(rolled_up=False, created_at__gte=start_of_day(since_day))
+    for lookup, value in (('job__employer_id', employer_id), ('job_id', job_id), ('job__category_id', category_id)):
+        if value is not None:
+            funnel_days = funnel_days.filter(**{lookup: value})
+            events = events.filter(**{lookup: value})
+
+    if group_by:
+        field, expression = GROUPINGS[group_by]
+        funnel_days = funnel_days.annotate(group=F(field))
+        events = events.annotate(group=expression)
+    else:
+        funnel_days = funnel_days.annotate(group=Value(None, output_field=CharField()))
+        events = events.annotate(group=Value(None, output_field=CharField()))
+
+    totals = [f'total_{stage}' for stage in STAGES]
+    rolled = funnel_days.order_by().values('group').annotate(
+        **{f'total_{stage}': Sum(stage) for stage in STAGES}
+    ).values_list('group', *totals)
+    live = events.annotate(stage=_stage_expression()).order_by().values('group').annotate(
+        total_views=Value(0, output_field=IntegerField()),
+        **{f'total_{stage}': Count('pk', filter=Q(stage=stage)) for stage in EVENT_STAGES},
+    ).values_list('group', *totals)
+
+    groups = defaultdict(lambda: dict.fromkeys(STAGES, 0))
+    if not group_by:
+        groups[None] = dict.fromkeys(STAGES, 0)
+    for key, *values in rolled.union(live, all=True):
+        counts = groups[key]
+        for stage, value in zip(STAGES, values):
+            counts[stage] += value or 0
+
+    results = [
+        {'key': key, 'stages': stages, 'conversion': _conversions(stages)}
+        for key, stages in sorted(groups.items(), key=lambda item: (item[0] is None, str(item[0])))
+    ]
+    return {'start': since_day, 'end': timezone.localdate(), 'group_by': group_by, 'results': results}
@@ -0,0 +1,95 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from applications.models import Application
+from dashboard.rollups import metric_totals
+from dashboard.views import DashboardViewSet
+from jobs.models import Job
+
+# Maximum queries per uncached dashboard build
+QUERY_BUDGETS = {
+    'admin': 4,      # counters, revenue union, recent jobs, recent applications
+    'employer': 3,   # conditional aggregate, revenue union, top jobs
+    'seeker': 3,     # conditional aggregate, recently applied, recommendations
+}
+
+
+def live_stats(days):
+    since = timezone.now() - timedelta(days=days)
+    return (Job.objects.filter(created_at__gte=since).count(),
+            Application.objects.filter(applied_at__gte=since).count())
+
+
+def rollup_stats(days):
+    return metric_totals(['jobs', 'applications'], since_day=timezone.localdate() - timedelta(days=days))
+
+
+def dashboard_builder(role, user):
+    request = APIRequestFactory().get('/api/v1/dashboard/')
+    request.user = user
+    view = DashboardViewSet()
+    return getattr(view, f'{role}_dashboard'), request
+
+
+def busiest_users():
+    """The admin, the employer with most applications and the seeker with most applications."""
+    return {
+        'admin': User.objects.filter(role='admin').first(),
+        'employer': User.objects.filter(role='employer')
+        .annotate(n=Count('jobs__applications')).order_by('-n').first(),
+        'seeker': User.objects.filter(role='seeker')
+        .annotate(n=Count('applications')).order_by('-n').first(),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Compare windowed stats computed live against the daily rollups, and time the uncached "
+            "per-role dashboards against their query budgets, on the current database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--days', type=int, default=365, help="Window used for the stats comparison.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Applications in database: {Application.objects.count()}")
+        cases = [
+            (f"stats days={options['days']} (live)", lambda: live_stats(options['days'])),
+            (f"stats days={options['days']} (rollup)", lambda: rollup_stats(options['days'])),
+        ]
+        for label, func in cases:
+            self.time_case(label, func, options['iterations'])
+
+        over_budget = []
+        for role, user in busiest_users().items():
+            if user is None:
+                self.stdout.write(f"{role} dashboard: no {role} user, skipped")
+                continue
+            build, request = dashboard_builder(role, user)
+            with CaptureQueriesContext(connection) as queries:
+                build(request)
+            self.time_case(f"{role} dashboard ({len(queries)} queries)", lambda: build(request), options['iterations'])
+            if len(queries) > QUERY_BUDGETS[role]:
+                over_budget.append(f"{role}: {len(queries)} queries (budget {QUERY_BUDGETS[role]})")
+
+        if over_budget:
+            raise CommandError("Query budget exceeded: " + "; ".join(over_budget))
+
+    def time_case(self, label, func, iterations):
+        func()  # warm up caches and connections
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f"{label:<36} median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
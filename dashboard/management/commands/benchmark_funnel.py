@@ -0,0 +1,54 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from applications.models import Application
+from dashboard.funnel import build_funnel, rollup_funnel
+from jobs.models import Job
+
+
+def naive_funnel(since_day, group_by):
+    """The pre-rollup approach: scan applications by current status and sum Job.views_count."""
+    applications = Application.objects.filter(applied_at__date__gte=since_day).order_by()
+    aggregates = {
+        'applied': Count('pk'),
+        **{status: Count('pk', filter=Q(status=status)) for status, _ in Application.STATUS_CHOICES},
+    }
+    if group_by == 'job':
+        rows = list(applications.values('job_id').annotate(**aggregates))
+        views = dict(Job.objects.values_list('id', 'views_count'))
+        return [dict(row, views=views.get(row['job_id'], 0)) for row in rows]
+    return dict(applications.aggregate(**aggregates), views=Job.objects.aggregate(total=Sum('views_count'))['total'])
+
+
+class Command(BaseCommand):
+    help = "Compare the hiring funnel served from JobFunnelDay rollups against a naive scan of applications."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--days', type=int, default=90)
+
+    def handle(self, *args, **options):
+        rollup_funnel()
+        since_day = timezone.localdate() - timedelta(days=options['days'] - 1)
+        self.stdout.write(f"Applications in database: {Application.objects.count()}")
+        cases = [
+            ("overall (naive scan)", lambda: naive_funnel(since_day, None)),
+            ("overall (rollups)", lambda: build_funnel(since_day)),
+            ("per job (naive scan)", lambda: naive_funnel(since_day, 'job')),
+            ("per job (rollups)", lambda: build_funnel(since_day, group_by='job')),
+        ]
+        for label, func in cases:
+            func()  # warm up caches and connections
+            timings = []
+            for _ in range(options['iterations']):
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(f"{label:<28} median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
@@ -0,0 +1,386 @@
+import multiprocessing
+import random
+import re
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import User
+from applications.models import Application, ApplicationStatusEvent
+from jobs.models import Job, JobCategory
+from reviews.models import EmployerReview
+
+DOMAIN = 'load.example'
+CATEGORIES = [
+    "Software Development", "Data & Analytics", "Design", "Marketing", "Sales", "Customer Support",
+    "Finance & Accounting", "Human Resources", "Operations", "Healthcare", "Education", "Engineering",
+    "Logistics", "Legal", "Hospitality",
+]
+EMPLOYMENT_TYPES = [(Job.Full_Time, 70), (Job.Part_Time, 10), (Job.Contract, 10), (Job.Internship, 6), (Job.Temporary, 4)]
+EXPERIENCE_LEVELS = [(Job.ENTRY_LEVEL, 35), (Job.MID_LEVEL, 35), (Job.SENIOR_LEVEL, 20), (Job.DIRECTOR, 7), (Job.EXECUTIVE, 3)]
+BASE_SALARY = {Job.ENTRY_LEVEL: 25000, Job.MID_LEVEL: 50000, Job.SENIOR_LEVEL: 90000, Job.DIRECTOR: 150000, Job.EXECUTIVE: 220000}
+REMOTE_OPTIONS = [(Job.ON_SITE, 60), (Job.HYBRID, 25), (Job.REMOTE, 15)]
+# Final status of an application and the transitions that led there
+STATUS_PATHS = [
+    ([Application.PENDING], 40),
+    ([Application.REVIEWED], 18),
+    ([Application.REVIEWED, Application.REJECTED], 20),
+    ([Application.REVIEWED, Application.INTERVIEWED], 8),
+    ([Application.REVIEWED, Application.INTERVIEWED, Application.REJECTED], 5),
+    ([Application.REVIEWED, Application.INTERVIEWED, Application.OFFERED], 2),
+    ([Application.REVIEWED, Application.INTERVIEWED, Application.OFFERED, Application.ACCEPTED], 3),
+    ([Application.WITHDRAWN], 4),
+]
+# Reviews lean positive, with a smaller bump of unhappy reviewers
+RATINGS = [(1, 8), (2, 7), (3, 15), (4, 30), (5, 40)]
+DAY = 86400
+
+# Set in each worker process by _init_worker
+CONTEXT = {}
+
+
+def _weighted(items):
+    values, weights = zip(*items)
+    return list(values), list(weights)
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the generated created/joined dates instead of stamping "now"."""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _init_worker(context):
+    if not django.apps.apps.ready:
+        django.setup()
+    # Never share the parent's database connection
+    connections.close_all()
+    fake = Faker(context['locale'])
+    fake.seed_instance(context['seed'])
+    CONTEXT.clear()
+    CONTEXT.update(context)
+    CONTEXT['pools'] = {
+        'first_names': [fake.first_name() for _ in range(1000)],
+        'last_names': [fake.last_name() for _ in range(1000)],
+        'cities': [fake.city() for _ in range(300)],
+        'companies': [fake.company() for _ in range(2000)],
+        'titles': [fake.job() for _ in range(1000)],
+        'paragraphs': [fake.paragraph(nb_sentences=5) for _ in range(300)],
+        'sentences': [fake.sentence(nb_words=12) for _ in range(500)],
+    }
+
+
+def _rng(stage, index):
+    # Seeded per chunk, so the data doesn't depend on the number of workers
+    return random.Random(f"{CONTEXT['seed']}:{stage}:{index}")
+
+
+def _zipf_pick(rng, pool):
+    """Pick from `pool` with the first entries far more likely (a few big cities, popular categories)."""
+    return pool[min(len(pool) - 1, int(len(pool) * rng.random() ** 3))]
+
+
+def _joined_at(index, total):
+    # Sign-ups accelerate: the later half of the users joined in the last ~30% of the window
+    return CONTEXT['start'] + timedelta(seconds=CONTEXT['span'] * (index / total) ** (1 / CONTEXT['growth']))
+
+
+def _joined_by(moment, total):
+    """How many users (by index) had joined at `moment`."""
+    fraction = max(0.0, min(1.0, (moment - CONTEXT['start']).total_seconds() / CONTEXT['span']))
+    return int(total * fraction ** CONTEXT['growth'])
+
+
+def _role(index):
+    if index == 0:
+        return User.Admin
+    return User.Employer if index % CONTEXT['employer_every'] == 0 else User.Job_Seeker
+
+
+def _employer_index(rng, moment):
+    """An employer that had joined by `moment`; older employers post more jobs."""
+    every = CONTEXT['employer_every']
+    available = max(1, _joined_by(moment, CONTEXT['users']) // every)
+    return min(every * (1 + int(available * rng.random() ** 2)), CONTEXT['last_employer'])
+
+
+def _seeker_index(rng, moment):
+    limit = max(2, _joined_by(moment, CONTEXT['users']))
+    index = rng.randrange(1, limit)
+    return index - 1 if index % CONTEXT['employer_every'] == 0 else index
+
+
+def _email(index, first, last):
+    return f"{re.sub(r'[^a-z]', '', first.lower())}.{re.sub(r'[^a-z]', '', last.lower())}.{index}@{DOMAIN}"
+
+
+def generate_users(chunk):
+    index, start, stop = chunk
+    rng = _rng('users', index)
+    pools = CONTEXT['pools']
+    users = []
+    for i in range(start, stop):
+        first, last = rng.choice(pools['first_names']), rng.choice(pools['last_names'])
+        role = _role(i)
+        users.append(User(
+            id=CONTEXT['user_offset'] + i, email=_email(i, first, last), first_name=first, last_name=last,
+            role=role, password=CONTEXT['password'], is_active=rng.random() > 0.02,
+            is_staff=role == User.Admin, is_superuser=role == User.Admin,
+            is_verified=role == User.Employer and rng.random() < 0.6,
+            location=_zipf_pick(rng, pools['cities']), date_joined=_joined_at(i, CONTEXT['users']),
+        ))
+    with transaction.atomic(), manual_timestamps(User):
+        User.objects.bulk_create(users, batch_size=1000)
+    return {'users': len(users)}
+
+
+def generate_jobs(chunk):
+    index, start, stop = chunk
+    rng = _rng('jobs', index)
+    pools = CONTEXT['pools']
+    types, type_weights = _weighted(EMPLOYMENT_TYPES)
+    levels, level_weights = _weighted(EXPERIENCE_LEVELS)
+    remotes, remote_weights = _weighted(REMOTE_OPTIONS)
+    today = CONTEXT['now'].date()
+    jobs = []
+    for g in range(start, stop):
+        created = _joined_at(g, CONTEXT['jobs']) + timedelta(seconds=rng.uniform(0, 3600))
+        employer = _employer_index(rng, created)
+        created = min(CONTEXT['now'], max(created, _joined_at(employer, CONTEXT['users']) + timedelta(hours=1)))
+        level = rng.choices(levels, level_weights)[0]
+        salary = None
+        if rng.random() > 0.15:
+            salary = Decimal(round(BASE_SALARY[level] * rng.lognormvariate(0, 0.3) / 500) * 500)
+        deadline = (created + timedelta(days=rng.choice((14, 21, 30, 30, 45, 60)))).date()
+        jobs.append(Job(
+            id=CONTEXT['job_offset'] + g, employer_id=CONTEXT['user_offset'] + employer,
+            title=rng.choice(pools['titles']), company_name=pools['companies'][employer % len(pools['companies'])],
+            description="\n\n".join(rng.sample(pools['paragraphs'], 3)),
+            requirements="\n".join(rng.sample(pools['sentences'], 4)),
+            location=_zipf_pick(rng, pools['cities']), category_id=_zipf_pick(rng, CONTEXT['categories']),
+            is_featured=rng.random() < 0.03, created_at=created, updated_at=created,
+            application_deadline=deadline, salary=salary,
+            employment_type=rng.choices(types, type_weights)[0], experience_level=level,
+            remote_option=rng.choices(remotes, remote_weights)[0],
+            # A few listings draw most of the traffic
+            views_count=int(CONTEXT['views_per_job'] / 2 * min(50, rng.paretovariate(2))),
+            is_active=deadline >= today or rng.random() < 0.2,
+        ))
+    with transaction.atomic(), manual_timestamps(Job):
+        Job.objects.bulk_create(jobs, batch_size=1000)
+    return {'jobs': len(jobs)}
+
+
+def generate_applications(chunk):
+    """Applications, their status history and the reviews they led to, for a range of jobs."""
+    index, start, stop = chunk
+    rng = _rng('applications', index)
+    now = CONTEXT['now']
+    paths, path_weights = _weighted(STATUS_PATHS)
+    ratings, rating_weights = _weighted(RATINGS)
+    jobs = Job.objects.filter(id__gte=CONTEXT['job_offset'] + start, id__lt=CONTEXT['job_offset'] + stop) \
+        .order_by('id').values_list('id', 'employer_id', 'created_at', 'application_deadline', 'views_count')
+
+    applications, histories = [], []
+    for job_id, employer_id, created, deadline, views in jobs:
+        wanted = int(views * CONTEXT['conversion'] + rng.random())
+        closes = min(now, created + timedelta(days=(deadline - created.date()).days + 1)) if deadline else now
+        if wanted == 0 or closes <= created:
+            continue
+        window = (closes - created).total_seconds()
+        applicants = set()
+        for _ in range(wanted * 2):
+            if len(applicants) == wanted:
+                break
+            # Most applications arrive in the first days after posting
+            offset = rng.expovariate(1 / (5 * DAY))
+            applied = created + timedelta(seconds=offset if offset < window else rng.uniform(0, window))
+            applicant = _seeker_index(rng, applied)
+            if applicant in applicants:
+                continue
+            applicants.add(applicant)
+            user_id = CONTEXT['user_offset'] + applicant
+            path = rng.choices(paths, path_weights)[0]
+            portfolio = f"https://portfolio.{DOMAIN}/{applicant}" if rng.random() < 0.3 else None
+            applications.append(Application(
+                job_id=job_id, applicant_id=user_id, resume=f'resumes/load/{applicant}.pdf',
+                portfolio_link=portfolio, applied_at=applied, status=path[-1],
+            ))
+            histories.append((job_id, employer_id, user_id, applied, path))
+
+    with transaction.atomic(), manual_timestamps(Application, ApplicationStatusEvent, EmployerReview):
+        Application.objects.bulk_create(applications, batch_size=1000)
+        events, reviews = [], []
+        for application, (job_id, employer_id, user_id, applied, path) in zip(applications, histories):
+            moment, previous = applied, Application.PENDING
+            if CONTEXT['events']:
+                events.append(ApplicationStatusEvent(application_id=application.id, job_id=job_id,
+                                                     to_status=Application.PENDING, created_at=moment))
+            for status in path:
+                if status == Application.PENDING:
+                    previous = status
+                    continue
+                moment = min(now, moment + timedelta(seconds=rng.expovariate(1 / (3 * DAY))))
+                if CONTEXT['events']:
+                    events.append(ApplicationStatusEvent(application_id=application.id, job_id=job_id,
+                                                         from_status=previous,
+                                                         to_status=status, created_at=moment))
+                previous = status
+            if path[-1] == Application.ACCEPTED and rng.random() < CONTEXT['review_rate']:
+                reviewed = min(now, moment + timedelta(seconds=rng.expovariate(1 / (14 * DAY))))
+                reviews.append(EmployerReview(
+                    job_id=job_id, employer_id=employer_id, job_seeker_id=user_id,
+                    rating=rng.choices(ratings, rating_weights)[0],
+                    comment=rng.choice(CONTEXT['pools']['sentences'])[:255],
+                    created_at=reviewed, updated_at=reviewed,
+                ))
+        ApplicationStatusEvent.objects.bulk_create(events, batch_size=1000)
+        EmployerReview.objects.bulk_create(reviews, batch_size=1000)
+    return {'applications': len(applications), 'status events': len(events), 'reviews': len(reviews)}
+
+
+class Command(BaseCommand):
+    help = ("Generate a large, realistic data set for load tests and benchmarks: users, jobs, applications "
+            "with their status history, and reviews, written with chunked bulk inserts by parallel workers. "
+            "The same --seed and --chunk-size give the same data. Generated users have @load.example emails; "
+            "resume paths point at files that don't exist.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--applications', type=int, default=5_000_000,
+                            help="Target number of applications; the actual count is close to it.")
+        parser.add_argument('--employer-share', type=float, default=0.05, help="Share of users that are employers.")
+        parser.add_argument('--review-rate', type=float, default=0.6,
+                            help="Share of accepted applicants that review the employer.")
+        parser.add_argument('--days', type=int, default=365, help="How far back the history goes.")
+        parser.add_argument('--no-events', action='store_true', help="Skip the application status history.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per worker transaction.")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--locale', default='en_US')
+        parser.add_argument('--password', default='loadtest-password',
+                            help="Password of every generated user (hashed once).")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__endswith=f'@{DOMAIN}').exists():
+            raise CommandError(f"@{DOMAIN} users already exist; generate into an empty database "
+                               f"(python manage.py flush) to keep the data reproducible.")
+        if not 0 < options['employer_share'] <= 0.5:
+            raise CommandError("--employer-share must be between 0 and 0.5.")
+        employer_every = round(1 / options['employer_share'])
+        if options['users'] <= employer_every or options['jobs'] < 1:
+            raise CommandError("Generate at least one employer and one job; raise --users or --employer-share.")
+        workers = max(1, options['workers'])
+        if connection.vendor == 'sqlite' and workers > 1:
+            self.stdout.write(self.style.WARNING("SQLite allows one writer at a time; using a single worker."))
+            workers = 1
+
+        # History ends at midnight, so runs on the same day produce identical timestamps
+        now = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if not JobCategory.objects.exists():
+            JobCategory.objects.bulk_create([JobCategory(name=name) for name in CATEGORIES])
+        context = {
+            'seed': options['seed'],
+            'locale': options['locale'],
+            'users': options['users'],
+            'jobs': options['jobs'],
+            'employer_every': employer_every,
+            'last_employer': employer_every * ((options['users'] - 1) // employer_every),
+            'review_rate': options['review_rate'],
+            'events': not options['no_events'],
+            'now': now,
+            'start': now - timedelta(days=options['days']),
+            'span': options['days'] * DAY,
+            'growth': 2,
+            'views_per_job': max(1, options['applications'] / options['jobs'] * 12),
+            # Hashing is deliberately slow; do it once, not per user
+            'password': make_password(options['password']),
+            'categories': list(JobCategory.objects.order_by('id').values_list('id', flat=True)),
+            # Explicit primary keys let every worker reference users and jobs without querying for them
+            'user_offset': (User.objects.aggregate(m=Max('id'))['m'] or 0) + 1,
+            'job_offset': (Job.objects.aggregate(m=Max('id'))['m'] or 0) + 1,
+        }
+
+        started = time.perf_counter()
+        size = options['chunk_size']
+        self.run_stage("users", generate_users, self.chunks(options['users'], size), context, workers)
+        self.run_stage("jobs", generate_jobs, self.chunks(options['jobs'], size), context, workers)
+        self.reset_sequences()
+
+        generated_jobs = Job.objects.filter(id__gte=context['job_offset'])
+        views = generated_jobs.aggregate(total=Sum('views_count'))['total'] or 1
+        context['conversion'] = options['applications'] / views
+        jobs_per_chunk = max(1, round(size * options['jobs'] / max(1, options['applications'])))
+        self.run_stage("applications", generate_applications, self.chunks(options['jobs'], jobs_per_chunk),
+                       context, workers)
+
+        self.stdout.write("Updating derived counters...")
+        counts = Application.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(c=Count('pk')).values('c')
+        generated_jobs.update(applications_count=Coalesce(Subquery(counts), Value(0), output_field=IntegerField()))
+        call_command('reconcile_ratings', stdout=self.stdout)
+        call_command('reconcile_dashboard_counters', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f} s. Run rollup_daily_stats "
+                                             f"and rollup_funnel to build the dashboard rollups."))
+
+    @staticmethod
+    def chunks(total, size):
+        return [(index, start, min(start + size, total)) for index, start in enumerate(range(0, total, size))]
+
+    def run_stage(self, label, function, chunks, context, workers):
+        started = time.perf_counter()
+        totals = {}
+        if workers == 1:
+            _init_worker(context)
+            results = map(function, chunks)
+            pool = None
+        else:
+            # Children must open their own connections
+            connections.close_all()
+            method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+            pool = multiprocessing.get_context(method).Pool(workers, initializer=_init_worker, initargs=(context,))
+            results = pool.imap_unordered(function, chunks)
+        try:
+            for done, result in enumerate(results, 1):
+                for key, value in result.items():
+                    totals[key] = totals.get(key, 0) + value
+                if done % max(1, len(chunks) // 10) == 0 or done == len(chunks):
+                    self.stdout.write(f"  {label}: {done}/{len(chunks)} chunks")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        summary = ", ".join(f"{value} {key}" for key, value in totals.items())
+        self.stdout.write(f"Created {summary} in {elapsed:.1f} s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+
+    def reset_sequences(self):
+        """Move the id sequences past the explicit keys (a no-op on SQLite)."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, Job])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from applications.models import Application
+from dashboard.counters import count_from_tables
+from dashboard.models import PlatformCounter
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the admin dashboard's current-state counters from the users, jobs and applications tables."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = count_from_tables(User, Job, Application)
+            before = {(c.metric, c.dimension): c.value for c in PlatformCounter.objects.all()}
+            drifted = sum(1 for key, value in counts.items() if before.get(key) != value)
+
+            PlatformCounter.objects.bulk_create(
+                [PlatformCounter(metric=metric, dimension=dimension, value=value)
+                 for (metric, dimension), value in counts.items()],
+                update_conflicts=True,
+                unique_fields=['metric', 'dimension'],
+                update_fields=['value'],
+            )
+            stale = [key for key in before if key not in counts]
+            for metric, dimension in stale:
+                PlatformCounter.objects.filter(metric=metric, dimension=dimension).delete()
+
+        self.stdout.write(f"PlatformCounter: {len(counts)} rebuilt, {drifted} had drifted, {len(stale)} stale removed")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters reconciled."))
@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from dashboard.rollups import last_rolled_day, rollup_days
+
+
+class Command(BaseCommand):
+    help = "Roll up completed days into dashboard DailyMetric rows. Only days after the last run are processed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat,
+                            help="First day to roll up (YYYY-MM-DD). Defaults to the day after the last run.")
+        parser.add_argument('--chunk-days', type=int, default=31, help="Days aggregated per transaction.")
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        first_day = options['since']
+        if first_day is None:
+            checkpoint = last_rolled_day()
+            if checkpoint is not None:
+                first_day = checkpoint + timedelta(days=1)
+            else:
+                # First run: start from the earliest signup, everything else happens after it
+                earliest = User.objects.order_by('date_joined').values_list('date_joined', flat=True).first()
+                first_day = timezone.localdate(earliest) if earliest else yesterday
+
+        if first_day > yesterday:
+            self.stdout.write("Rollups are up to date.")
+            return
+        if options['chunk_days'] < 1:
+            raise CommandError("--chunk-days must be at least 1.")
+
+        day = first_day
+        while day <= yesterday:
+            last = min(day + timedelta(days=options['chunk_days'] - 1), yesterday)
+            rows = rollup_days(day, last)
+            self.stdout.write(f"Rolled up {day} .. {last}: {rows} rows")
+            day = last + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rollups complete through {yesterday}."))
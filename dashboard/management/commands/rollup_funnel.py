@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.funnel import rollup_funnel
+
+
+class Command(BaseCommand):
+    help = "Fold application status events logged since the last run into per-job daily funnel counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help="Events aggregated per transaction.")
+
+    def handle(self, *args, **options):
+        processed = rollup_funnel(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {processed} status events."))
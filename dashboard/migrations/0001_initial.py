@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_day', models.DateField(blank=True, null=True)),
+                ('last_id', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('metric', models.CharField(max_length=50)),
+                ('dimension', models.CharField(blank=True, default='', max_length=50)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['metric', 'day'], name='daily_metric_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'metric', 'dimension'), name='unique_daily_metric')],
+            },
+        ),
+    ]
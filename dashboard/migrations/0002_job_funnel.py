@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('jobs', '0002_job_job_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFunnelDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('applied', models.PositiveIntegerField(default=0)),
+                ('reviewed', models.PositiveIntegerField(default=0)),
+                ('interviewed', models.PositiveIntegerField(default=0)),
+                ('offered', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('withdrawn', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_days', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='job_funnel_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'day'), name='unique_job_funnel_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:27
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from dashboard.counters import count_from_tables
+
+    PlatformCounter = apps.get_model('dashboard', 'PlatformCounter')
+    counts = count_from_tables(apps.get_model('accounts', 'User'), apps.get_model('jobs', 'Job'),
+                               apps.get_model('applications', 'Application'))
+    PlatformCounter.objects.bulk_create([PlatformCounter(metric=metric, dimension=dimension, value=value)
+                                         for (metric, dimension), value in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_token_version'),
+        ('applications', '0005_status_events'),
+        ('dashboard', '0002_job_funnel'),
+        ('jobs', '0003_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('dimension', models.CharField(blank=True, default='', max_length=50)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'dimension'), name='unique_platform_counter')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
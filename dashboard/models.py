@@ -1,3 +1,82 @@
 from django.db import models
 
 # Create your models here.
+
+class DailyMetric(models.Model):
+    """
+    One rolled-up counter per day, metric and optional dimension
+    (application status, user role). Filled by `rollup_daily_stats`.
+    """
+    day = models.DateField()
+    metric = models.CharField(max_length=50)
+    dimension = models.CharField(max_length=50, blank=True, default='')
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'metric', 'dimension'], name='unique_daily_metric')
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'day'], name='daily_metric_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.metric}[{self.dimension}] = {self.value}"
+
+
+class PlatformCounter(models.Model):
+    """
+    A current-state count: users per role, jobs, applications per status.
+    Kept up to date by dashboard.signals (see dashboard.counters).
+    """
+    metric = models.CharField(max_length=50)
+    dimension = models.CharField(max_length=50, blank=True, default='')
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'dimension'], name='unique_platform_counter')
+        ]
+
+    def __str__(self):
+        return f"{self.metric}[{self.dimension}] = {self.value}"
+
+
+class RollupCheckpoint(models.Model):
+    """Progress marker for incremental aggregation jobs."""
+    name = models.CharField(max_length=50, unique=True)
+    last_day = models.DateField(null=True, blank=True)
+    last_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_day or self.last_id}"
+
+
+class JobFunnelDay(models.Model):
+    """
+    Hiring funnel counters per job and day. `views` is incremented on job
+    detail requests; the other stages are rolled up from
+    applications.ApplicationStatusEvent by `rollup_funnel`.
+    """
+    job = models.ForeignKey('jobs.Job', on_delete=models.CASCADE, related_name='funnel_days')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    applied = models.PositiveIntegerField(default=0)
+    reviewed = models.PositiveIntegerField(default=0)
+    interviewed = models.PositiveIntegerField(default=0)
+    offered = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    withdrawn = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'day'], name='unique_job_funnel_day')
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='job_funnel_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"Funnel for job {self.job_id} on {self.day}"
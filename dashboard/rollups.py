@@ -0,0 +1,143 @@
+"""
+Daily rollups for dashboard analytics.
+
+Completed days are aggregated once into DailyMetric by `rollup_daily_stats`.
+Dashboard totals read the rollups and add a live count for the days after
+the last rolled-up day (normally just today), so their cost no longer
+grows with history.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import CharField, Count, F, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import User
+from applications.models import Application
+from dashboard.models import DailyMetric, RollupCheckpoint
+from jobs.models import Job
+from reviews.models import EmployerReview
+
+CHECKPOINT = 'daily_metrics'
+
+# metric -> (model, timestamp field, dimension field or None).
+# Application status is recorded as of the day's rollup; later transitions don't rewrite history.
+METRICS = {
+    'jobs': (Job, 'created_at', None),
+    'applications': (Application, 'applied_at', 'status'),
+    'signups': (User, 'date_joined', 'role'),
+    'reviews': (EmployerReview, 'created_at', None),
+}
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def last_rolled_day():
+    return RollupCheckpoint.objects.filter(name=CHECKPOINT).values_list('last_day', flat=True).first()
+
+
+def claim_unrolled(model, batch_size):
+    """
+    Lock up to `batch_size` rows of `model` that aren't rolled up yet and mark
+    them. Call it in the transaction that adds them to the rollups, so they're
+    only marked if that commits. Rows inserted by a transaction that commits
+    later, even with a lower id, stay unrolled until the next run.
+    Returns a queryset over the claimed rows.
+    """
+    ids = list(model.objects.select_for_update(skip_locked=True).filter(rolled_up=False)
+               .order_by('id').values_list('id', flat=True)[:batch_size])
+    model.objects.filter(id__in=ids).update(rolled_up=True)
+    return model.objects.filter(id__in=ids).order_by()
+
+
+def rollup_days(first_day, last_day):
+    """Aggregate [first_day, last_day] into DailyMetric (replacing existing rows) and advance the checkpoint."""
+    start, end = start_of_day(first_day), start_of_day(last_day + timedelta(days=1))
+    rows = []
+    for metric, (model, field, dimension) in METRICS.items():
+        group_by = ['day', dimension] if dimension else ['day']
+        counts = (
+            model.objects
+            .filter(**{f'{field}__gte': start, f'{field}__lt': end})
+            .annotate(day=TruncDate(field))
+            .order_by()
+            .values(*group_by)
+            .annotate(value=Count('pk'))
+        )
+        rows.extend(
+            DailyMetric(day=row['day'], metric=metric, dimension=row.get(dimension) or '', value=row['value'])
+            for row in counts
+        )
+
+    with transaction.atomic():
+        DailyMetric.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+        DailyMetric.objects.bulk_create(rows, batch_size=1000)
+        RollupCheckpoint.objects.update_or_create(name=CHECKPOINT, defaults={'last_day': last_day})
+    return len(rows)
+
+
+def _live_since(since_day, checkpoint):
+    """First day that is not covered by rollups and must be counted live."""
+    if checkpoint is None:
+        return since_day
+    first_live = checkpoint + timedelta(days=1)
+    return max(first_live, since_day) if since_day else first_live
+
+
+def _live_counts(metrics, live_from):
+    """
+    Live (not yet rolled-up) counts per metric and dimension, fetched for all
+    metrics at once with a UNION of grouped queries.
+    """
+    queries = []
+    for metric in metrics:
+        model, field, dimension = METRICS[metric]
+        live = model.objects.all()
+        if live_from:
+            live = live.filter(**{f'{field}__gte': start_of_day(live_from)})
+        queries.append(
+            live.order_by()
+            .annotate(metric_name=Value(metric, output_field=CharField()),
+                      dimension_value=F(dimension) if dimension else Value('', output_field=CharField()))
+            .values('metric_name', 'dimension_value')
+            .annotate(value=Count('pk'))
+            .values_list('metric_name', 'dimension_value', 'value')
+        )
+    if not queries:
+        return []
+    return list(queries[0].union(*queries[1:], all=True))
+
+
+def metric_breakdowns(metrics, since_day=None):
+    """
+    {metric: {dimension: count}} over [since_day, now] (all history when since_day
+    is None): rolled-up days plus the live delta. Dimensionless metrics use ''.
+    Always three queries: checkpoint, rollups and one live UNION.
+    """
+    checkpoint = last_rolled_day()
+    breakdowns = {metric: defaultdict(int) for metric in metrics}
+
+    if checkpoint is not None:
+        rolled = DailyMetric.objects.filter(metric__in=metrics, day__lte=checkpoint)
+        if since_day:
+            rolled = rolled.filter(day__gte=since_day)
+        for row in rolled.values('metric', 'dimension').annotate(total=Sum('value')):
+            breakdowns[row['metric']][row['dimension']] += row['total']
+
+    for metric, dimension, value in _live_counts(metrics, _live_since(since_day, checkpoint)):
+        breakdowns[metric][dimension or ''] += value
+    return {metric: dict(counts) for metric, counts in breakdowns.items()}
+
+
+def metric_totals(metrics, since_day=None):
+    """Totals for `metrics` over [since_day, now] (all history when since_day is None)."""
+    return {metric: sum(counts.values()) for metric, counts in metric_breakdowns(metrics, since_day).items()}
+
+
+def metric_breakdown(metric, since_day=None):
+    """Per-dimension totals for a metric (e.g. applications by status), rollups plus live delta."""
+    return metric_breakdowns([metric], since_day)[metric]
@@ -4,7 +4,9 @@ class AdminDashboardSerializer(serializers.Serializer):
     total_users = serializers.IntegerField()
     total_jobs = serializers.IntegerField()
     total_applications = serializers.IntegerField()
-    # total_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    users_by_role = serializers.DictField(child=serializers.IntegerField())
+    applications_by_status = serializers.DictField(child=serializers.IntegerField())
+    total_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
     recent_jobs = serializers.ListField(child=serializers.DictField(), required=False)
     recent_applications = serializers.ListField(child=serializers.DictField(), required=False)
 
@@ -14,7 +16,8 @@ class EmployerDashboardSerializer(serializers.Serializer):
     jobs_posted = serializers.IntegerField()
     total_applications = serializers.IntegerField()
     featured_jobs = serializers.IntegerField()
-    # earnings = serializers.DecimalField(max_digits=12, decimal_places=2)
+    applications_by_status = serializers.DictField(child=serializers.IntegerField())
+    featured_spend = serializers.DecimalField(max_digits=14, decimal_places=2)
     top_jobs = serializers.ListField(child=serializers.DictField(), required=False)
 
 
@@ -23,5 +26,6 @@ class SeekerDashboardSerializer(serializers.Serializer):
     applications_count = serializers.IntegerField()
     interviews = serializers.IntegerField()
     offers = serializers.IntegerField()
+    applications_by_status = serializers.DictField(child=serializers.IntegerField())
     recently_applied = serializers.ListField(child=serializers.DictField(), required=False)
     recommended_jobs = serializers.ListField(child=serializers.DictField(), required=False)
@@ -0,0 +1,132 @@
+from collections import Counter
+
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from jobs.models import Job
+from applications.models import Application
+from accounts.models import User
+from reviews.models import EmployerReview
+from dashboard import counters
+from dashboard.cache import bump_versions, ADMIN_OWNER
+from dashboard.timeseries import invalidate_series
+
+
+def _loaded(instance):
+    """The instance's DASHBOARD_FIELDS as loaded from the database (or last saved), or None."""
+    loaded = getattr(instance, '_loaded_dashboard', None)
+    return None if loaded is None else dict(zip(instance.DASHBOARD_FIELDS, loaded))
+
+
+def _dashboard_changed(instance, created):
+    """Whether this save changed a field the dashboards show, and the values it had before."""
+    loaded = _loaded(instance)
+    instance._loaded_dashboard = tuple(getattr(instance, field) for field in instance.DASHBOARD_FIELDS)
+    return created or loaded != _loaded(instance), loaded
+
+
+def _cascade(origin):
+    """
+    Jobs being deleted by this delete() call: job id -> (employer id, applicant ids,
+    counter changes). Kept on the object delete() was called on, so it lives exactly
+    as long as the call.
+    """
+    if origin is None:
+        return {}
+    if not hasattr(origin, '_dashboard_cascade'):
+        origin._dashboard_cascade = {}
+    return origin._dashboard_cascade
+
+
+@receiver(post_save, sender=User)
+def count_user(sender, instance, created, **kwargs):
+    changed, loaded = _dashboard_changed(instance, created)
+    if created:
+        counters.adjust({(counters.USERS, instance.role): 1})
+    elif changed and loaded is not None:
+        counters.adjust({(counters.USERS, loaded['role']): -1, (counters.USERS, instance.role): 1})
+    if changed:
+        bump_versions(ADMIN_OWNER)
+
+
+@receiver(post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    role = (_loaded(instance) or {'role': instance.role})['role']
+    counters.adjust({(counters.USERS, role): -1})
+    bump_versions(ADMIN_OWNER)
+
+
+@receiver(post_save, sender=Job)
+def invalidate_job_dashboards(sender, instance, created, **kwargs):
+    # A new or closed job also changes every seeker's recommendations; those
+    # entries simply age out after DASHBOARD_CACHE_TTL.
+    changed, _ = _dashboard_changed(instance, created)
+    if created:
+        counters.adjust({(counters.JOBS, ''): 1})
+    if changed:
+        bump_versions(instance.employer_id, ADMIN_OWNER)
+
+
+@receiver(pre_delete, sender=Job)
+def collect_job_cascade(sender, instance, origin=None, **kwargs):
+    # The job's applications are deleted (and signalled) before it; they report their
+    # applicants here instead of each looking up the employer and bumping on its own
+    _cascade(origin)[instance.pk] = (instance.employer_id, set(), Counter())
+
+
+@receiver(post_delete, sender=Job)
+def invalidate_deleted_job_dashboards(sender, instance, origin=None, **kwargs):
+    employer_id, applicant_ids, changes = _cascade(origin).pop(instance.pk, (instance.employer_id, set(), Counter()))
+    changes[(counters.JOBS, '')] -= 1
+    counters.adjust(changes)
+    bump_versions(employer_id, ADMIN_OWNER, *applicant_ids)
+    invalidate_series('jobs', employer_id)
+    if applicant_ids:
+        invalidate_series('applications', employer_id)
+
+
+def _employer_id(application):
+    # Applying and updating through the API load the job
+    if Application.job.is_cached(application):
+        return application.job.employer_id
+    return Job.objects.filter(pk=application.job_id).values_list('employer_id', flat=True).first()
+
+
+@receiver(post_save, sender=Application)
+def invalidate_application_dashboards(sender, instance, created=False, **kwargs):
+    changed, loaded = _dashboard_changed(instance, created)
+    if created:
+        counters.adjust({(counters.APPLICATIONS, instance.status): 1})
+    elif loaded is not None and loaded['status'] != instance.status:
+        counters.adjust({(counters.APPLICATIONS, loaded['status']): -1, (counters.APPLICATIONS, instance.status): 1})
+    if not changed:
+        return
+    employer_id = _employer_id(instance)
+    bump_versions(instance.applicant_id, employer_id, ADMIN_OWNER)
+    if not created:
+        # The series counts applications by current status in their applied_at bucket, so a
+        # status change rewrites a past bucket. New ones land in today's, never cached.
+        invalidate_series('applications', employer_id)
+
+
+@receiver(post_delete, sender=Application)
+def invalidate_deleted_application_dashboards(sender, instance, origin=None, **kwargs):
+    status = (_loaded(instance) or {'status': instance.status})['status']
+    cascade = _cascade(origin).get(instance.job_id)
+    if cascade is not None:
+        cascade[1].add(instance.applicant_id)
+        cascade[2][(counters.APPLICATIONS, status)] -= 1
+        return
+    counters.adjust({(counters.APPLICATIONS, status): -1})
+    employer_id = _employer_id(instance)
+    bump_versions(instance.applicant_id, employer_id, ADMIN_OWNER)
+    invalidate_series('applications', employer_id)
+
+
+@receiver(post_delete, sender=EmployerReview)
+def invalidate_review_series(sender, instance, **kwargs):
+    invalidate_series('reviews', instance.employer_id)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_signup_series(sender, instance, **kwargs):
+    invalidate_series('signups')
@@ -1,3 +1,354 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from applications.models import Application, ApplicationStatusEvent
+from dashboard.cache import ADMIN_OWNER, get_version
+from dashboard.counters import count_from_tables
+from dashboard.funnel import EVENT_STAGES, build_funnel, record_job_view, rollup_funnel
+from dashboard.models import JobFunnelDay, PlatformCounter
+from dashboard.rollups import rollup_days, start_of_day
+from dashboard.signals import invalidate_application_dashboards
+from jobs.models import Job, JobCategory
 
 # Create your tests here.
+
+
+class DashboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', password='x', role=User.Admin)
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_job(self, created_at=None, employer=None):
+        job = Job.objects.create(employer=employer or self.employer, title='Engineer', company_name='Acme',
+                                 description='x')
+        if created_at is not None:
+            Job.objects.filter(pk=job.pk).update(created_at=created_at)
+        return job
+
+    def apply(self, job, applied_at=None, seeker=None):
+        seeker = seeker or User.objects.create_user(email=f'seeker{User.objects.count()}@example.com', password='x',
+                                                    role=User.Job_Seeker)
+        application = Application.objects.create(job=job, applicant=seeker, resume='resumes/r.pdf')
+        if applied_at is not None:
+            Application.objects.filter(pk=application.pk).update(applied_at=applied_at)
+            application.refresh_from_db()
+        return application
+
+
+class StatsWindowTests(DashboardTestCase):
+    """?days=N covers today and the N - 1 calendar days before it, the same window as the funnel."""
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        first_day = self.today - timedelta(days=6)
+        self.create_job(start_of_day(first_day))  # first instant inside a 7-day window
+        self.create_job(start_of_day(first_day) - timedelta(microseconds=1))  # last instant before it
+        self.create_job()
+
+    def test_window_boundaries(self):
+        response = self.client.get('/api/v1/dashboard/stats/', {'days': 7})
+        self.assertEqual(response.data['jobs_created'], 2)
+        response = self.client.get('/api/v1/dashboard/stats/', {'days': 8})
+        self.assertEqual(response.data['jobs_created'], 3)
+        response = self.client.get('/api/v1/dashboard/stats/', {'days': 1})
+        self.assertEqual(response.data['jobs_created'], 1)
+
+    def test_window_boundaries_from_rollups(self):
+        rollup_days(self.today - timedelta(days=30), self.today - timedelta(days=1))
+        response = self.client.get('/api/v1/dashboard/stats/', {'days': 7})
+        self.assertEqual(response.data['jobs_created'], 2)
+        response = self.client.get('/api/v1/dashboard/stats/', {'days': 8})
+        self.assertEqual(response.data['jobs_created'], 3)
+
+    def test_same_window_as_funnel(self):
+        response = self.client.get('/api/v1/dashboard/funnel/', {'days': 7})
+        self.assertEqual(response.data['start'], self.today - timedelta(days=6))
+        self.assertEqual(response.data['end'], self.today)
+
+
+class TimeseriesCacheTests(DashboardTestCase):
+    """Completed buckets are cached, but not past a status change or a delete."""
+
+    def setUp(self):
+        super().setUp()
+        self.job = self.create_job()
+        self.application = self.apply(self.job, start_of_day(timezone.localdate() - timedelta(days=10)))
+
+    def series(self, user=None, metric='applications'):
+        self.client.force_authenticate(user or self.admin)
+        response = self.client.get('/api/v1/dashboard/timeseries/', {'days': 14, 'metrics': metric})
+        self.assertEqual(response.status_code, 200)
+        return response.data['series'][metric]
+
+    def test_completed_buckets_are_cached(self):
+        self.series()
+        with self.assertNumQueries(1):  # only today's bucket
+            self.series()
+
+    def test_status_change_updates_past_bucket(self):
+        for user in (self.admin, self.employer):
+            self.assertEqual(self.series(user)['pending'][3], 1)
+
+        self.application.status = Application.ACCEPTED
+        self.application.save()
+
+        for user in (self.admin, self.employer):
+            series = self.series(user)
+            self.assertEqual(series['accepted'][3], 1)
+            self.assertEqual(series.get('pending', [0] * 14)[3], 0)
+
+    def test_delete_updates_past_bucket(self):
+        self.assertEqual(self.series()['total'][3], 1)
+        self.application.delete()
+        self.assertEqual(self.series()['total'][3], 0)
+
+    def test_job_delete_updates_past_bucket(self):
+        job = self.create_job(start_of_day(timezone.localdate() - timedelta(days=5)))
+        self.assertEqual(self.series(metric='jobs')[8], 1)
+        job.delete()
+        self.assertEqual(self.series(metric='jobs')[8], 0)
+
+
+class DashboardInvalidationTests(DashboardTestCase):
+    """Cached dashboards show an application as soon as it is submitted or changes status."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.seeker = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+        self.job = self.create_job()
+
+    def dashboard(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/v1/dashboard/').data
+
+    def test_apply_then_status_change(self):
+        for user in (self.admin, self.employer, self.seeker):
+            self.dashboard(user)  # cache the empty dashboards
+
+        self.client.force_authenticate(self.seeker)
+        response = self.client.post(f'/api/v1/jobs/{self.job.id}/applications/',
+                                    {'resume': SimpleUploadedFile('cv.pdf', b'%PDF-1.4')}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.dashboard(self.employer)['applications_by_status']['pending'], 1)
+        self.assertEqual(self.dashboard(self.admin)['applications_by_status']['pending'], 1)
+        self.assertEqual(self.dashboard(self.seeker)['applications_count'], 1)
+
+        self.client.force_authenticate(self.seeker)
+        response = self.client.post(f'/api/v1/jobs/{self.job.id}/applications/{response.data["id"]}/withdraw/')
+        self.assertEqual(response.status_code, 200)
+
+        for user in (self.employer, self.admin, self.seeker):
+            by_status = self.dashboard(user)['applications_by_status']
+            self.assertEqual((by_status['pending'], by_status['withdrawn']), (0, 1))
+
+    def test_employer_read_from_loaded_job(self):
+        application = self.apply(self.job)
+        application = Application.objects.select_related('job').get(pk=application.pk)
+        application.status = Application.REVIEWED
+        with CaptureQueriesContext(connection) as queries:
+            invalidate_application_dashboards(Application, instance=application, created=False)
+        self.assertFalse([q['sql'] for q in queries if 'FROM "jobs_job"' in q['sql']])
+
+    def versions(self, *owners):
+        return [get_version(owner) for owner in owners]
+
+    def test_saves_that_change_no_dashboard_field_keep_the_cache(self):
+        application = Application.objects.get(pk=self.apply(self.job, seeker=self.seeker).pk)
+        job = Job.objects.get(pk=self.job.pk)
+        owners = (self.seeker.id, self.employer.id, ADMIN_OWNER)
+        before = self.versions(*owners)
+
+        job.description = 'Updated description'
+        job.save()
+        application.portfolio_link = 'https://example.com/me'
+        application.save()
+        self.assertEqual(self.versions(*owners), before)
+
+        job.title = 'Senior Engineer'
+        job.save()
+        self.assertNotEqual(self.versions(self.employer.id, ADMIN_OWNER), before[1:])
+        before = self.versions(*owners)
+        application.status = Application.REVIEWED
+        application.save()
+        self.assertTrue(all(new != old for new, old in zip(self.versions(*owners), before)))
+
+    def cascade_delete_queries(self, applications):
+        job = self.create_job()
+        seekers = [self.apply(job).applicant_id for _ in range(applications)]
+        job = Job.objects.get(pk=job.pk)
+        before = self.versions(self.employer.id, ADMIN_OWNER, *seekers)
+        with CaptureQueriesContext(connection) as queries:
+            job.delete()
+        after = self.versions(self.employer.id, ADMIN_OWNER, *seekers)
+        self.assertTrue(all(new != old for new, old in zip(after, before)))
+        # No per-application lookup of the job's employer
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('SELECT "jobs_job"."employer_id"')])
+        return len(queries)
+
+    def test_job_cascade_resolves_the_employer_once(self):
+        self.assertEqual(self.cascade_delete_queries(2), self.cascade_delete_queries(6))
+
+
+class AdminDashboardTests(DashboardTestCase):
+    """Totals and breakdowns match the tables after status changes and deletes, rollups or not."""
+
+    def test_counts_follow_current_state(self):
+        job = self.create_job(start_of_day(timezone.localdate() - timedelta(days=3)))
+        applications = [self.apply(job, start_of_day(timezone.localdate() - timedelta(days=2))) for _ in range(3)]
+        rollup_days(timezone.localdate() - timedelta(days=10), timezone.localdate() - timedelta(days=1))
+
+        applications[0].status = Application.ACCEPTED
+        applications[0].save()
+        applications[1].delete()
+        applications[2].applicant.delete()
+
+        with self.assertNumQueries(4):  # counters, revenue, recent jobs, recent applications
+            data = self.client.get('/api/v1/dashboard/').data
+        self.assertEqual(data['total_applications'], 1)
+        self.assertEqual(data['applications_by_status']['accepted'], 1)
+        self.assertEqual(data['applications_by_status']['pending'], 0)
+        self.assertEqual(data['total_users'], 4)
+        self.assertEqual(data['users_by_role'], {'admin': 1, 'employer': 1, 'seeker': 2})
+        self.assertEqual(data['total_jobs'], 1)
+
+
+class ConnectionStatsTests(DashboardTestCase):
+    def test_admin_only(self):
+        response = self.client.get('/api/v1/dashboard/connection-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('default', response.data['databases'])
+        self.assertGreater(response.data['requests'], 0)
+
+        self.client.force_authenticate(self.employer)
+        self.assertEqual(self.client.get('/api/v1/dashboard/connection-stats/').status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/v1/dashboard/connection-stats/').status_code, 401)
+
+    def assertCountersMatchTables(self):
+        self.assertEqual({key: value for key, value in count_from_tables(User, Job, Application).items() if value},
+                         {(c.metric, c.dimension): c.value for c in PlatformCounter.objects.exclude(value=0)})
+
+    def test_counters_follow_every_change(self):
+        job = self.create_job()
+        applications = [self.apply(job) for _ in range(3)]
+        self.assertCountersMatchTables()
+
+        application = Application.objects.get(pk=applications[0].pk)
+        application.status = Application.ACCEPTED
+        application.save()
+        seeker = User.objects.get(pk=applications[1].applicant_id)
+        seeker.role = User.Employer
+        seeker.save()
+        self.assertCountersMatchTables()
+
+        applications[2].delete()
+        self.create_job().delete()
+        job.delete()  # cascades to the remaining applications
+        self.employer.delete()
+        self.assertCountersMatchTables()
+
+    def test_reconcile_repairs_drift(self):
+        self.apply(self.create_job())
+        PlatformCounter.objects.filter(metric='applications').update(value=40)
+        PlatformCounter.objects.create(metric='applications', dimension='unknown', value=3)
+        output = StringIO()
+        call_command('reconcile_dashboard_counters', stdout=output)
+        self.assertCountersMatchTables()
+        self.assertIn('1 stale removed', output.getvalue())
+
+
+class FunnelRollupTests(DashboardTestCase):
+    """Rollups plus the events not rolled up yet always add up to the event log."""
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.jobs = [self.create_job(), self.create_job()]
+        Job.objects.filter(pk=self.jobs[1].pk).update(category=JobCategory.objects.create(name='Design'))
+        for job, statuses in ((self.jobs[0], ['reviewed', 'interviewed', 'offered']), (self.jobs[1], ['rejected'])):
+            application = self.apply(job)
+            for status in statuses:
+                application.status = status
+                application.save()
+            record_job_view(job.pk)
+        # A transition logged yesterday
+        ApplicationStatusEvent.objects.filter(to_status='reviewed').update(
+            created_at=timezone.now() - timedelta(days=1))
+
+    def expected(self, group_by):
+        """The funnel counted straight from the event log and the view counters."""
+        groups = {}
+        for event in ApplicationStatusEvent.objects.select_related('job'):
+            key = {'job': event.job_id, 'category': event.job.category_id,
+                   'day': timezone.localdate(event.created_at)}.get(group_by)
+            stage = 'applied' if not event.from_status else event.to_status
+            if stage in EVENT_STAGES:
+                stages = groups.setdefault(key, {})
+                stages[stage] = stages.get(stage, 0) + 1
+        for funnel_day in JobFunnelDay.objects.select_related('job').filter(views__gt=0):
+            key = {'job': funnel_day.job_id, 'category': funnel_day.job.category_id, 'day': funnel_day.day}.get(group_by)
+            stages = groups.setdefault(key, {})
+            stages['views'] = stages.get('views', 0) + funnel_day.views
+        return groups
+
+    def assertFunnelMatchesEvents(self):
+        for group_by in (None, 'job', 'category', 'day'):
+            funnel = build_funnel(self.today - timedelta(days=6), group_by=group_by)
+            self.assertEqual(
+                {row['key']: {stage: value for stage, value in row['stages'].items() if value}
+                 for row in funnel['results']},
+                self.expected(group_by),
+                group_by,
+            )
+
+    def test_rollup_plus_tail_matches_events(self):
+        self.assertFunnelMatchesEvents()
+        self.assertEqual(rollup_funnel(batch_size=2), ApplicationStatusEvent.objects.count())
+        self.assertFalse(ApplicationStatusEvent.objects.filter(rolled_up=False).exists())
+        self.assertFunnelMatchesEvents()
+
+        application = self.apply(self.jobs[1])
+        application.status = Application.WITHDRAWN
+        application.save()
+        self.assertFunnelMatchesEvents()
+        self.assertEqual(rollup_funnel(), 2)
+        self.assertEqual(rollup_funnel(), 0)
+        self.assertFunnelMatchesEvents()
+
+    def test_event_committed_after_a_rollup_with_a_lower_id(self):
+        # A transaction takes an id, then commits only after a later event has been rolled up
+        application = self.apply(self.jobs[0])
+        late = ApplicationStatusEvent.objects.filter(application=application).get()
+        late_id = late.pk
+        late.delete()
+        application.status = Application.ACCEPTED
+        application.save()
+        rollup_funnel()
+        late.pk = late_id
+        late.save(force_insert=True)
+        self.assertLess(late_id, ApplicationStatusEvent.objects.latest('id').id)
+
+        self.assertFunnelMatchesEvents()
+        self.assertEqual(rollup_funnel(), 1)
+        self.assertFunnelMatchesEvents()
+        self.assertEqual(sum(JobFunnelDay.objects.values_list('applied', flat=True)), 3)
@@ -0,0 +1,149 @@
+"""
+Bucketed time series for the analytics endpoint.
+
+Each metric is computed with one grouped query (Trunc* on the timestamp).
+Buckets that ended before today can no longer receive new rows, so they are
+cached and only the missing/current buckets hit the database. They can still
+change: an application changes status, or rows are deleted. The signals in
+dashboard.signals call `invalidate_series` for those changes, which moves
+the metric's cache keys to a new version. TIMESERIES_CACHE_TTL bounds how
+long a bucket can be off after a change that sends no signal (queryset
+updates and bulk deletes).
+"""
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from dashboard.rollups import METRICS, start_of_day
+
+INTERVALS = ('day', 'week', 'month')
+MAX_WINDOW_DAYS = 366
+CACHE_PREFIX = 'dashboard:ts'
+
+
+def bucket_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, interval):
+    if interval == 'week':
+        return start + timedelta(days=7)
+    if interval == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def bucket_range(first_day, last_day, interval):
+    buckets = []
+    current = bucket_start(first_day, interval)
+    while current <= last_day:
+        buckets.append(current)
+        current = next_bucket(current, interval)
+    return buckets
+
+
+def _scope(employer_id):
+    return 'all' if employer_id is None else f'employer:{employer_id}'
+
+
+def _version_key(scope, metric):
+    return f'{CACHE_PREFIX}:ver:{scope}:{metric}'
+
+
+def invalidate_series(metric, *employer_ids):
+    """Drop the cached buckets of `metric`, platform-wide and for `employer_ids`."""
+    version = time.time_ns()
+    scopes = [_scope(None)] + [_scope(employer_id) for employer_id in employer_ids if employer_id is not None]
+    cache.set_many({_version_key(scope, metric): version for scope in scopes}, timeout=None)
+
+
+def _scoped_queryset(metric, employer_id):
+    model, _, _ = METRICS[metric]
+    queryset = model.objects.all()
+    if employer_id is not None:
+        if metric == 'jobs':
+            queryset = queryset.filter(employer_id=employer_id)
+        elif metric == 'applications':
+            queryset = queryset.filter(job__employer_id=employer_id)
+        elif metric == 'reviews':
+            queryset = queryset.filter(employer_id=employer_id)
+        else:
+            return model.objects.none()
+    return queryset
+
+
+def _query_buckets(metric, interval, since_day, employer_id):
+    """One grouped query: {bucket_start: {dimension: count}} for buckets starting at since_day."""
+    _, field, dimension = METRICS[metric]
+    group_by = ['bucket', dimension] if dimension else ['bucket']
+    rows = (
+        _scoped_queryset(metric, employer_id)
+        .filter(**{f'{field}__gte': start_of_day(since_day)})
+        .annotate(bucket=Trunc(field, interval, output_field=DateField()))
+        .order_by()
+        .values(*group_by)
+        .annotate(value=Count('pk'))
+    )
+    buckets = defaultdict(dict)
+    for row in rows:
+        key = row[dimension] if dimension else 'total'
+        buckets[row['bucket']][key] = row['value']
+    return buckets
+
+
+def metric_series(metric, interval, buckets, employer_id=None):
+    """{bucket_start: {dimension: count}} for every bucket, filling gaps with empty dicts."""
+    today = timezone.localdate()
+    scope = _scope(employer_id)
+    prefix = f'{CACHE_PREFIX}:{scope}:{metric}:{cache.get(_version_key(scope, metric), 0)}:{interval}'
+    keys = {bucket: f'{prefix}:{bucket.isoformat()}' for bucket in buckets}
+    completed = [bucket for bucket in buckets if next_bucket(bucket, interval) <= today]
+
+    cached = cache.get_many([keys[bucket] for bucket in completed])
+    values = {bucket: cached[keys[bucket]] for bucket in completed if keys[bucket] in cached}
+    missing = [bucket for bucket in buckets if bucket not in values]
+
+    if missing:
+        fresh = _query_buckets(metric, interval, missing[0], employer_id)
+        for bucket in missing:
+            values[bucket] = fresh.get(bucket, {})
+        # Completed buckets only change through invalidate_series (or unsignalled bulk changes)
+        cache.set_many({keys[b]: values[b] for b in missing if b in completed},
+                       timeout=settings.TIMESERIES_CACHE_TTL)
+
+    return values
+
+
+def build_timeseries(metrics, interval, days, employer_id=None):
+    today = timezone.localdate()
+    buckets = bucket_range(today - timedelta(days=days - 1), today, interval)
+
+    series = {}
+    for metric in metrics:
+        _, _, dimension = METRICS[metric]
+        values = metric_series(metric, interval, buckets, employer_id)
+        if dimension:
+            keys = sorted({key for counts in values.values() for key in counts})
+            data = {key: [values[b].get(key, 0) for b in buckets] for key in keys}
+            data['total'] = [sum(values[b].values()) for b in buckets]
+        else:
+            data = [values[b].get('total', 0) for b in buckets]
+        series[metric] = data
+
+    return {
+        'interval': interval,
+        'start': buckets[0],
+        'end': today,
+        'buckets': buckets,
+        'series': series,
+    }
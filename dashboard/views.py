@@ -1,13 +1,19 @@
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum
 from jobs.models import Job
 from applications.models import Application
 from accounts.models import User
-# from payments.models import PaymentTransaction
+from payments.revenue import revenue_summary
 from dashboard.serializers import AdminDashboardSerializer, EmployerDashboardSerializer, SeekerDashboardSerializer
-from rest_framework.exceptions import PermissionDenied
+from dashboard.rollups import metric_totals
+from dashboard.counters import APPLICATIONS, JOBS, USERS, current_counts
+from dashboard.cache import get_or_build, cache_stats as dashboard_cache_stats
+from api.pooling import connection_stats as db_connection_stats
+from dashboard.funnel import build_funnel, GROUPINGS
+from dashboard.timeseries import build_timeseries, INTERVALS, MAX_WINDOW_DAYS
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.decorators import action
 from django.utils import timezone
 from datetime import timedelta
@@ -15,27 +21,62 @@ from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
 
+def parse_days(request, default):
+    """Read ?days= as an int bounded to [1, MAX_WINDOW_DAYS]."""
+    try:
+        days = int(request.query_params.get('days', default))
+    except (TypeError, ValueError):
+        raise ValidationError({'days': 'Must be an integer.'})
+    if days < 1 or days > MAX_WINDOW_DAYS:
+        raise ValidationError({'days': f'Must be between 1 and {MAX_WINDOW_DAYS}.'})
+    return days
+
+
+def status_counts(lookup, count_field='pk'):
+    """Count(filter=Q(...)) aggregates, one per application status, for a single aggregate() call."""
+    return {
+        f'status_{status}': Count(count_field, filter=Q(**{lookup: status}))
+        for status, _ in Application.STATUS_CHOICES
+    }
+
+
+def pop_status_counts(counts):
+    return {status: counts.pop(f'status_{status}') for status, _ in Application.STATUS_CHOICES}
+
+
 class DashboardViewSet(ViewSet):
     permission_classes = [IsAuthenticated]
+    token_user_reads = True
+    # Aggregates read from the analytics replica when one is configured (api.replicas)
+    read_replica = 'analytics'
 
     @swagger_auto_schema(operation_summary="Get dashboard summary for current user",
                         operation_description="Returns admin/employer/seeker specific dashboard info based on your role.")
     def list(self, request):
         user = request.user
-        if getattr(user, "role", None) == "admin":
-            return self.admin_dashboard(request)
-        elif getattr(user, "role", None) == "employer":
-            return self.employer_dashboard(request)
-        elif getattr(user, "role", None) == "seeker":
-            return self.seeker_dashboard(request)
+        role = getattr(user, "role", None)
+        if role == "admin":
+            build = self.admin_dashboard
+        elif role == "employer":
+            build = self.employer_dashboard
+        elif role == "seeker":
+            build = self.seeker_dashboard
         else:
             raise PermissionDenied("Invalid user role for dashboard.")
+        # Cached per user and role; invalidated by dashboard.signals
+        return Response(get_or_build(role, user.id, lambda: build(request).data))
 
     def admin_dashboard(self, request):
-        total_users = User.objects.count()
-        total_jobs = Job.objects.count()
-        total_applications = Application.objects.count()
-        # total_revenue = PaymentTransaction.objects.filter(status='completed').aggregate(total=Sum('amount'))['total'] or 0
+        # Current state, from the signal-maintained counters (dashboard.counters) in one query.
+        # (Rollups record status as of the rollup day and never see deletes.)
+        counts = current_counts()
+        users = {role: counts[USERS].get(role, 0) for role, _ in User.ROLE_CHOICES}
+        applications = {status: counts[APPLICATIONS].get(status, 0) for status, _ in Application.STATUS_CHOICES}
+        total_users = sum(counts[USERS].values())
+        total_jobs = counts[JOBS].get('', 0)
+        total_applications = sum(counts[APPLICATIONS].values())
+        # Revenue snapshots plus the ledger entries recorded since the last rollup
+        total_revenue = revenue_summary()['net']
 
         recent_jobs = list(Job.objects.order_by('-created_at')[:5].values('id', 'title', 'company_name', 'created_at'))
         recent_applications = list(Application.objects.order_by('-applied_at')[:5].values('id', 'job_id', 'applicant_id', 'applied_at', 'status'))
@@ -44,7 +85,9 @@ class DashboardViewSet(ViewSet):
             'total_users': total_users,
             'total_jobs': total_jobs,
             'total_applications': total_applications,
-            # 'total_revenue': total_revenue,
+            'users_by_role': users,
+            'applications_by_status': applications,
+            'total_revenue': total_revenue,
             'recent_jobs': recent_jobs,
             'recent_applications': recent_applications
         }
@@ -53,19 +96,24 @@ class DashboardViewSet(ViewSet):
 
     def employer_dashboard(self, request):
         user = request.user
-        jobs_qs = Job.objects.filter(employer=user)
-        jobs_posted = jobs_qs.count()
-        total_applications = Application.objects.filter(job__in=jobs_qs).count()
-        featured_jobs = jobs_qs.filter(is_featured=True).count()
-        # earnings = PaymentTransaction.objects.filter(payee=user, status='completed').aggregate(total=Sum('amount'))['total'] or 0
+        jobs_qs = Job.objects.filter(employer_id=user.id)
+        # One query over jobs LEFT JOIN applications; job counts need distinct
+        counts = jobs_qs.aggregate(
+            jobs_posted=Count('pk', distinct=True),
+            featured_jobs=Count('pk', distinct=True, filter=Q(is_featured=True)),
+            total_applications=Count('applications'),
+            **status_counts('applications__status', 'applications'),
+        )
+        featured_spend = revenue_summary(employer_id=user.id)['net']
         top_jobs = list(jobs_qs.order_by('-views_count')[:5].values('id', 'title', 'views_count', 'applications_count'))
 
         payload = {
             'employer_id': user.id,
-            'jobs_posted': jobs_posted,
-            'total_applications': total_applications,
-            'featured_jobs': featured_jobs,
-            # 'earnings': earnings,
+            'jobs_posted': counts['jobs_posted'],
+            'total_applications': counts['total_applications'],
+            'featured_jobs': counts['featured_jobs'],
+            'applications_by_status': pop_status_counts(counts),
+            'featured_spend': featured_spend,
             'top_jobs': top_jobs
         }
         serializer = EmployerDashboardSerializer(payload)
@@ -73,33 +121,113 @@ class DashboardViewSet(ViewSet):
 
     def seeker_dashboard(self, request):
         user = request.user
-        applications_count = Application.objects.filter(applicant=user).count()
-        interviews = Application.objects.filter(applicant=user, status='interviewed').count()
-        offers = Application.objects.filter(applicant=user, status='offered').count()
-        recently_applied = list(Application.objects.filter(applicant=user).order_by('-applied_at')[:5].values('id', 'job_id', 'applied_at', 'status'))
+        counts = Application.objects.filter(applicant_id=user.id).aggregate(
+            applications_count=Count('pk'),
+            **status_counts('status'),
+        )
+        by_status = pop_status_counts(counts)
+        recently_applied = list(Application.objects.filter(applicant_id=user.id).order_by('-applied_at')[:5].values('id', 'job_id', 'applied_at', 'status'))
 
         # simple recommendation: jobs not applied to, limit 5
-        recommended_jobs = list(Job.objects.exclude(applications__applicant=user).filter(is_active=True).order_by('-created_at')[:5].values('id', 'title', 'company_name', 'location'))
+        recommended_jobs = list(Job.objects.exclude(applications__applicant_id=user.id).filter(is_active=True).order_by('-created_at')[:5].values('id', 'title', 'company_name', 'location'))
 
         payload = {
             'seeker_id': user.id,
-            'applications_count': applications_count,
-            'interviews': interviews,
-            'offers': offers,
+            'applications_count': counts['applications_count'],
+            'interviews': by_status[Application.INTERVIEWED],
+            'offers': by_status[Application.OFFERED],
+            'applications_by_status': by_status,
             'recently_applied': recently_applied,
             'recommended_jobs': recommended_jobs
         }
         serializer = SeekerDashboardSerializer(payload)
         return Response(serializer.data)
 
+    @swagger_auto_schema(operation_summary="Dashboard cache hit rate (admin only)",
+                        operation_description="Counts of fresh hits, stale hits and misses since the cache was last cleared.")
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        if getattr(request.user, "role", None) != "admin":
+            raise PermissionDenied("Only admins can view cache statistics.")
+        return Response(dashboard_cache_stats())
+
+    @swagger_auto_schema(operation_summary="Database connection reuse (admin only)",
+                        operation_description="Per database: connections opened and time spent opening them, against requests "
+                                              "served, plus psycopg pool stats when pooling is on. Counted per process since it started.")
+    @action(detail=False, methods=['get'], url_path='connection-stats')
+    def connection_stats(self, request):
+        if getattr(request.user, "role", None) != "admin":
+            raise PermissionDenied("Only admins can view connection statistics.")
+        return Response(db_connection_stats())
+
     # optional: endpoint for custom date ranges
     @swagger_auto_schema(operation_summary="Dashboard stats for a number of days",
-                        operation_description="Example: /dashboard/stats/?days=7")
+                        operation_description="Example: /dashboard/stats/?days=7. Counts the last `days` calendar days, "
+                                              "today included, like the funnel and time series.")
     @action(detail=False, methods=['get'])
     def stats(self, request):
         # Example: /dashboard/stats/?days=7
-        days = int(request.query_params.get('days', '7'))
-        since = timezone.now() - timedelta(days=days)
-        jobs_created = Job.objects.filter(created_at__gte=since).count()
-        applications_created = Application.objects.filter(applied_at__gte=since).count()
+        days = parse_days(request, 7)
+        # Whole days (the rollups' grain): today and the days - 1 before it
+        since_day = timezone.localdate() - timedelta(days=days - 1)
+        totals = metric_totals(['jobs', 'applications'], since_day=since_day)
+        jobs_created = totals['jobs']
+        applications_created = totals['applications']
         return Response({'days': days, 'jobs_created': jobs_created, 'applications_created': applications_created})
+
+    @swagger_auto_schema(operation_summary="Bucketed time series for jobs, applications, signups and reviews",
+                        operation_description="Example: /dashboard/timeseries/?interval=week&days=90&metrics=jobs,applications. "
+                                              "Admins see platform-wide data, employers see their own jobs.")
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        user = request.user
+        role = getattr(user, "role", None)
+        if role == "admin":
+            employer_id, allowed = None, ['jobs', 'applications', 'signups', 'reviews']
+        elif role == "employer":
+            employer_id, allowed = user.id, ['jobs', 'applications', 'reviews']
+        else:
+            raise PermissionDenied("Only admins and employers can view analytics.")
+
+        interval = request.query_params.get('interval', 'day')
+        if interval not in INTERVALS:
+            raise ValidationError({'interval': f"Choose one of: {', '.join(INTERVALS)}."})
+        days = parse_days(request, 30)
+
+        metrics = request.query_params.get('metrics')
+        metrics = [m.strip() for m in metrics.split(',') if m.strip()] if metrics else allowed
+        unknown = [m for m in metrics if m not in allowed]
+        if unknown:
+            raise ValidationError({'metrics': f"Unknown or not allowed: {', '.join(unknown)}."})
+
+        return Response(build_timeseries(metrics, interval, days, employer_id=employer_id))
+
+    @swagger_auto_schema(operation_summary="Hiring funnel: views, applications, interviews, offers and acceptances",
+                        operation_description="Example: /dashboard/funnel/?days=90&group_by=job&category=3. "
+                                              "group_by is one of job, category, day. Admins see all jobs, employers their own.")
+    @action(detail=False, methods=['get'])
+    def funnel(self, request):
+        user = request.user
+        role = getattr(user, "role", None)
+        if role == "admin":
+            employer_id = None
+        elif role == "employer":
+            employer_id = user.id
+        else:
+            raise PermissionDenied("Only admins and employers can view the hiring funnel.")
+
+        days = parse_days(request, 30)
+        group_by = request.query_params.get('group_by') or None
+        if group_by is not None and group_by not in GROUPINGS:
+            raise ValidationError({'group_by': f"Choose one of: {', '.join(GROUPINGS)}."})
+        filters = {}
+        for param in ('job', 'category'):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    filters[f'{param}_id'] = int(value)
+                except ValueError:
+                    raise ValidationError({param: 'Must be an integer.'})
+
+        since_day = timezone.localdate() - timedelta(days=days - 1)
+        return Response(build_funnel(since_day, employer_id=employer_id, group_by=group_by, **filters))
@@ -0,0 +1,188 @@
+"""
+Saved-search job alerts.
+
+Each saved search is indexed under a single anchor key built from
+predicates every matching job must satisfy: its longest keyword and/or its
+category, else its experience level, employment type, remote option, or
+`any`. A batch of new jobs expands into the keys it satisfies, only
+searches anchored on those keys are loaded, and the full predicate is
+checked in Python. The cost follows the number of candidates, not
+searches x jobs.
+
+Matches are stored as JobAlertMatch rows and sent as one digest per user
+by `send_job_alerts`.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from django.db import transaction
+from django.utils import timezone
+
+from applications.indexing import tokenize
+from jobs.models import Job, JobAlertMatch, SavedSearch
+from notifications.fanout import notify_each
+from notifications.outbound import queue_email
+
+ANY = 'any'
+KEY_CHUNK_SIZE = 1000
+MATCH_BATCH_SIZE = 1000
+DIGEST_MAX_JOBS = 10
+DIGEST_BATCH_USERS = 500
+
+
+@lru_cache(maxsize=100_000)
+def keyword_terms(keywords):
+    return frozenset(tokenize(keywords))
+
+
+def job_terms(job):
+    return frozenset(tokenize(' '.join(filter(None, [job.title, job.company_name, job.description, job.location]))))
+
+
+def search_anchor(search):
+    parts = []
+    terms = keyword_terms(search.keywords or '')
+    if terms:
+        # Longer words are usually rarer, so fewer searches share the anchor
+        parts.append(f'kw:{max(sorted(terms), key=len)}')
+    if search.category_id:
+        parts.append(f'cat:{search.category_id}')
+    if not parts:
+        for field, prefix in (('experience_level', 'exp'), ('employment_type', 'type'), ('remote_option', 'remote')):
+            value = getattr(search, field)
+            if value:
+                return f'{prefix}:{value}'
+        return ANY
+    return '|'.join(parts)[:80]
+
+
+def job_keys(job, terms):
+    """Every anchor a search matching this job could have."""
+    keys = {ANY, f'exp:{job.experience_level}', f'type:{job.employment_type}', f'remote:{job.remote_option}'}
+    keywords = {f'kw:{term}' for term in terms}
+    keys.update(key[:80] for key in keywords)
+    if job.category_id:
+        category = f'cat:{job.category_id}'
+        keys.add(category)
+        keys.update(f'{keyword}|{category}'[:80] for keyword in keywords)
+    return keys
+
+
+def search_matches(search, job, terms):
+    if search.category_id and search.category_id != job.category_id:
+        return False
+    for field in ('employment_type', 'experience_level', 'remote_option'):
+        value = getattr(search, field)
+        if value and value != getattr(job, field):
+            return False
+    # Same semantics as JobFilter's salary__gt / salary__lt
+    if search.min_salary is not None and (job.salary is None or job.salary <= search.min_salary):
+        return False
+    if search.max_salary is not None and (job.salary is None or job.salary >= search.max_salary):
+        return False
+    return keyword_terms(search.keywords or '') <= terms
+
+
+def match_jobs(jobs):
+    """
+    Record JobAlertMatch rows for `jobs` against all active saved searches.
+    Returns (matches, candidates checked).
+    """
+    by_key = defaultdict(list)
+    for job in jobs:
+        terms = job_terms(job)
+        for key in job_keys(job, terms):
+            by_key[key].append((job, terms))
+
+    matches, matched, candidates = [], 0, 0
+    keys = sorted(by_key)
+    for start in range(0, len(keys), KEY_CHUNK_SIZE):
+        searches = (
+            SavedSearch.objects.filter(is_active=True, anchor__in=keys[start:start + KEY_CHUNK_SIZE])
+            .only('id', 'user_id', 'anchor', 'keywords', 'category_id', 'employment_type',
+                  'experience_level', 'remote_option', 'min_salary', 'max_salary')
+            .iterator(chunk_size=5000)
+        )
+        for search in searches:
+            for job, terms in by_key[search.anchor]:
+                candidates += 1
+                if search_matches(search, job, terms):
+                    matches.append(JobAlertMatch(search_id=search.id, job_id=job.id, user_id=search.user_id))
+            if len(matches) >= MATCH_BATCH_SIZE:
+                matched += len(matches)
+                JobAlertMatch.objects.bulk_create(matches, ignore_conflicts=True)
+                matches = []
+
+    JobAlertMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return matched + len(matches), candidates
+
+
+def send_digests(limit=None):
+    """
+    Send one notification (and email, if any of the user's matching searches
+    ask for it) per user with pending matches. Returns the number of digests.
+
+    Users are handled DIGEST_BATCH_USERS at a time, each batch in its own
+    transaction: their pending matches are locked with SKIP LOCKED and marked
+    notified before it commits, so concurrent runs never send a match twice.
+    """
+    sent = processed = 0
+    after_user_id = 0
+    while limit is None or processed < limit:
+        with transaction.atomic():
+            user_ids = list(
+                JobAlertMatch.objects.filter(notified_at__isnull=True, user_id__gt=after_user_id)
+                .order_by('user_id').values_list('user_id', flat=True).distinct()[:DIGEST_BATCH_USERS]
+            )
+            if not user_ids:
+                break
+            after_user_id = user_ids[-1]
+            claimed = (
+                JobAlertMatch.objects.select_for_update(skip_locked=True)
+                .filter(notified_at__isnull=True, user_id__in=user_ids)
+                .order_by('user_id', 'id').values_list('id', flat=True)
+            )
+            if limit:
+                claimed = claimed[:limit - processed]
+            match_ids = list(claimed)
+            processed += len(match_ids)
+            sent += _send_digests(match_ids)
+    return sent
+
+
+def _send_digests(match_ids):
+    """Notify (and email) each user about their matches in `match_ids` and mark them notified."""
+    digests = {}
+    for start in range(0, len(match_ids), MATCH_BATCH_SIZE):
+        pending = (
+            JobAlertMatch.objects.filter(id__in=match_ids[start:start + MATCH_BATCH_SIZE])
+            .order_by('user_id', 'id')
+            .values_list('user_id', 'job_id', 'job__title', 'job__company_name', 'search__email_digest', 'user__email')
+        )
+        for user_id, job_id, title, company, email_digest, email in pending:
+            digest = digests.setdefault(user_id, {'jobs': {}, 'email': None})
+            digest['jobs'].setdefault(job_id, f"{title} at {company}")
+            if email_digest:
+                digest['email'] = email
+
+    entries = []
+    for user_id, digest in digests.items():
+        jobs = list(digest['jobs'].items())
+        message = ("1 new job matches your saved searches" if len(jobs) == 1
+                   else f"{len(jobs)} new jobs match your saved searches")
+        entries.append((user_id, 'job_alerts.digest', message, {'job_ids': [job_id for job_id, _ in jobs]}))
+        if digest['email']:
+            lines = [f"- {label}" for _, label in jobs[:DIGEST_MAX_JOBS]]
+            if len(jobs) > DIGEST_MAX_JOBS:
+                lines.append(f"...and {len(jobs) - DIGEST_MAX_JOBS} more")
+            queue_email([digest['email']], message, "\n".join(lines))
+    notify_each(entries)
+
+    now = timezone.now()
+    for start in range(0, len(match_ids), MATCH_BATCH_SIZE):
+        JobAlertMatch.objects.filter(id__in=match_ids[start:start + MATCH_BATCH_SIZE]).update(notified_at=now)
+    return len(digests)
+
+
+def match_job_ids(job_ids):
+    return match_jobs(list(Job.objects.filter(id__in=job_ids, is_active=True)))
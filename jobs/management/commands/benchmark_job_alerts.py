@@ -0,0 +1,107 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from faker import Faker
+
+from accounts.models import User
+from applications.indexing import tokenize
+from jobs.alerts import job_terms, match_jobs, search_anchor, search_matches
+from jobs.models import Job, JobAlertMatch, JobCategory, SavedSearch
+
+SKILLS = [
+    "python", "django", "react", "typescript", "docker", "kubernetes", "aws", "sql", "excel", "figma",
+    "flutter", "java", "spring", "golang", "rust", "node.js", "spark", "pandas", "terraform", "kafka",
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Match a day of new jobs against saved searches through the anchor index and compare with "
+            "the estimated cost of checking every search against every job. All rows are rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=1_000_000)
+        parser.add_argument('--jobs', type=int, default=10_000)
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        fake = Faker()
+        Faker.seed(options['seed'])
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self.run(fake, rng, options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, fake, rng, options):
+        # Seekers search for job-title words ("nurse", "engineer") and skills
+        vocabulary = sorted({word for _ in range(3000) for word in tokenize(fake.job())} | set(SKILLS))
+        categories = [JobCategory.objects.create(name=f'Bench {i}') for i in range(20)]
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(email=f'bench-alerts-{i}@example.invalid', role=User.Job_Seeker, password=password)
+             for i in range(options['users'])],
+            batch_size=1000,
+        )
+        user_ids = list(User.objects.filter(email__startswith='bench-alerts-').values_list('id', flat=True))
+        employer = User.objects.create(email='bench-alerts-employer@example.invalid', role=User.Employer, password=password)
+
+        t0 = time.perf_counter()
+        batch = []
+        for i in range(options['searches']):
+            # Mostly keyword searches, some category-only and a few broad filter-only searches
+            kind = rng.random()
+            search = SavedSearch(
+                user_id=rng.choice(user_ids),
+                keywords=' '.join(rng.sample(vocabulary, rng.randint(1, 2)) + rng.sample(SKILLS, rng.randint(0, 1)))
+                if kind < 0.8 else '',
+                category_id=rng.choice(categories).id if 0.5 < kind < 0.99 else None,
+                employment_type=rng.choice([''] + [c for c, _ in Job.EMPLOYMENT_TYPE_CHOICES]),
+                remote_option=rng.choice(['', '', Job.REMOTE, Job.HYBRID]),
+                min_salary=rng.choice([None, None, 30000, 60000, 90000]),
+            )
+            search.anchor = search_anchor(search)
+            batch.append(search)
+            if len(batch) == 5000:
+                SavedSearch.objects.bulk_create(batch)
+                batch = []
+        SavedSearch.objects.bulk_create(batch)
+        self.stdout.write(f"Created {options['searches']} saved searches in {time.perf_counter() - t0:.1f}s")
+
+        jobs = Job.objects.bulk_create([
+            Job(employer=employer, title=f"{fake.job()} ({rng.choice(SKILLS)})", company_name=fake.company(),
+                description=f"{fake.paragraph(nb_sentences=4)} {' '.join(rng.sample(SKILLS, 2))}",
+                location=fake.city(), category=rng.choice(categories),
+                employment_type=rng.choice([c for c, _ in Job.EMPLOYMENT_TYPE_CHOICES]),
+                remote_option=rng.choice([c for c, _ in Job.REMOTE_OPTION_CHOICES]),
+                salary=rng.randint(20, 150) * 1000)
+            for _ in range(options['jobs'])
+        ], batch_size=1000)
+
+        self.stdout.write(f"Created {len(jobs)} jobs; searchable vocabulary of {len(vocabulary)} words")
+        t0 = time.perf_counter()
+        matched, candidates = match_jobs(jobs)
+        indexed = time.perf_counter() - t0
+        self.stdout.write(f"Anchor index: {matched} matches from {candidates} candidate checks "
+                          f"in {indexed:.2f}s ({JobAlertMatch.objects.count()} rows)")
+
+        # Brute force on a sample, extrapolated to searches x jobs
+        sample_searches = list(SavedSearch.objects.all()[:2000])
+        sample_jobs = [(job, job_terms(job)) for job in jobs[:50]]
+        t0 = time.perf_counter()
+        for search in sample_searches:
+            for job, terms in sample_jobs:
+                search_matches(search, job, terms)
+        per_check = (time.perf_counter() - t0) / (len(sample_searches) * len(sample_jobs))
+        brute_checks = options['searches'] * options['jobs']
+        self.stdout.write(f"Brute force: {brute_checks} checks, estimated {per_check * brute_checks:.0f}s "
+                          f"(without loading the searches)")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.alerts import send_digests
+
+
+class Command(BaseCommand):
+    help = "Send one digest per user for jobs that matched their saved searches since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help="Maximum number of pending matches to process.")
+
+    def handle(self, *args, **options):
+        sent = send_digests(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} job alert digests."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['created_at'], name='job_created_at_idx'),
+        ),
+    ]
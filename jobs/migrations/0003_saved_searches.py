@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_job_created_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('keywords', models.CharField(blank=True, max_length=255)),
+                ('employment_type', models.CharField(blank=True, choices=[('full_time', 'Full Time'), ('part_time', 'Part Time'), ('contract', 'Contract'), ('internship', 'Internship'), ('temporary', 'Temporary')], max_length=50)),
+                ('experience_level', models.CharField(blank=True, choices=[('entry_level', 'Entry Level'), ('mid_level', 'Mid Level'), ('senior_level', 'Senior Level'), ('director', 'Director'), ('executive', 'Executive')], max_length=50)),
+                ('remote_option', models.CharField(blank=True, choices=[('on_site', 'On-site'), ('remote', 'Remote'), ('hybrid', 'Hybrid')], max_length=50)),
+                ('min_salary', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_salary', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('email_digest', models.BooleanField(default=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('anchor', models.CharField(editable=False, max_length=80)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.jobcategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobAlertMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='jobs.savedsearch')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['anchor'], name='saved_search_anchor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobalertmatch',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['user', 'id'], name='job_alert_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobalertmatch',
+            constraint=models.UniqueConstraint(fields=('search', 'job'), name='unique_job_alert_match'),
+        ),
+    ]
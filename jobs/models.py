@@ -68,5 +68,74 @@ class Job(models.Model):
     applications_count = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    # Shown on the cached dashboards; dashboard.signals ignores saves that change none of them
+    DASHBOARD_FIELDS = ('employer_id', 'title', 'company_name', 'is_featured', 'views_count', 'applications_count',
+                        'created_at')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='job_created_at_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_dashboard = tuple(instance.__dict__.get(field) for field in cls.DASHBOARD_FIELDS)
+        return instance
+
+    def __str__(self):
+        return f"{self.title} at {self.company_name}"
+
+class SavedSearch(models.Model):
+    """
+    A seeker's saved job search, stored as structured predicates. `anchor` is
+    the one predicate a job must satisfy to be a candidate (see jobs.alerts),
+    so new jobs are only checked against searches indexed under their keys.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True)
+    keywords = models.CharField(max_length=255, blank=True)
+    category = models.ForeignKey(JobCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    employment_type = models.CharField(max_length=50, choices=Job.EMPLOYMENT_TYPE_CHOICES, blank=True)
+    experience_level = models.CharField(max_length=50, choices=Job.EXPERIENCE_LEVEL_CHOICES, blank=True)
+    remote_option = models.CharField(max_length=50, choices=Job.REMOTE_OPTION_CHOICES, blank=True)
+    min_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    email_digest = models.BooleanField(default=True)
+    is_active = models.BooleanField(default=True)
+    anchor = models.CharField(max_length=80, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['anchor'], condition=models.Q(is_active=True), name='saved_search_anchor_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Imported here: jobs.alerts uses the applications tokenizer, which imports this module
+        from jobs.alerts import search_anchor
+        self.anchor = search_anchor(self)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name or self.keywords or 'Saved search'} ({self.user_id})"
+
+
+class JobAlertMatch(models.Model):
+    """A new job that matched a saved search, waiting for (or included in) a digest."""
+    search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='+')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'job'], name='unique_job_alert_match')
+        ]
+        indexes = [
+            models.Index(fields=['user', 'id'], condition=models.Q(notified_at__isnull=True), name='job_alert_pending_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.title} at {self.company_name}"
\ No newline at end of file
+        return f"Job {self.job_id} for search {self.search_id}"
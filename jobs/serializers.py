@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from jobs.models import Job, JobCategory
+from jobs.models import Job, JobCategory, SavedSearch
+from reviews.serializers import RatingSummarySerializer
 
 class JobCategorySerializer(serializers.ModelSerializer):
     job_count = serializers.IntegerField(read_only=True)
@@ -19,13 +20,27 @@ class JobSerializer(serializers.ModelSerializer):
         source='category',
         write_only=True
     )
+    rating_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = Job
         fields = [
             'id', 'employer', 'title', 'company_name', 'description', 'requirements', 
             'location', 'category', 'category_id', 'is_featured', 'created_at', 'employment_type', 
-            'experience_level', 'remote_option', 'salary'
+            'experience_level', 'remote_option', 'salary', 'rating_summary'
             ]
         
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        # Set only by payments.ledger once a featured-listing payment settles
+        read_only_fields = ['id', 'created_at', 'is_featured']
+
+    def get_rating_summary(self, obj):
+        return RatingSummarySerializer.for_instance(obj)
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = [
+            'id', 'name', 'keywords', 'category', 'employment_type', 'experience_level', 'remote_option',
+            'min_salary', 'max_salary', 'email_digest', 'is_active', 'created_at'
+        ]
+        read_only_fields = ['id', 'created_at']
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from jobs.models import Job
+from tasks.queue import enqueue
+
+
+@receiver(post_save, sender=Job)
+def queue_alert_matching(sender, instance, created, **kwargs):
+    if created:
+        enqueue('jobs.match_alerts', job_id=instance.pk)
@@ -0,0 +1,8 @@
+from jobs.alerts import match_job_ids
+from tasks.queue import task
+
+
+@task('jobs.match_alerts', batch=True)
+def match_alerts(payloads):
+    # All jobs queued since the last worker pass are matched together
+    match_job_ids({payload['job_id'] for payload in payloads})
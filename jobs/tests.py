@@ -1,3 +1,113 @@
+from unittest import mock
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from jobs.alerts import job_keys, job_terms, match_jobs, send_digests
+from jobs.models import Job, JobAlertMatch, JobCategory, SavedSearch
+from notifications.models import Notification, OutboundEmail
 
 # Create your tests here.
+
+
+class FeaturedFlagTests(TestCase):
+    """Only a settled featured-listing payment (payments.ledger) features a job."""
+
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.category = JobCategory.objects.create(name='Engineering')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_patch_ignores_is_featured(self):
+        job = Job.objects.create(employer=self.employer, title='Engineer', company_name='Acme', description='x',
+                                 category=self.category)
+        response = self.client.patch(f'/api/v1/jobs/{job.id}/', {'is_featured': True, 'title': 'Senior Engineer'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['is_featured'])
+        job.refresh_from_db()
+        self.assertEqual((job.title, job.is_featured), ('Senior Engineer', False))
+
+    def test_create_ignores_is_featured(self):
+        response = self.client.post('/api/v1/jobs/', {
+            'title': 'Engineer', 'company_name': 'Acme', 'description': 'x', 'category_id': self.category.id,
+            'employer': self.employer.id, 'is_featured': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Job.objects.get(pk=response.data['id']).is_featured)
+
+
+class JobAlertTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.seeker = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+        self.engineering = JobCategory.objects.create(name='Engineering')
+        self.design = JobCategory.objects.create(name='Design')
+
+    def create_job(self, title, category, **fields):
+        return Job.objects.create(employer=self.employer, title=title, company_name='Acme', description='x',
+                                  category=category, **fields)
+
+    def search(self, user=None, **predicates):
+        return SavedSearch.objects.create(user=user or self.seeker, **predicates)
+
+    def test_jobs_are_checked_against_searches_on_their_anchors(self):
+        job = self.create_job('Senior Python Developer', self.engineering, remote_option=Job.REMOTE, salary=90000)
+        keys = job_keys(job, job_terms(job))
+        matching = [
+            self.search(keywords='python developer', category=self.engineering),
+            self.search(remote_option=Job.REMOTE, min_salary=80000),
+            self.search(),
+        ]
+        other = [
+            self.search(keywords='python', category=self.design),
+            self.search(keywords='golang'),
+            self.search(remote_option=Job.REMOTE, min_salary=90000),  # salary__gt, like the job filter
+            self.search(experience_level=Job.SENIOR_LEVEL),
+        ]
+        for search in matching:
+            self.assertIn(search.anchor, keys)
+        self.assertNotIn(other[1].anchor, keys)
+
+        matched, candidates = match_jobs([job])
+        self.assertEqual(matched, 3)
+        # Only searches anchored on the job's keys are candidates
+        self.assertLess(candidates, len(matching) + len(other))
+        self.assertEqual(set(JobAlertMatch.objects.values_list('search_id', flat=True)), {s.id for s in matching})
+
+        match_jobs([job])  # already matched searches aren't matched twice
+        self.assertEqual(JobAlertMatch.objects.count(), 3)
+
+    def test_one_digest_per_user(self):
+        other_seeker = User.objects.create_user(email='other@example.com', password='x', role=User.Job_Seeker)
+        self.search(keywords='python', email_digest=False)
+        self.search(category=self.engineering)
+        self.search(user=other_seeker, keywords='designer', email_digest=False)
+        jobs = [self.create_job('Python Developer', self.engineering), self.create_job('Data Engineer', self.engineering),
+                self.create_job('Product Designer', self.design)]
+        match_jobs(jobs)
+
+        self.assertEqual(send_digests(), 2)
+        digests = {n.recipient_id: n for n in Notification.objects.filter(kind='job_alerts.digest')}
+        self.assertEqual(set(digests), {self.seeker.id, other_seeker.id})
+        self.assertEqual(sorted(digests[self.seeker.id].data['job_ids']), [jobs[0].id, jobs[1].id])
+        self.assertEqual(digests[self.seeker.id].message, "2 new jobs match your saved searches")
+        self.assertEqual(digests[other_seeker.id].data['job_ids'], [jobs[2].id])
+        # Only the seeker has a search asking for email
+        self.assertEqual([email.to for email in OutboundEmail.objects.all()], [[self.seeker.email]])
+        self.assertFalse(JobAlertMatch.objects.filter(notified_at__isnull=True).exists())
+
+        self.assertEqual(send_digests(), 0)
+        self.assertEqual(Notification.objects.filter(kind='job_alerts.digest').count(), 2)
+
+    def test_digests_are_sent_in_batches(self):
+        seekers = [User.objects.create_user(email=f'seeker{i}@example.com', password='x', role=User.Job_Seeker)
+                   for i in range(3)]
+        for seeker in seekers:
+            self.search(user=seeker)
+        match_jobs([self.create_job('Engineer', self.engineering)])
+        with mock.patch('jobs.alerts.DIGEST_BATCH_USERS', 2):
+            self.assertEqual(send_digests(), 3)
+        self.assertEqual(Notification.objects.filter(kind='job_alerts.digest').count(), 3)
@@ -1,5 +1,5 @@
-from jobs.models import Job, JobCategory
-from jobs.serializers import JobSerializer, JobCategorySerializer
+from jobs.models import Job, JobCategory, SavedSearch
+from jobs.serializers import JobSerializer, JobCategorySerializer, SavedSearchSerializer
 from django.db.models import Count
 from django_filters.rest_framework import DjangoFilterBackend
 from jobs.filters import JobFilter
@@ -7,19 +7,23 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from jobs.paginations import DefaultPagination
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
 from jobs.permissions import IsAdminOrEmployer, IsAdminOnly
+from dashboard.funnel import record_job_view
+from api.replicas import untracked_writes
 from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
 
 class JobViewSet(ModelViewSet):
-    queryset = Job.objects.select_related("category").all().order_by("-created_at")
+    queryset = Job.objects.select_related("category", "rating_summary").all().order_by("-created_at")
     serializer_class = JobSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = JobFilter
     search_fields = ["title", "company_name", "description", "location"]
     ordering_fields = ["created_at", "company_name", "title"]
     pagination_class = DefaultPagination
+    token_user_reads = True
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -38,13 +42,18 @@ class JobViewSet(ModelViewSet):
         operation_description="Get job detail by id"
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        response = super().retrieve(request, *args, **kwargs)
+        # Top of the hiring funnel; counting a view shouldn't pin the viewer to the primary
+        with untracked_writes():
+            record_job_view(kwargs[self.lookup_field])
+        return response
 
 
 class JobCategoryViewSet(ModelViewSet):
     queryset = JobCategory.objects.annotate(job_count=Count("jobs")).all()
     serializer_class = JobCategorySerializer
     pagination_class = None
+    token_user_reads = True
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
@@ -54,3 +63,23 @@ class JobCategoryViewSet(ModelViewSet):
     @swagger_auto_schema(operation_summary="List job categories")
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+
+class SavedSearchViewSet(ModelViewSet):
+    """Job seekers' saved searches. New matching jobs are sent as periodic digests."""
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = DefaultPagination
+    token_user_reads = True
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return SavedSearch.objects.none()
+        return SavedSearch.objects.filter(user_id=self.request.user.id).order_by("-created_at")
+
+    @swagger_auto_schema(operation_summary="Save a job search",
+                         operation_description="Matching new jobs are collected and sent as a notification/email digest.")
+    def perform_create(self, serializer):
+        if getattr(self.request.user, "role", None) != "seeker":
+            raise PermissionDenied("Only job seekers can save searches.")
+        serializer.save(user=self.request.user)
@@ -1,3 +1,19 @@
 from django.contrib import admin
+from notifications.models import Notification, OutboundEmail
 
 # Register your models here.
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'kind', 'message', 'is_read', 'created_at')
+    list_filter = ('kind', 'is_read')
+    list_select_related = ('recipient',)
+    raw_id_fields = ('recipient',)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'last_error')
+    readonly_fields = ('created_at', 'sent_at', 'locked_at', 'last_error')
@@ -0,0 +1,86 @@
+"""
+Notification fan-out and unread counters.
+
+`notify` writes one row per recipient with batched bulk_create, so notifying
+N users costs ceil(N / BATCH_SIZE) INSERTs. Unread counts are cached per user
+and moved with atomic cache increments; large fan-outs drop the affected
+counters instead (one delete_many) and they are recounted on next read.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+
+BATCH_SIZE = 1000
+# Above this many recipients, invalidate counters instead of incrementing them one by one
+INCREMENT_LIMIT = 100
+UNREAD_TTL = 60 * 60
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _adjust(user_id, delta):
+    try:
+        if cache.incr(_unread_key(user_id), delta) < 0:
+            cache.delete(_unread_key(user_id))
+    except ValueError:
+        # Not cached: the next unread_count() recounts
+        pass
+
+
+def _deliver(notifications):
+    with transaction.atomic():
+        for start in range(0, len(notifications), BATCH_SIZE):
+            Notification.objects.bulk_create(notifications[start:start + BATCH_SIZE])
+
+    recipient_ids = list({notification.recipient_id for notification in notifications})
+
+    def update_counters():
+        if len(recipient_ids) > INCREMENT_LIMIT:
+            cache.delete_many([_unread_key(recipient_id) for recipient_id in recipient_ids])
+        else:
+            for notification in notifications:
+                _adjust(notification.recipient_id, 1)
+
+    transaction.on_commit(update_counters)
+    return len(notifications)
+
+
+def notify(recipient_ids, kind, message, data=None):
+    """Create the same notification for each recipient. Returns the number created."""
+    recipient_ids = dict.fromkeys(recipient_id for recipient_id in recipient_ids if recipient_id is not None)
+    data = data or {}
+    return _deliver([
+        Notification(recipient_id=recipient_id, kind=kind, message=message, data=data)
+        for recipient_id in recipient_ids
+    ])
+
+
+def notify_each(entries):
+    """Create one notification per (recipient_id, kind, message, data) entry, e.g. personal digests."""
+    return _deliver([
+        Notification(recipient_id=recipient_id, kind=kind, message=message, data=data or {})
+        for recipient_id, kind, message, data in entries
+    ])
+
+
+def unread_count(user_id):
+    count = cache.get(_unread_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.add(_unread_key(user_id), count, timeout=UNREAD_TTL)
+    return count
+
+
+def mark_read(user_id, ids=None):
+    """Mark the user's notifications `ids` (all unread when None) as read. Returns the number changed."""
+    unread = Notification.objects.filter(recipient_id=user_id, is_read=False)
+    if ids is not None:
+        unread = unread.filter(id__in=ids)
+    updated = unread.update(is_read=True, read_at=timezone.now())
+    if updated:
+        transaction.on_commit(lambda: _adjust(user_id, -updated))
+    return updated
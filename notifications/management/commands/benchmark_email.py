@@ -0,0 +1,109 @@
+import smtplib
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notifications.models import OutboundEmail
+from notifications.outbound import Sender, build_message, claim_batch, queue_email
+from notifications.smtp_sink import SMTPSink
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Measure outbound email throughput against a local SMTP sink: one connection per message "
+            "versus the batched pipeline, then check the rate limit. All rows are rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500)
+        parser.add_argument('--latency', type=float, default=0.002,
+                            help="Seconds the sink waits before each reply, imitating a remote server.")
+        parser.add_argument('--rate', type=float, default=50, help="Rate limit to verify (messages per second).")
+        parser.add_argument('--fail-every', type=int, default=0,
+                            help="Make the sink reject every Nth message with a transient 451.")
+
+    def connection(self, sink):
+        return get_connection('django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=sink.port,
+                              username='', password='', use_tls=False, use_ssl=False, fail_silently=False)
+
+    def handle(self, *args, **options):
+        total = options['messages']
+        sink = SMTPSink(latency=options['latency'], fail_every=options['fail_every']).start()
+        try:
+            with transaction.atomic():
+                self.per_message(sink, total)
+                self.batched(sink, total)
+                self.rate_limited(sink, options['rate'])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            sink.stop()
+
+    def queue(self, count):
+        for i in range(count):
+            queue_email([f'bench-{i}@example.invalid'], f"Benchmark {i}", "Benchmark body")
+
+    def per_message(self, sink, total):
+        # What sending inline did: a fresh SMTP session for every message
+        self.queue(total)
+        emails = claim_batch(total)
+        sink.reset()
+        start = time.perf_counter()
+        for email in emails:
+            try:
+                with self.connection(sink) as connection:
+                    connection.send_messages([build_message(email, connection)])
+            except smtplib.SMTPException:
+                pass
+        elapsed = time.perf_counter() - start
+        OutboundEmail.objects.all().delete()
+        self.report("per-message connection", sink, elapsed)
+
+    def batched(self, sink, total):
+        self.queue(total)
+        sender = Sender(rate=0, connection=self.connection(sink))
+        sink.reset()
+        sent = retried = failed = 0
+        start = time.perf_counter()
+        while True:
+            emails = claim_batch(100)
+            if not emails:
+                break
+            result = sender.send_batch(emails)
+            sent, retried, failed = sent + result[0], retried + result[1], failed + result[2]
+            # Retries are scheduled with backoff; make them due now so the run finishes
+            OutboundEmail.objects.filter(status=OutboundEmail.QUEUED).update(next_attempt_at=emails[0].created_at)
+        elapsed = time.perf_counter() - start
+        sender.close()
+        self.report("batched pipeline", sink, elapsed)
+        self.stdout.write(f"  sent {sent}, retried {retried}, failed {failed}")
+        if OutboundEmail.objects.filter(status=OutboundEmail.SENT).count() != total:
+            raise CommandError("Not every queued email was recorded as sent")
+        OutboundEmail.objects.all().delete()
+
+    def rate_limited(self, sink, rate):
+        if not rate:
+            return
+        count = int(rate * 2)
+        self.queue(count)
+        sender = Sender(rate=rate, connection=self.connection(sink))
+        # Spend the initial burst allowance so the measurement covers the steady rate
+        sender.limiter.acquire(sender.limiter.capacity)
+        start = time.perf_counter()
+        sender.send_batch(claim_batch(count))
+        elapsed = time.perf_counter() - start
+        sender.close()
+        measured = count / elapsed
+        self.stdout.write(f"rate limit {rate:g}/s: {count} messages in {elapsed:.2f} s ({measured:.1f}/s)")
+        if measured > rate * 1.1:
+            raise CommandError(f"Rate limit exceeded: {measured:.1f}/s > {rate:g}/s")
+
+    def report(self, label, sink, elapsed):
+        messages = sink.stats['messages']
+        self.stdout.write(f"{label}: {messages} messages over {sink.stats['connections']} connection(s) "
+                          f"in {elapsed:.2f} s ({messages / elapsed:.0f}/s)")
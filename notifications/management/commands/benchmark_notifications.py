@@ -0,0 +1,61 @@
+import math
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from notifications.models import Notification
+from notifications.fanout import BATCH_SIZE, notify, unread_count, mark_read
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Notify many users of one event and check the query count stays bounded. All rows are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        total = options['users']
+        try:
+            with transaction.atomic():
+                password = make_password(None)
+                User.objects.bulk_create(
+                    [User(email=f'bench-notify-{i}@example.invalid', role=User.Job_Seeker, password=password)
+                     for i in range(total)],
+                    batch_size=1000,
+                )
+                recipient_ids = list(User.objects.filter(email__startswith='bench-notify-').values_list('id', flat=True))
+
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    created = notify(recipient_ids, 'benchmark', "Benchmark notification")
+                    elapsed = time.perf_counter() - start
+                notify_queries = len(queries)
+                # INSERT batches (SQLite caps rows per statement below BATCH_SIZE) plus savepoint/release
+                fields = [f for f in Notification._meta.concrete_fields if not f.primary_key]
+                rows_per_insert = min(BATCH_SIZE, connection.ops.bulk_batch_size(fields, recipient_ids[:BATCH_SIZE]))
+                budget = math.ceil(total / BATCH_SIZE) * math.ceil(BATCH_SIZE / rows_per_insert) + 2
+                self.stdout.write(f"notify({total} users): {created} rows, {len(queries)} queries "
+                                  f"(budget {budget}), {elapsed * 1000:.1f} ms")
+
+                user_id = recipient_ids[0]
+                with CaptureQueriesContext(connection) as queries:
+                    unread_count(user_id)
+                    unread_count(user_id)
+                self.stdout.write(f"unread_count twice: {len(queries)} queries")
+                with CaptureQueriesContext(connection) as queries:
+                    mark_read(user_id)
+                self.stdout.write(f"mark_read(all): {len(queries)} queries")
+                raise Rollback
+        except Rollback:
+            pass
+
+        if notify_queries > budget:
+            raise CommandError(f"notify used {notify_queries} queries, budget is {budget}.")
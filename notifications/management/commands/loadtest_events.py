@@ -0,0 +1,150 @@
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from accounts.tokens import UserAccessToken
+from notifications.pubsub import InProcessBroker, get_broker, user_channel
+from notifications.views import sse_messages
+
+CHANNEL = 'loadtest'
+
+
+def parse_sent(chunk):
+    """perf_counter timestamp from a `loadtest` event, or None for other frames."""
+    for line in chunk.split(b'\n'):
+        if line.startswith(b'data: '):
+            return json.loads(line[6:]).get('sent')
+    return None
+
+
+def summarize(latencies):
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+    return f"p50 {pick(0.5):8.2f} ms   p95 {pick(0.95):8.2f} ms   max {latencies[-1] * 1000:8.2f} ms"
+
+
+class Command(BaseCommand):
+    help = ("Open many idle SSE subscribers and measure memory per connection and publish-to-receive "
+            "fan-out latency. Runs in-process by default, or against a running ASGI worker with --url.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--messages', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=0.1, help="Seconds between published messages.")
+        parser.add_argument('--url', help="Stream URL of a running server, e.g. http://127.0.0.1:8000/api/v1/events/stream/. "
+                                          "Needs a shared PUBSUB_BACKEND so this process can publish to the worker.")
+        parser.add_argument('--user', help="Email of the user to connect as in --url mode.")
+
+    def handle(self, *args, **options):
+        if options['url']:
+            if not options['user']:
+                raise CommandError("--url needs --user.")
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}.")
+            asyncio.run(self.run_http(options, user))
+        else:
+            asyncio.run(self.run_in_process(options))
+
+    async def publish_all(self, publish, options):
+        for _ in range(options['messages']):
+            await publish({'sent': time.perf_counter()})
+            await asyncio.sleep(options['interval'])
+        await asyncio.sleep(max(1.0, options['interval'] * 5))
+
+    async def run_in_process(self, options):
+        broker = InProcessBroker()
+        latencies = []
+        user = SimpleNamespace(id=0)
+
+        async def consume(stream):
+            async for chunk in stream:
+                sent = parse_sent(chunk)
+                if sent is not None:
+                    latencies.append(time.perf_counter() - sent)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        streams = [sse_messages([CHANNEL], user, heartbeat=30, broker=broker) for _ in range(options['connections'])]
+        tasks = [asyncio.create_task(consume(stream)) for stream in streams]
+        while broker.subscriber_count() < options['connections']:
+            await asyncio.sleep(0.01)
+        opened = time.perf_counter() - start
+        per_connection = (tracemalloc.get_traced_memory()[0] - before) / options['connections']
+        tracemalloc.stop()
+        self.stdout.write(f"{options['connections']} subscribers ready in {opened:.2f}s, "
+                          f"~{per_connection / 1024:.1f} KiB per idle connection")
+
+        async def publish(data):
+            broker.publish([CHANNEL], 'loadtest', data)
+
+        await self.publish_all(publish, options)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(stream.aclose() for stream in streams))
+        self.report(latencies, options)
+
+    async def run_http(self, options, user):
+        url = urlsplit(options['url'])
+        token = str(UserAccessToken.for_user(user))
+        request = (f"GET {url.path or '/'} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                   f"Authorization: JWT {token}\r\nAccept: text/event-stream\r\n\r\n").encode()
+        latencies = []
+        ready = asyncio.Event()
+        connected = 0
+
+        async def connect():
+            nonlocal connected
+            reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            writer.write(request)
+            await writer.drain()
+            if b' 200 ' not in await reader.readline():
+                raise CommandError("Stream request was rejected.")
+            connected += 1
+            if connected == options['connections']:
+                ready.set()
+            try:
+                while True:
+                    chunk = await reader.readuntil(b'\n\n')
+                    sent = parse_sent(chunk)
+                    if sent is not None:
+                        latencies.append(time.perf_counter() - sent)
+            finally:
+                writer.close()
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(connect()) for _ in range(options['connections'])]
+        waiter = asyncio.create_task(ready.wait())
+        await asyncio.wait([waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+        if not ready.is_set():
+            for task in tasks:
+                if task.done() and task.exception():
+                    raise CommandError(f"Only {connected} connections opened: {task.exception()}")
+        self.stdout.write(f"{connected} connections open in {time.perf_counter() - start:.2f}s")
+
+        publish_sync = sync_to_async(get_broker().publish)
+
+        async def publish(data):
+            await publish_sync([user_channel(user.id)], 'loadtest', data)
+
+        await self.publish_all(publish, options)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.report(latencies, options)
+
+    def report(self, latencies, options):
+        expected = options['connections'] * options['messages']
+        self.stdout.write(f"Delivered {len(latencies)}/{expected} messages")
+        if latencies:
+            self.stdout.write(f"Fan-out latency   {summarize(latencies)}   mean {statistics.mean(latencies) * 1000:.2f} ms")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.outbound import Sender, claim_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound emails in rate-limited batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Emails claimed per poll.")
+        parser.add_argument('--rate', type=float, default=None,
+                            help="Messages per second (defaults to EMAIL_RATE_LIMIT, 0 = unlimited).")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--lock-timeout', type=int, default=600,
+                            help="Seconds after which a sending email is considered abandoned.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        sender = Sender(rate=options['rate'])
+        totals = [0, 0, 0]
+        try:
+            while True:
+                emails = claim_batch(options['batch_size'], options['lock_timeout'])
+                if not emails:
+                    # Don't hold an idle SMTP session open while the queue is empty
+                    sender.close()
+                    if options['once']:
+                        break
+                    close_old_connections()
+                    time.sleep(options['sleep'])
+                    continue
+                result = sender.send_batch(emails)
+                totals = [total + count for total, count in zip(totals, result)]
+                if result[1] or result[2]:
+                    self.stderr.write(f"{result[1]} email(s) will be retried, {result[2]} failed")
+        finally:
+            sender.close()
+        self.stdout.write(f"Sent {totals[0]}, retried {totals[1]}, failed {totals[2]}")
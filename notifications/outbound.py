@@ -0,0 +1,152 @@
+"""
+Outbound email pipeline.
+
+`queue_email` stores an OutboundEmail row in the caller's transaction. The
+`send_emails` command claims due rows in batches and sends them over one
+SMTP connection that stays open across batches, instead of a connection
+per message. A token bucket paces them so the provider's per-second limit
+is respected. Transient failures (4xx replies, dropped connections)
+are retried with backoff; permanent ones (5xx) fail immediately.
+"""
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from notifications.models import OutboundEmail
+from tasks.queue import claim_rows, retry_delay
+
+
+def queue_email(to, subject, body='', html=None, from_email=None):
+    return OutboundEmail.objects.create(
+        to=list(to), subject=subject[:255], body=body or '', html=html or '', from_email=from_email or '',
+    )
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` sends per second on average, bursts up to `capacity`."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """Block until `count` tokens (at most `capacity`) are available."""
+        if not self.rate:
+            return
+        count = min(count, self.capacity)
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return
+                time.sleep((count - self.tokens) / self.rate)
+
+
+def is_transient(exc):
+    # Checked first: smtplib.SMTPConnectError is also a response exception
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    # SMTPException subclasses OSError; the rest (unsupported extension, ...) won't pass on a retry
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    # Refused or reset connections, timeouts and other socket errors
+    return isinstance(exc, OSError)
+
+
+def claim_batch(batch_size, lock_timeout=600):
+    return claim_rows(OutboundEmail.objects.all(),
+                      Q(status=OutboundEmail.QUEUED, next_attempt_at__lte=timezone.now()), OutboundEmail.SENDING,
+                      ('next_attempt_at', 'id'), batch_size, lock_timeout)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body or email.html,
+        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html and email.body:
+        message.attach_alternative(email.html, 'text/html')
+    elif email.html:
+        message.content_subtype = 'html'
+    return message
+
+
+class Sender:
+    """Sends claimed emails over one reusable connection. Not thread-safe; use one per worker."""
+
+    def __init__(self, rate=None, chunk_size=None, connection=None):
+        self.limiter = RateLimiter(getattr(settings, 'EMAIL_RATE_LIMIT', 10) if rate is None else rate)
+        self.chunk_size = chunk_size or getattr(settings, 'EMAIL_CHUNK_SIZE', 20)
+        if self.limiter.rate:
+            # A chunk can't take more tokens than the bucket holds
+            self.chunk_size = max(1, min(self.chunk_size, int(self.limiter.capacity)))
+        self.connection = connection or get_connection(fail_silently=False)
+        self.opened = False
+
+    def open(self):
+        if not self.opened:
+            self.connection.open()
+            self.opened = True
+
+    def close(self):
+        if self.opened:
+            try:
+                self.connection.close()
+            finally:
+                self.opened = False
+
+    def send_batch(self, emails):
+        """Deliver `emails` and record each outcome. Returns (sent, retried, failed)."""
+        sent, failures = [], []
+        for start in range(0, len(emails), self.chunk_size):
+            chunk = emails[start:start + self.chunk_size]
+            self.limiter.acquire(len(chunk))
+            for email in chunk:
+                # One message per call on the shared connection, so a failure is pinned
+                # to its message and nothing that was accepted gets resent
+                try:
+                    self.open()
+                    self.connection.send_messages([build_message(email, self.connection)])
+                    sent.append(email)
+                except Exception as exc:
+                    failures.append((email, exc))
+                    # The session state is unknown after an error; reconnect for the next one
+                    self.close()
+        return self.record(sent, failures)
+
+    def record(self, sent, failures):
+        now = timezone.now()
+        OutboundEmail.objects.filter(id__in=[email.id for email in sent]).update(
+            status=OutboundEmail.SENT, sent_at=now, locked_at=None, last_error='')
+        retried = failed = 0
+        for email, exc in failures:
+            email.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+            email.locked_at = None
+            if is_transient(exc) and email.attempts < email.max_attempts:
+                email.status = OutboundEmail.QUEUED
+                email.next_attempt_at = now + retry_delay(email.attempts)
+                retried += 1
+            else:
+                email.status = OutboundEmail.FAILED
+                failed += 1
+        OutboundEmail.objects.bulk_update([email for email, _ in failures],
+                                          ['status', 'last_error', 'locked_at', 'next_attempt_at'])
+        return len(sent), retried, failed
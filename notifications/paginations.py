@@ -0,0 +1,6 @@
+from rest_framework.pagination import CursorPagination
+
+class NotificationCursorPagination(CursorPagination):
+    # Keyset pagination over notification_inbox_idx, newest first
+    page_size = 20
+    ordering = ('-created_at', '-id')
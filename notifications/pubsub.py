@@ -0,0 +1,177 @@
+"""
+Publish/subscribe for the live event stream.
+
+Publishers are ordinary (sync) Django code such as signal handlers; subscribers
+are asyncio SSE connections. Each subscription is one bounded asyncio.Queue,
+so an idle connection costs a queue and a coroutine, not a thread.
+
+`InProcessBroker` only reaches subscribers in the same process and suits a
+single ASGI worker or development. `PostgresBroker` relays every message
+through LISTEN/NOTIFY so all workers see it. Pick one with PUBSUB_BACKEND.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+ADMIN_CHANNEL = 'admin'
+
+
+class Subscription:
+    """Messages for a set of channels, consumed from one event loop."""
+
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop. A client that stops reading loses its oldest messages.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channels):
+        """Create a subscription on the running event loop."""
+        subscription = Subscription(self, channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subscribers in self._subscriptions.values() for s in subscribers})
+
+    def publish(self, channels, event, data):
+        """Send `event` with JSON-serialisable `data` to everyone subscribed to any of `channels`."""
+        message = {'id': next(self._ids), 'event': event, 'data': data, 'channels': list(channels), 'ts': time.time()}
+        self.dispatch(message)
+
+    def dispatch(self, message):
+        with self._lock:
+            targets = set()
+            for channel in message['channels']:
+                targets.update(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            # Safe from any thread; the queue is only touched on its own loop
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # Loop already closed; the connection is gone
+                self.unsubscribe(subscription)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Relays messages between processes with NOTIFY on the default database.
+    Messages published inside a transaction are delivered when it commits.
+    Payloads must stay under Postgres' 8000 byte NOTIFY limit.
+    """
+    PG_CHANNEL = 'talent_bridge_events'
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def publish(self, channels, event, data):
+        message = {'event': event, 'data': data, 'channels': list(channels), 'ts': time.time()}
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.PG_CHANNEL, json.dumps(message, default=str)])
+
+    def subscribe(self, channels):
+        if self._listener is None:
+            with self._lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, name='pubsub-listener', daemon=True)
+                    self._listener.start()
+        return super().subscribe(channels)
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        # The default alias's own parameters, OPTIONS (sslmode, service, ...) included
+        params = connection.get_connection_params()
+        for key in ('context', 'prepare_threshold', 'cursor_factory'):
+            params.pop(key, None)  # Django's psycopg 3 / cursor settings, not libpq ones
+        conn = psycopg2.connect(**params)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.PG_CHANNEL}')
+        return conn
+
+    def _listen(self):
+        # One dedicated connection per process; every local subscriber is fed from it
+        while True:
+            try:
+                conn = self._connect()
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        message = json.loads(notify.payload)
+                        message['id'] = next(self._ids)
+                        self.dispatch(message)
+            except Exception:
+                logger.exception("Pub/sub listener lost its connection, reconnecting")
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'PUBSUB_BACKEND', 'notifications.pubsub.InProcessBroker'))()
+    return _broker
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from notifications.models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'message', 'data', 'is_read', 'created_at', 'read_at']
+        read_only_fields = fields
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if not attrs.get('all') and not attrs.get('ids'):
+            raise serializers.ValidationError("Provide `ids` or set `all` to true.")
+        return attrs
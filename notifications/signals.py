@@ -0,0 +1,61 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from applications.models import ApplicationStatusEvent
+from jobs.models import Job
+from notifications.fanout import notify
+from notifications.pubsub import get_broker, user_channel, ADMIN_CHANNEL
+
+
+def publish_on_commit(channels, event, data):
+    transaction.on_commit(partial(get_broker().publish, channels, event, data))
+
+
+@receiver(post_save, sender=ApplicationStatusEvent)
+def push_application_event(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # applications.signals creates the event with the saved Application, and the API
+    # loads its job, so neither costs a query here
+    job = instance.application.job
+    employer_id, title = job.employer_id, job.title
+    applicant_id = instance.application.applicant_id
+    channels = [user_channel(applicant_id), user_channel(employer_id), ADMIN_CHANNEL]
+
+    publish_on_commit(channels, 'application.created' if not instance.from_status else 'application.status_changed', {
+        'application_id': instance.application_id,
+        'job_id': instance.job_id,
+        'from_status': instance.from_status or None,
+        'to_status': instance.to_status,
+    })
+
+    data = {'application_id': instance.application_id, 'job_id': instance.job_id, 'status': instance.to_status}
+    if not instance.from_status:
+        notify([employer_id], 'application.created', f"New application for {title}", data)
+    elif instance.to_status == 'withdrawn':
+        notify([employer_id], 'application.withdrawn', f"An applicant withdrew from {title}", data)
+    else:
+        notify([applicant_id], 'application.status_changed',
+               f"Your application for {title} is now {instance.to_status}", data)
+
+    # Deltas the client applies to the dashboard it already has
+    by_status = {instance.to_status: 1}
+    if instance.from_status:
+        by_status[instance.from_status] = -1
+    publish_on_commit(channels, 'dashboard.delta', {
+        'applications': 0 if instance.from_status else 1,
+        'applications_by_status': by_status,
+    })
+
+
+@receiver(post_save, sender=Job)
+def push_job_created(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit([user_channel(instance.employer_id), ADMIN_CHANNEL], 'dashboard.delta', {'jobs': 1})
+
+
+@receiver(post_delete, sender=Job)
+def push_job_deleted(sender, instance, **kwargs):
+    publish_on_commit([user_channel(instance.employer_id), ADMIN_CHANNEL], 'dashboard.delta', {'jobs': -1})
@@ -0,0 +1,93 @@
+"""
+A minimal SMTP server that accepts and counts every message, for running
+`send_emails` and `benchmark_email` locally without a real mail provider:
+
+    python manage.py benchmark_email            # starts its own sink
+    EMAIL_HOST=127.0.0.1 EMAIL_PORT=1025 EMAIL_USE_TLS=False ...
+
+Only the commands Django's SMTP backend uses are implemented. `latency`
+adds a delay per reply to imitate a remote server, and `fail_every` answers
+every Nth DATA with `fail_reply` (a transient 451 by default) to exercise
+retries and failures.
+"""
+import socketserver
+import threading
+import time
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.count('connections')
+        self.reply("220 localhost SMTP sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b"250-localhost\r\n")
+                self.reply("250 8BITMIME")
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if self.server.should_fail():
+                    self.reply(self.server.fail_reply)
+                else:
+                    self.server.count('messages')
+                    self.reply("250 Queued")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, fail_every=0,
+                 fail_reply="451 Temporary failure, try again later"):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.fail_reply = fail_reply
+        self.stats = {'connections': 0, 'messages': 0, 'data': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def should_fail(self):
+        with self._lock:
+            self.stats['data'] += 1
+            return bool(self.fail_every) and self.stats['data'] % self.fail_every == 0
+
+    def reset(self):
+        with self._lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -1,3 +1,284 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
+from math import ceil
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.tokens import StreamTicket, UserAccessToken
+from applications.models import Application
+from jobs.models import Job
+from notifications import fanout
+from notifications.models import Notification, OutboundEmail
+from notifications.outbound import RateLimiter, Sender, claim_batch, is_transient
+from notifications.smtp_sink import SMTPSink
+from notifications.views import authenticate_stream
 
 # Create your tests here.
+
+
+class StreamAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+        self.client = APIClient()
+        self.factory = RequestFactory()
+
+    def stream_user(self, **extra):
+        return authenticate_stream(self.factory.get('/api/v1/events/stream/', **extra))
+
+    def test_ticket_opens_one_stream(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/v1/events/ticket/')
+        self.assertEqual(response.status_code, 200)
+        ticket = response.data['ticket']
+
+        user = self.stream_user(data={'ticket': ticket})
+        self.assertEqual((user.id, user.role), (self.user.id, User.Job_Seeker))
+        self.assertIsNone(self.stream_user(data={'ticket': ticket}))
+
+    def test_ticket_requires_authentication(self):
+        self.assertEqual(self.client.post('/api/v1/events/ticket/').status_code, 401)
+
+    def test_access_token_is_not_accepted_in_url(self):
+        access = str(UserAccessToken.for_user(self.user))
+        self.assertIsNone(self.stream_user(data={'token': access}))
+        self.assertIsNone(self.stream_user(data={'ticket': access}))
+        self.assertEqual(self.stream_user(HTTP_AUTHORIZATION=f'JWT {access}').id, self.user.id)
+
+    def test_ticket_is_not_an_access_token(self):
+        ticket = str(StreamTicket.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f'JWT {ticket}')
+        self.assertEqual(self.client.get('/api/v1/notifications/').status_code, 401)
+
+    def test_expired_ticket(self):
+        ticket = StreamTicket.for_user(self.user)
+        ticket.set_exp(lifetime=-timedelta(seconds=1))
+        self.assertIsNone(self.stream_user(data={'ticket': str(ticket)}))
+
+    def test_revoked_ticket(self):
+        ticket = str(StreamTicket.for_user(self.user))
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertIsNone(self.stream_user(data={'ticket': ticket}))
+
+
+class ApplicationEventTests(TestCase):
+    def test_event_payload_needs_no_job_or_application_lookup(self):
+        employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        seeker = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+        job = Job.objects.create(employer=employer, title='Engineer', company_name='Acme', description='x')
+        Application.objects.create(job=job, applicant=seeker, resume='resumes/r.pdf')
+
+        application = Application.objects.select_related('job').get()
+        application.status = Application.INTERVIEWED
+        with CaptureQueriesContext(connection) as queries:
+            application.save()
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertFalse([sql for sql in selects if 'FROM "jobs_job"' in sql or 'FROM "applications_application"' in sql],
+                         selects)
+
+
+class FanoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='seeker@example.com', password='x', role=User.Job_Seeker)
+
+    def notify(self, count=1, recipient_ids=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(count):
+                fanout.notify(recipient_ids or [self.user.id], 'job_posted', 'A new job')
+
+    @mock.patch.object(fanout, 'BATCH_SIZE', 100)  # Under SQLite's 999 parameters per statement
+    def test_large_audience_is_inserted_in_batches(self):
+        audience = User.objects.bulk_create(
+            User(email=f'user{i}@example.com', role=User.Job_Seeker) for i in range(fanout.BATCH_SIZE * 2 + 50)
+        )
+        recipient_ids = [user.id for user in audience]
+        for recipient_id in recipient_ids[:3]:
+            fanout.unread_count(recipient_id)
+
+        # One INSERT per batch, plus the savepoint around them
+        with self.assertNumQueries(ceil(len(recipient_ids) / fanout.BATCH_SIZE) + 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(fanout.notify(recipient_ids + [None, recipient_ids[0]], 'job_posted', 'x'),
+                                 len(recipient_ids))
+        self.assertEqual(Notification.objects.count(), len(recipient_ids))
+        # Too many counters to increment: they were dropped and are recounted
+        self.assertEqual(fanout.unread_count(recipient_ids[0]), 1)
+
+    def test_unread_count_rises_on_commit_only(self):
+        self.assertEqual(fanout.unread_count(self.user.id), 0)
+        self.notify(2)
+        with self.assertNumQueries(0):
+            self.assertEqual(fanout.unread_count(self.user.id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    fanout.notify([self.user.id], 'job_posted', 'A new job')
+                    raise IntegrityError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(fanout.unread_count(self.user.id), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_mark_read_lowers_the_count_but_not_below_zero(self):
+        self.notify(3)
+        first = Notification.objects.earliest('id')
+        self.assertEqual(fanout.unread_count(self.user.id), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(fanout.mark_read(self.user.id, [first.id]), 1)
+        self.assertEqual(fanout.unread_count(self.user.id), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(fanout.mark_read(self.user.id, [first.id]), 0)
+        self.assertEqual(fanout.unread_count(self.user.id), 2)
+
+        # A counter that drifted low is dropped rather than going negative
+        cache.set(fanout._unread_key(self.user.id), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(fanout.mark_read(self.user.id), 2)
+        self.assertIsNone(cache.get(fanout._unread_key(self.user.id)))
+        self.assertEqual(fanout.unread_count(self.user.id), 0)
+
+    def test_inbox_pages_newest_first(self):
+        other = User.objects.create_user(email='other@example.com', password='x', role=User.Job_Seeker)
+        self.notify(45)
+        self.notify(recipient_ids=[other.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            fanout.mark_read(self.user.id, Notification.objects.filter(recipient=self.user).order_by('id')
+                             .values_list('id', flat=True)[:5])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        def read_all(url):
+            ids = []
+            while url:
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                ids.extend(row['id'] for row in response.data['results'])
+                url = response.data['next']
+            return ids
+
+        ids = read_all('/api/v1/notifications/')
+        expected = list(Notification.objects.filter(recipient=self.user).order_by('-created_at', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(ids), 45)
+        self.assertEqual(read_all('/api/v1/notifications/?unread=true'), expected[:40])
+
+        response = client.get('/api/v1/notifications/unread-count/')
+        self.assertEqual(response.data['unread_count'], 40)
+
+
+class OutboundEmailTests(TestCase):
+    """Sending claimed emails to the local SMTP sink."""
+
+    def start_sink(self, **options):
+        sink = SMTPSink(**options).start()
+        self.addCleanup(sink.stop)
+        connection = get_connection('django.core.mail.backends.smtp.EmailBackend', host='127.0.0.1', port=sink.port,
+                                    username='', password='', use_tls=False, fail_silently=False)
+        return sink, Sender(rate=0, connection=connection)
+
+    def send(self, sender, count, **fields):
+        for i in range(count):
+            OutboundEmail.objects.create(to=[f'user{i}@example.com'], subject='Hello', body='Hi', **fields)
+        try:
+            return sender.send_batch(list(claim_batch(count)))
+        finally:
+            sender.close()
+
+    def test_batch_is_sent_over_one_connection(self):
+        sink, sender = self.start_sink()
+        self.assertEqual(self.send(sender, 3), (3, 0, 0))
+        self.assertEqual((sink.stats['messages'], sink.stats['connections']), (3, 1))
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', flat=True)), {OutboundEmail.SENT})
+
+    def test_transient_failure_is_retried_later(self):
+        sink, sender = self.start_sink(fail_every=2)
+        self.assertEqual(self.send(sender, 3), (2, 1, 0))
+        # A fresh connection after the failure
+        self.assertEqual((sink.stats['messages'], sink.stats['connections']), (2, 2))
+        retried = OutboundEmail.objects.get(status=OutboundEmail.QUEUED)
+        self.assertIn('451', retried.last_error)
+        self.assertGreater(retried.next_attempt_at, timezone.now())
+        self.assertIsNone(retried.locked_at)
+
+    def test_permanent_failure_fails_at_once(self):
+        sink, sender = self.start_sink(fail_every=1, fail_reply="554 Message rejected")
+        self.assertEqual(self.send(sender, 2), (0, 0, 2))
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', flat=True)), {OutboundEmail.FAILED})
+
+    def test_transient_failure_fails_after_the_last_attempt(self):
+        sink, sender = self.start_sink(fail_every=1)
+        self.assertEqual(self.send(sender, 1, max_attempts=1), (0, 0, 1))
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.FAILED)
+
+    def test_transient_errors(self):
+        transient = [
+            smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+            smtplib.SMTPConnectError(554, 'Not now'),
+            smtplib.SMTPDataError(451, 'Try again later'),
+            smtplib.SMTPRecipientsRefused({'a@example.com': (450, b'Mailbox busy')}),
+            ConnectionRefusedError(),
+            TimeoutError(),
+        ]
+        permanent = [
+            smtplib.SMTPDataError(554, 'Rejected'),
+            smtplib.SMTPRecipientsRefused({'a@example.com': (450, b'Busy'), 'b@example.com': (550, b'No such user')}),
+            smtplib.SMTPAuthenticationError(535, 'Bad credentials'),
+            smtplib.SMTPNotSupportedError('SMTP AUTH extension not supported by server.'),
+            smtplib.SMTPException('No suitable authentication method found.'),
+            ValueError(),
+        ]
+        self.assertEqual([is_transient(exc) for exc in transient], [True] * len(transient))
+        self.assertEqual([is_transient(exc) for exc in permanent], [False] * len(permanent))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('notifications.outbound.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bursts_up_to_capacity_then_paces(self):
+        limiter = RateLimiter(10)
+        limiter.acquire(10)
+        self.assertEqual(self.clock.now, 0)
+        limiter.acquire(5)
+        self.assertAlmostEqual(self.clock.now, 0.5)
+        # A request larger than the bucket waits for a full bucket only
+        limiter.acquire(50)
+        self.assertAlmostEqual(self.clock.now, 1.5)
+
+    def test_tokens_refill_while_idle(self):
+        limiter = RateLimiter(10)
+        limiter.acquire(10)
+        self.clock.now += 60
+        limiter.acquire(10)
+        self.assertEqual(self.clock.now, 60)
+
+    def test_zero_rate_is_unlimited(self):
+        limiter = RateLimiter(0)
+        for _ in range(100):
+            limiter.acquire(10)
+        self.assertEqual(self.clock.now, 0)
@@ -1,3 +1,147 @@
-from django.shortcuts import render
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from accounts.authentication import VersionedJWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework import mixins
+from rest_framework.viewsets import GenericViewSet
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer, MarkReadSerializer
+from notifications.paginations import NotificationCursorPagination
+from notifications import fanout
+from notifications.pubsub import get_broker, user_channel, ADMIN_CHANNEL
+from accounts.tokens import ROLE_CLAIM, StreamTicket
+from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
+
+class NotificationViewSet(mixins.ListModelMixin, GenericViewSet):
+    """The current user's inbox, newest first. `?unread=true` lists unread only."""
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    token_user_reads = True
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Notification.objects.none()
+        queryset = Notification.objects.filter(recipient_id=self.request.user.id)
+        if self.request.query_params.get("unread") in ("1", "true", "True"):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @swagger_auto_schema(operation_summary="List my notifications",
+                         operation_description="Cursor paginated, newest first. Optional ?unread=true.")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(operation_summary="Number of unread notifications")
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        return Response({"unread_count": fanout.unread_count(request.user.id)})
+
+    @swagger_auto_schema(operation_summary="Mark notifications as read",
+                         operation_description="Body: {\"ids\": [1, 2]} or {\"all\": true}.",
+                         request_body=MarkReadSerializer)
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = None if serializer.validated_data["all"] else serializer.validated_data["ids"]
+        updated = fanout.mark_read(request.user.id, ids)
+        return Response({"updated": updated, "unread_count": fanout.unread_count(request.user.id)})
+
+
+@swagger_auto_schema(method="post", operation_summary="Get a ticket for the event stream",
+                     operation_description="Open /events/stream/?ticket=<ticket> within SSE_TICKET_SECONDS. "
+                                           "A ticket opens one stream; get a new one to reconnect.")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def stream_ticket(request):
+    return Response({"ticket": str(StreamTicket.for_user(request.user)), "expires_in": settings.SSE_TICKET_SECONDS})
+
+
+def redeem_ticket(raw_ticket):
+    """The validated stream ticket, or None if it is invalid, expired or was already used."""
+    try:
+        ticket = StreamTicket(raw_ticket)
+    except TokenError:
+        return None
+    # Single use, so a ticket read from a URL or an access log can't open another stream
+    if not cache.add(f"sse:ticket:{ticket[api_settings.JTI_CLAIM]}", 1, timeout=settings.SSE_TICKET_SECONDS):
+        return None
+    return ticket
+
+
+def authenticate_stream(request):
+    """
+    JWT from the Authorization header, or a ticket from ?ticket= because
+    browsers' EventSource cannot send headers. Access tokens are never read
+    from the URL. Returns the user or None. Only the id and role are needed,
+    so tokens with claims skip the User query.
+    """
+    auth = VersionedJWTAuthentication()
+    header = auth.get_header(request)
+    try:
+        if header:
+            validated_token = auth.get_validated_token(auth.get_raw_token(header))
+        else:
+            validated_token = redeem_ticket(request.GET.get('ticket', ''))
+            if validated_token is None:
+                return None
+        return auth.user_for_token(validated_token, claims_only=ROLE_CLAIM in validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def format_event(message):
+    data = json.dumps(message['data'], default=str)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n".encode()
+
+
+async def sse_messages(channels, user, heartbeat, broker=None):
+    # Subscribe inside the generator so the queue belongs to the loop that streams
+    # the response, even when sync middleware ran the view itself on another loop.
+    subscription = (broker or get_broker()).subscribe(channels)
+    try:
+        yield b'retry: 5000\n\n'
+        yield format_event({'id': 0, 'event': 'ready', 'data': {'user_id': user.id}})
+        while True:
+            message = await subscription.get(timeout=heartbeat)
+            # Comment lines keep proxies from closing an idle connection
+            yield b': keep-alive\n\n' if message is None else format_event(message)
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def event_stream(request):
+    """
+    Server-Sent Events for the current user: `application.created`,
+    `application.status_changed` and `dashboard.delta`. Serve under ASGI;
+    each connection is a coroutine waiting on its queue.
+    """
+    user = await sync_to_async(authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    channels = [user_channel(user.id)]
+    if getattr(user, "role", None) == "admin":
+        channels.append(ADMIN_CHANNEL)
+
+    response = StreamingHttpResponse(
+        sse_messages(channels, user, getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,43 @@
 from django.contrib import admin
+from payments.models import EmployerRevenue, FeaturedCheckout, PaymentTransaction, RevenueDay
 
 # Register your models here.
+
+@admin.register(FeaturedCheckout)
+class FeaturedCheckoutAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'employer', 'job', 'amount', 'currency', 'status', 'created_at', 'paid_at')
+    list_filter = ('status',)
+    search_fields = ('reference',)
+    raw_id_fields = ('employer', 'job')
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """The ledger is append-only and the snapshots are derived from it."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PaymentTransaction)
+class PaymentTransactionAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'kind', 'amount', 'currency', 'employer', 'job', 'gateway_event_id', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('gateway_event_id', 'checkout__reference')
+    list_select_related = ('employer', 'job')
+
+
+@admin.register(EmployerRevenue)
+class EmployerRevenueAdmin(ReadOnlyAdmin):
+    list_display = ('employer', 'charges', 'refunds', 'transactions', 'updated_at')
+    list_select_related = ('employer',)
+
+
+@admin.register(RevenueDay)
+class RevenueDayAdmin(ReadOnlyAdmin):
+    list_display = ('day', 'charges', 'refunds', 'transactions')
@@ -0,0 +1,98 @@
+"""
+Recording gateway events in the payments ledger.
+
+Gateways deliver webhooks at least once, often concurrently, so every event
+is applied exactly once. A retried event id is answered from a unique-index
+lookup without taking locks. A first delivery locks its checkout row, so a
+charge and its refund for one checkout are serialised. The unique
+`gateway_event_id` is the final guard against concurrent duplicates.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from dashboard.cache import ADMIN_OWNER, bump_versions
+from jobs.models import Job
+from payments.gateway import PAYMENT_REFUNDED, PAYMENT_SUCCEEDED
+from payments.models import FeaturedCheckout, PaymentTransaction
+
+RECORDED = 'recorded'
+DUPLICATE = 'duplicate'
+IGNORED = 'ignored'
+
+# event type -> (ledger kind, checkout status required, checkout status after)
+EVENT_TYPES = {
+    PAYMENT_SUCCEEDED: (PaymentTransaction.CHARGE, FeaturedCheckout.PENDING, FeaturedCheckout.PAID),
+    PAYMENT_REFUNDED: (PaymentTransaction.REFUND, FeaturedCheckout.PAID, FeaturedCheckout.REFUNDED),
+}
+STATUS_ORDER = (FeaturedCheckout.PENDING, FeaturedCheckout.PAID, FeaturedCheckout.REFUNDED)
+
+
+class PaymentError(Exception):
+    """The event is well signed but can't be applied (unknown checkout, wrong amount)."""
+
+
+class OutOfOrder(PaymentError):
+    """A refund arrived before its charge; the gateway should deliver it again later."""
+
+
+def create_checkout(employer, job):
+    return FeaturedCheckout.objects.create(
+        employer=employer, job=job,
+        amount=settings.FEATURED_LISTING_PRICE, currency=settings.PAYMENTS_CURRENCY,
+    )
+
+
+def _parse(event):
+    try:
+        data = event['data']
+        return str(event['id']), event['type'], data['reference'], Decimal(data['amount']), data['currency']
+    except (KeyError, TypeError, InvalidOperation) as exc:
+        raise PaymentError(f"Malformed event: {exc}")
+
+
+def process_event(event):
+    """Apply one decoded webhook event. Returns RECORDED, DUPLICATE or IGNORED."""
+    event_id, event_type, reference, amount, currency = _parse(event)
+    if event_type not in EVENT_TYPES:
+        return IGNORED
+    kind, required_status, new_status = EVENT_TYPES[event_type]
+
+    # Gateway retries are the common duplicate; answer them without locking anything
+    if PaymentTransaction.objects.filter(gateway_event_id=event_id).exists():
+        return DUPLICATE
+
+    with transaction.atomic():
+        checkout = FeaturedCheckout.objects.select_for_update().filter(reference=reference).first()
+        if checkout is None:
+            raise PaymentError(f"Unknown checkout {reference}.")
+        if amount != checkout.amount or currency != checkout.currency:
+            raise PaymentError(f"Amount {amount} {currency} does not match checkout {reference}.")
+        if checkout.status != required_status:
+            if STATUS_ORDER.index(checkout.status) < STATUS_ORDER.index(required_status):
+                raise OutOfOrder(f"Checkout {reference} is still {checkout.status}.")
+            # Already applied under another event id
+            return DUPLICATE
+
+        try:
+            with transaction.atomic():
+                PaymentTransaction.objects.create(
+                    checkout=checkout, employer_id=checkout.employer_id, job_id=checkout.job_id,
+                    kind=kind, amount=amount, currency=currency, gateway_event_id=event_id,
+                )
+        except IntegrityError:
+            return DUPLICATE
+
+        checkout.status = new_status
+        update_fields = ['status']
+        if kind == PaymentTransaction.CHARGE:
+            checkout.paid_at = timezone.now()
+            update_fields.append('paid_at')
+        checkout.save(update_fields=update_fields)
+        if checkout.job_id:
+            Job.objects.filter(pk=checkout.job_id).update(is_featured=kind == PaymentTransaction.CHARGE)
+        # A queryset update sends no signals; refresh the featured/revenue figures ourselves
+        transaction.on_commit(lambda: bump_versions(checkout.employer_id, ADMIN_OWNER))
+    return RECORDED
@@ -0,0 +1,168 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import TruncDate
+from django.test import Client
+
+from accounts.models import User
+from jobs.models import Job
+from payments.gateway import LocalGateway
+from payments.models import FeaturedCheckout, PaymentTransaction, RevenueDay
+from payments.revenue import ledger_sums, revenue_summary, rollup_revenue
+
+EMAIL = 'bench-payments@example.invalid'
+WEBHOOK_PATH = '/api/v1/payments/webhook/'
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+class Command(BaseCommand):
+    help = ("Replay signed gateway webhooks, including duplicate deliveries, at a target rate and check that "
+            "every event was applied exactly once and the revenue snapshots add up. Runs in-process by "
+            "default, or against a running server with --url. The test data is removed afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5000, help="Webhook deliveries, duplicates included.")
+        parser.add_argument('--rate', type=float, default=1000, help="Target deliveries per second.")
+        parser.add_argument('--duplicates', type=float, default=0.3, help="Share of deliveries that repeat an event.")
+        parser.add_argument('--refunds', type=float, default=0.05, help="Share of payments refunded later.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Deliveries in flight at once.")
+        parser.add_argument('--url', help="Webhook URL of a running server, e.g. http://127.0.0.1:8000/api/v1/payments/webhook/. "
+                                          "The server must use the same database and PAYMENTS_WEBHOOK_SECRET.")
+
+    def handle(self, *args, **options):
+        if not settings.PAYMENTS_WEBHOOK_SECRET:
+            raise CommandError("Set PAYMENTS_WEBHOOK_SECRET first.")
+        if User.objects.filter(email=EMAIL).exists():
+            raise CommandError(f"{EMAIL} already exists; remove the leftovers of an interrupted run first.")
+
+        payments = max(1, round(options['events'] * (1 - options['duplicates']) / (1 + options['refunds'])))
+        employer, checkouts = self.setup(payments)
+        try:
+            deliveries, unique = self.build_deliveries(checkouts, options)
+            results = self.run(deliveries, options)
+            self.report(results, options)
+            self.verify(employer, checkouts, unique, results)
+        finally:
+            self.cleanup(employer)
+
+    def setup(self, payments):
+        employer = User.objects.create(email=EMAIL, role=User.Employer, password=make_password(None))
+        jobs = Job.objects.bulk_create(
+            [Job(employer=employer, title=f"Benchmark job {i}", company_name="Benchmark", description="Benchmark")
+             for i in range(payments)],
+            batch_size=1000,
+        )
+        checkouts = FeaturedCheckout.objects.bulk_create(
+            [FeaturedCheckout(employer=employer, job=job, amount=settings.FEATURED_LISTING_PRICE,
+                              currency=settings.PAYMENTS_CURRENCY) for job in jobs],
+            batch_size=1000,
+        )
+        return employer, checkouts
+
+    def build_deliveries(self, checkouts, options):
+        """Signed requests in delivery order; a duplicate lands shortly after its original, often concurrently."""
+        gateway = LocalGateway()
+        unique = [gateway.payment_succeeded(checkout) for checkout in checkouts]
+        refunded = random.sample(checkouts, int(len(checkouts) * options['refunds']))
+        unique += [gateway.payment_refunded(checkout) for checkout in refunded]
+
+        keyed = [(float(i), request) for i, request in enumerate(unique)]
+        for _ in range(max(0, options['events'] - len(unique))):
+            i = random.randrange(len(unique))
+            keyed.append((i + random.uniform(0, options['concurrency'] * 2), unique[i]))
+        keyed.sort(key=lambda item: item[0])
+        return [request for _, request in keyed], len(unique)
+
+    def run(self, deliveries, options):
+        local = threading.local()
+
+        def post(body, headers):
+            if options['url']:
+                return LocalGateway.deliver(options['url'], body, headers)[0]
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_HOST='127.0.0.1')
+            return local.client.post(WEBHOOK_PATH, data=body, content_type='application/json', headers=headers).status_code
+
+        def deliver(request):
+            started = time.perf_counter()
+            status = post(*request)
+            return status, json.loads(request[0])['id'], time.perf_counter() - started
+
+        results = []
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            start = time.perf_counter()
+            futures = []
+            for i, request in enumerate(deliveries):
+                delay = start + i / options['rate'] - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(deliver, request))
+            results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - start
+
+            # A refund that overtook its charge got 409; the gateway would deliver it again
+            retries = [request for request, (status, _, _) in zip(deliveries, results) if status == 409]
+            results += list(executor.map(deliver, retries))
+        return {'results': results, 'elapsed': elapsed, 'sent': len(deliveries), 'retried': len(retries)}
+
+    def report(self, run, options):
+        statuses = {}
+        for status, _, _ in run['results']:
+            statuses[status] = statuses.get(status, 0) + 1
+        latencies = sorted(latency for _, _, latency in run['results'])
+        achieved = run['sent'] / run['elapsed']
+        self.stdout.write(f"{run['sent']} deliveries in {run['elapsed']:.2f} s ({achieved:.0f}/s, target "
+                          f"{options['rate']:g}/s), {run['retried']} out-of-order retried")
+        self.stdout.write(f"Status codes: {dict(sorted(statuses.items()))}")
+        self.stdout.write(f"Latency  p50 {percentile(latencies, 0.5):.2f} ms  p95 {percentile(latencies, 0.95):.2f} ms  "
+                          f"p99 {percentile(latencies, 0.99):.2f} ms  max {latencies[-1] * 1000:.2f} ms")
+        if achieved < options['rate'] * 0.9:
+            self.stdout.write(self.style.WARNING("Target rate not reached; raise --concurrency or add workers."))
+
+    def verify(self, employer, checkouts, unique, run):
+        errors = [status for status, _, _ in run['results'] if status not in (200, 409)]
+        if errors:
+            raise CommandError(f"{len(errors)} deliveries failed (first status {errors[0]}).")
+
+        ledger = PaymentTransaction.objects.filter(employer=employer)
+        recorded = ledger.count()
+        refunds = ledger.filter(kind=PaymentTransaction.REFUND).count()
+        if recorded != unique:
+            raise CommandError(f"Ledger has {recorded} entries for {unique} distinct events.")
+
+        rollup_revenue()
+        price = Decimal(settings.FEATURED_LISTING_PRICE)
+        summary = revenue_summary(employer_id=employer.id)
+        expected = price * (len(checkouts) - refunds)
+        if summary['net'] != expected or summary['transactions'] != unique:
+            raise CommandError(f"Revenue snapshot {summary} does not match the ledger (net {expected}).")
+        featured = Job.objects.filter(employer=employer, is_featured=True).count()
+        if featured != len(checkouts) - refunds:
+            raise CommandError(f"{featured} jobs featured, expected {len(checkouts) - refunds}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{unique} distinct events recorded exactly once; snapshot net {summary['net']} matches the ledger."))
+
+    def cleanup(self, employer):
+        with transaction.atomic():
+            ledger = PaymentTransaction.objects.filter(employer=employer)
+            # Take the benchmark's share back out of the platform-wide daily snapshots
+            rolled = (ledger.filter(rolled_up=True).order_by().annotate(day=TruncDate('created_at'))
+                      .values('day').annotate(**ledger_sums()))
+            for row in rolled:
+                RevenueDay.objects.filter(day=row['day']).update(
+                    charges=F('charges') - row['charges'], refunds=F('refunds') - row['refunds'],
+                    transactions=F('transactions') - row['transactions'])
+            ledger.delete()
+            employer.delete()
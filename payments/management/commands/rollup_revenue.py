@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from payments.revenue import rollup_revenue
+
+
+class Command(BaseCommand):
+    help = "Fold payments recorded since the last run into per-employer and per-day revenue snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help="Ledger entries aggregated per transaction.")
+
+    def handle(self, *args, **options):
+        processed = rollup_revenue(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {processed} ledger entries."))
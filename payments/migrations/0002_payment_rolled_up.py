@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+def mark_rolled_up(apps, schema_editor):
+    """Entries up to the old id checkpoint are already in the snapshots."""
+    RollupCheckpoint = apps.get_model('dashboard', 'RollupCheckpoint')
+    PaymentTransaction = apps.get_model('payments', 'PaymentTransaction')
+    last_id = RollupCheckpoint.objects.filter(name='payments_revenue').values_list('last_id', flat=True).first()
+    if last_id:
+        PaymentTransaction.objects.filter(id__lte=last_id).update(rolled_up=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('payments', '0001_payments_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymenttransaction',
+            name='rolled_up',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_rolled_up, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paymenttransaction',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['employer'], name='payment_unrolled_idx'),
+        ),
+    ]
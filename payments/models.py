@@ -1,3 +1,101 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
+
+def new_reference():
+    return uuid.uuid4().hex
+
+
+class FeaturedCheckout(models.Model):
+    """An employer's request to feature a job, settled by the payment gateway's webhooks."""
+    PENDING = 'pending'
+    PAID = 'paid'
+    REFUNDED = 'refunded'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PAID, 'Paid'),
+        (REFUNDED, 'Refunded'),
+    ]
+
+    employer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='featured_checkouts')
+    job = models.ForeignKey('jobs.Job', on_delete=models.SET_NULL, null=True, related_name='featured_checkouts')
+    reference = models.CharField(max_length=64, unique=True, default=new_reference)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Checkout {self.reference} ({self.status})"
+
+
+class PaymentTransaction(models.Model):
+    """
+    Append-only ledger of settled gateway events. `gateway_event_id` is
+    unique, so a webhook delivered twice is recorded once. Amounts are
+    always positive; `kind` says whether money came in or went back.
+    Only `rolled_up` changes, when payments.revenue adds the entry to the
+    snapshots.
+    """
+    CHARGE = 'charge'
+    REFUND = 'refund'
+
+    KIND_CHOICES = [
+        (CHARGE, 'Charge'),
+        (REFUND, 'Refund'),
+    ]
+
+    checkout = models.ForeignKey(FeaturedCheckout, on_delete=models.PROTECT, related_name='transactions')
+    employer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='payment_transactions')
+    job = models.ForeignKey('jobs.Job', on_delete=models.SET_NULL, null=True, related_name='payment_transactions')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    gateway_event_id = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rolled_up = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # The entries not in the snapshots yet, read on every revenue summary
+            models.Index(fields=['employer'], condition=models.Q(rolled_up=False), name='payment_unrolled_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries are append-only; record a refund instead of editing.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries are append-only.")
+
+    def __str__(self):
+        return f"{self.kind} {self.amount} {self.currency} ({self.gateway_event_id})"
+
+
+class EmployerRevenue(models.Model):
+    """Per-employer totals of the rolled-up ledger entries."""
+    employer = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='revenue')
+    charges = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refunds = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transactions = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Revenue from employer {self.employer_id}"
+
+
+class RevenueDay(models.Model):
+    """Platform-wide totals of the rolled-up ledger entries per day."""
+    day = models.DateField(unique=True)
+    charges = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refunds = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transactions = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Revenue on {self.day}"
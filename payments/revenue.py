@@ -0,0 +1,112 @@
+"""
+Revenue snapshots over the payments ledger.
+
+`rollup_revenue` folds ledger entries that aren't rolled up yet into
+EmployerRevenue and RevenueDay and marks them, one batch per transaction.
+Totals read the snapshots plus the unmarked entries in a single UNION
+query, so they never SUM the whole ledger and can't double count an entry
+that is being rolled up concurrently.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import CharField, Count, DecimalField, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+from dashboard.models import RollupCheckpoint
+from dashboard.rollups import claim_unrolled
+from payments.models import EmployerRevenue, PaymentTransaction, RevenueDay
+
+CHECKPOINT = 'payments_revenue'
+ZERO = Decimal('0.00')
+TOTALS = ('charges', 'refunds', 'transactions')
+
+
+def ledger_sums():
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return {
+        'charges': Coalesce(Sum('amount', filter=Q(kind=PaymentTransaction.CHARGE)), Value(ZERO), output_field=money),
+        'refunds': Coalesce(Sum('amount', filter=Q(kind=PaymentTransaction.REFUND)), Value(ZERO), output_field=money),
+        'transactions': Count('pk'),
+    }
+
+
+def rollup_revenue(batch_size=10000):
+    """Fold ledger entries not rolled up yet into the snapshots. Returns entries processed."""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            # Serializes rollups, so two runs never create the same snapshot row
+            RollupCheckpoint.objects.select_for_update().get_or_create(name=CHECKPOINT)
+            batch = claim_unrolled(PaymentTransaction, batch_size)
+            by_employer = {
+                row['employer_id']: row
+                for row in batch.exclude(employer_id=None).values('employer_id').annotate(**ledger_sums())
+            }
+            by_day = {
+                row['day']: row
+                for row in batch.annotate(day=TruncDate('created_at')).values('day').annotate(**ledger_sums())
+            }
+            if not by_day:
+                return processed
+            processed += sum(row['transactions'] for row in by_day.values())
+
+            _apply(EmployerRevenue, 'employer_id', by_employer)
+            _apply(RevenueDay, 'day', by_day)
+
+
+def _apply(model, key, rows):
+    """Add grouped ledger sums onto existing snapshot rows, creating the missing ones."""
+    existing = {getattr(row, key): row for row in model.objects.select_for_update().filter(**{f'{key}__in': rows})}
+    created, updated = [], []
+    for value, sums in rows.items():
+        snapshot = existing.get(value)
+        if snapshot is None:
+            created.append(model(**{key: value}, **{field: sums[field] for field in TOTALS}))
+            continue
+        for field in TOTALS:
+            setattr(snapshot, field, getattr(snapshot, field) + sums[field])
+        updated.append(snapshot)
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, TOTALS, batch_size=1000)
+
+
+def revenue_summary(employer_id=None, since_day=None):
+    """
+    {'charges', 'refunds', 'net', 'transactions'} for one employer (all
+    time) or the whole platform (optionally from `since_day`).
+    """
+    if employer_id is not None and since_day is not None:
+        raise ValueError("Per-employer snapshots are all-time totals.")
+    tail = PaymentTransaction.objects.filter(rolled_up=False)
+    if employer_id is not None:
+        snapshots = EmployerRevenue.objects.filter(employer_id=employer_id)
+        tail = tail.filter(employer_id=employer_id)
+    else:
+        snapshots = RevenueDay.objects.all()
+        if since_day is not None:
+            snapshots = snapshots.filter(day__gte=since_day)
+            tail = tail.annotate(day=TruncDate('created_at')).filter(day__gte=since_day)
+
+    # One statement, so a rollup committing meanwhile is seen whole or not at all
+    source = lambda name: Value(name, output_field=CharField())
+    queries = [
+        snapshots.order_by().annotate(source=source('snapshot')).values('source').annotate(
+            total_charges=Sum('charges'), total_refunds=Sum('refunds'),
+            total_transactions=Sum('transactions', output_field=IntegerField()),
+        ).values_list('source', 'total_charges', 'total_refunds', 'total_transactions'),
+        tail.order_by().annotate(source=source('tail')).values('source').annotate(**ledger_sums())
+        .values_list('source', 'charges', 'refunds', 'transactions'),
+    ]
+    totals = defaultdict(lambda: ZERO)
+    for _, charges, refunds, transactions in queries[0].union(queries[1], all=True):
+        totals['charges'] += charges or ZERO
+        totals['refunds'] += refunds or ZERO
+        totals['transactions'] += transactions or 0
+    return {
+        'charges': totals['charges'],
+        'refunds': totals['refunds'],
+        'net': totals['charges'] - totals['refunds'],
+        'transactions': int(totals['transactions']),
+    }
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from jobs.models import Job
+from payments.models import FeaturedCheckout
+
+
+class FeaturedCheckoutSerializer(serializers.ModelSerializer):
+    job = serializers.PrimaryKeyRelatedField(queryset=Job.objects.all())
+
+    class Meta:
+        model = FeaturedCheckout
+        fields = ['id', 'job', 'reference', 'amount', 'currency', 'status', 'created_at', 'paid_at']
+        read_only_fields = ['id', 'reference', 'amount', 'currency', 'status', 'created_at', 'paid_at']
+
+    def validate_job(self, job):
+        if job.employer_id != self.context['request'].user.id:
+            raise serializers.ValidationError("You can only feature your own jobs.")
+        if job.is_featured:
+            raise serializers.ValidationError("This job is already featured.")
+        return job
@@ -1,3 +1,142 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.models import Job
+from payments.gateway import LocalGateway
+from payments.ledger import DUPLICATE, RECORDED, OutOfOrder, create_checkout, process_event
+from payments.models import FeaturedCheckout, PaymentTransaction
+from payments.revenue import ledger_sums, revenue_summary, rollup_revenue
 
 # Create your tests here.
+
+
+@override_settings(PAYMENTS_WEBHOOK_SECRET='test-secret')
+class PaymentsTestCase(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        self.gateway = LocalGateway()
+
+    def checkout(self, employer=None):
+        employer = employer or self.employer
+        job = Job.objects.create(employer=employer, title='Engineer', company_name='Acme', description='x')
+        return create_checkout(employer, job)
+
+    def deliver(self, body, headers):
+        return self.client.post('/api/v1/payments/webhook/', body, content_type='application/json', headers=headers)
+
+
+class WebhookTests(PaymentsTestCase):
+    def test_duplicate_delivery_is_recorded_once(self):
+        checkout = self.checkout()
+        delivery = self.gateway.payment_succeeded(checkout, event_id='evt_1')
+        self.assertEqual(self.deliver(*delivery).json(), {'status': RECORDED})
+        self.assertEqual(self.deliver(*delivery).json(), {'status': DUPLICATE})
+        # The same charge under another event id
+        self.assertEqual(self.deliver(*self.gateway.payment_succeeded(checkout)).json(), {'status': DUPLICATE})
+
+        self.assertEqual(PaymentTransaction.objects.count(), 1)
+        checkout.refresh_from_db()
+        self.assertEqual(checkout.status, FeaturedCheckout.PAID)
+        self.assertTrue(Job.objects.get(pk=checkout.job_id).is_featured)
+
+    def test_refund_before_its_charge_is_retried(self):
+        checkout = self.checkout()
+        refund = self.gateway.payment_refunded(checkout, event_id='evt_refund')
+        response = self.deliver(*refund)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(PaymentTransaction.objects.exists())
+
+        self.assertEqual(self.deliver(*self.gateway.payment_succeeded(checkout)).json(), {'status': RECORDED})
+        self.assertEqual(self.deliver(*refund).json(), {'status': RECORDED})
+        checkout.refresh_from_db()
+        self.assertEqual(checkout.status, FeaturedCheckout.REFUNDED)
+        self.assertFalse(Job.objects.get(pk=checkout.job_id).is_featured)
+        self.assertEqual(sorted(PaymentTransaction.objects.values_list('kind', flat=True)),
+                         [PaymentTransaction.CHARGE, PaymentTransaction.REFUND])
+
+    def test_process_event_rejects_an_early_refund(self):
+        checkout = self.checkout()
+        event = {'id': 'evt_refund', 'type': 'payment.refunded',
+                 'data': {'reference': checkout.reference, 'amount': str(checkout.amount), 'currency': checkout.currency}}
+        with self.assertRaises(OutOfOrder):
+            process_event(event)
+        self.assertEqual(process_event({**event, 'id': 'evt_charge', 'type': 'payment.succeeded'}), RECORDED)
+        self.assertEqual(process_event(event), RECORDED)
+        self.assertEqual(process_event(event), DUPLICATE)
+
+    def test_bad_signature_is_rejected(self):
+        body, headers = self.gateway.payment_succeeded(self.checkout())
+        response = self.deliver(body, {name: value + '0' for name, value in headers.items()})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentTransaction.objects.exists())
+
+
+class RevenueSummaryTests(PaymentsTestCase):
+    """Snapshots plus the entries not rolled up yet always equal the raw ledger."""
+
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(email='other@example.com', password='x', role=User.Employer)
+
+    def pay(self, employer=None, refund=False):
+        checkout = self.checkout(employer)
+        self.assertEqual(self.deliver(*self.gateway.payment_succeeded(checkout)).json(), {'status': RECORDED})
+        if refund:
+            self.assertEqual(self.deliver(*self.gateway.payment_refunded(checkout)).json(), {'status': RECORDED})
+        return checkout
+
+    def assertSummariesMatchLedger(self):
+        today = timezone.localdate()
+        ledgers = {
+            'platform': (PaymentTransaction.objects.all(), {}),
+            'since today': (PaymentTransaction.objects.filter(created_at__date__gte=today), {'since_day': today}),
+        }
+        for employer in (self.employer, self.other):
+            ledgers[employer.email] = (PaymentTransaction.objects.filter(employer=employer),
+                                       {'employer_id': employer.id})
+        for name, (ledger, options) in ledgers.items():
+            raw = ledger.aggregate(**ledger_sums())
+            raw['net'] = raw['charges'] - raw['refunds']
+            self.assertEqual(revenue_summary(**options), raw, name)
+
+    def test_snapshot_plus_tail_matches_the_ledger(self):
+        self.pay()
+        self.pay(refund=True)
+        self.pay(self.other)
+        self.assertSummariesMatchLedger()
+
+        self.assertEqual(rollup_revenue(batch_size=2), 4)
+        self.assertFalse(PaymentTransaction.objects.filter(rolled_up=False).exists())
+        self.assertSummariesMatchLedger()
+
+        self.pay(self.other, refund=True)
+        self.assertSummariesMatchLedger()
+        self.assertEqual(rollup_revenue(), 2)
+        self.assertEqual(rollup_revenue(), 0)
+        self.assertSummariesMatchLedger()
+
+    def test_entry_committed_after_a_rollup_with_a_lower_id(self):
+        # A webhook takes an id, then commits only after a later entry has been rolled up
+        late = self.pay().transactions.get()
+        PaymentTransaction.objects.filter(pk=late.pk).delete()
+        self.pay(self.other)
+        rollup_revenue()
+        PaymentTransaction.objects.create(**{field.attname: getattr(late, field.attname)
+                                             for field in PaymentTransaction._meta.concrete_fields})
+        self.assertLess(late.pk, PaymentTransaction.objects.latest('id').pk)
+
+        self.assertSummariesMatchLedger()
+        self.assertEqual(rollup_revenue(), 1)
+        self.assertSummariesMatchLedger()
+        self.assertEqual(revenue_summary(employer_id=self.employer.id)['transactions'], 1)
+
+    def test_since_day_leaves_out_older_entries(self):
+        self.pay()
+        PaymentTransaction.objects.update(created_at=timezone.now() - timedelta(days=3))
+        rollup_revenue()
+        self.pay()
+        self.assertEqual(revenue_summary(since_day=timezone.localdate())['transactions'], 1)
+        self.assertEqual(revenue_summary()['transactions'], 2)
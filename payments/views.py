@@ -1,3 +1,60 @@
-from django.shortcuts import render
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import mixins
+from rest_framework.viewsets import GenericViewSet
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+from payments.models import FeaturedCheckout
+from payments.serializers import FeaturedCheckoutSerializer
+from payments.gateway import InvalidSignature, SIGNATURE_HEADER, verify
+from payments.ledger import OutOfOrder, PaymentError, create_checkout, process_event
+from drf_yasg.utils import swagger_auto_schema
 
 # Create your views here.
+
+class FeaturedCheckoutViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+    """Employers pay to feature a job; the listing is featured once the gateway confirms payment."""
+    serializer_class = FeaturedCheckoutSerializer
+    permission_classes = [IsAuthenticated]
+    token_user_reads = True
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return FeaturedCheckout.objects.none()
+        return FeaturedCheckout.objects.filter(employer_id=self.request.user.id).order_by("-created_at")
+
+    @swagger_auto_schema(operation_summary="Start a featured-listing checkout",
+                         operation_description="Returns the checkout reference and price to pay at the gateway.")
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        if getattr(self.request.user, "role", None) != "employer":
+            raise PermissionDenied("Only employers can feature jobs.")
+        serializer.instance = create_checkout(self.request.user, serializer.validated_data["job"])
+
+
+@csrf_exempt
+@require_POST
+def payment_webhook(request):
+    """
+    Gateway webhook. Answers 2xx for recorded, duplicate and ignored events
+    so the gateway stops retrying; 409 asks it to retry an event that came
+    too early; other errors are rejected.
+    """
+    try:
+        verify(request.body, request.headers.get(SIGNATURE_HEADER))
+    except InvalidSignature as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+    try:
+        outcome = process_event(json.loads(request.body))
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "Body is not JSON."}, status=400)
+    except OutOfOrder as exc:
+        return JsonResponse({"detail": str(exc)}, status=409)
+    except PaymentError as exc:
+        return JsonResponse({"detail": str(exc)}, status=422)
+    return JsonResponse({"status": outcome})
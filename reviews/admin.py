@@ -4,4 +4,9 @@ from reviews.models import EmployerReview
 
 # Register your models here.
 
-admin.site.register(EmployerReview)
+@admin.register(EmployerReview)
+class EmployerReviewAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'employer', 'job_seeker', 'rating', 'created_at')
+    # __str__ touches both users, so load them with the page instead of per row
+    list_select_related = ('job', 'employer', 'job_seeker')
+    list_filter = ('rating',)
@@ -0,0 +1,15 @@
+from django_filters.rest_framework import FilterSet, NumberFilter
+from reviews.models import EmployerReview
+
+
+class EmployerReviewFilter(FilterSet):
+    min_rating = NumberFilter(field_name='rating', lookup_expr='gte')
+    max_rating = NumberFilter(field_name='rating', lookup_expr='lte')
+    # Filter on the column; the default ModelChoiceFilter looks the job up first
+    job = NumberFilter(field_name='job_id')
+
+    class Meta:
+        model = EmployerReview
+        fields = {
+            'rating': ['exact'],
+        }
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from reviews.models import EmployerReview, EmployerRatingSummary, JobRatingSummary
+
+SUMMARY_FIELDS = ['review_count', 'rating_total'] + [f'rating_{i}' for i in range(1, 6)]
+
+
+class Command(BaseCommand):
+    help = "Rebuild employer and job rating summaries from EmployerReview rows."
+
+    def handle(self, *args, **options):
+        aggregates = {
+            'review_count': Count('id'),
+            'rating_total': Sum('rating'),
+            **{f'rating_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)},
+        }
+
+        with transaction.atomic():
+            for model, field in ((EmployerRatingSummary, 'employer_id'), (JobRatingSummary, 'job_id')):
+                rows = EmployerReview.objects.order_by().values(field).annotate(**aggregates)
+                summaries = [model(pk=row.pop(field), **row) for row in rows]
+                before = {summary.pk: tuple(getattr(summary, f) for f in SUMMARY_FIELDS)
+                          for summary in model.objects.all()}
+                drifted = sum(1 for s in summaries if before.get(s.pk) != tuple(getattr(s, f) for f in SUMMARY_FIELDS))
+
+                model.objects.bulk_create(
+                    summaries,
+                    batch_size=1000,
+                    update_conflicts=True,
+                    unique_fields=[model._meta.pk.name],
+                    update_fields=SUMMARY_FIELDS,
+                )
+                stale = model.objects.exclude(pk__in=EmployerReview.objects.values(field)).delete()[0]
+                self.stdout.write(
+                    f"{model.__name__}: {len(summaries)} rebuilt, {drifted} had drifted, {stale} stale removed"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Rating summaries reconciled."))
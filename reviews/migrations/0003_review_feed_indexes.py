@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        ('reviews', '0002_rating_summaries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employerreview',
+            index=models.Index(fields=['employer', '-created_at', '-id'], name='review_employer_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employerreview',
+            index=models.Index(fields=['job', '-created_at', '-id'], name='review_job_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_job_created_at_idx'),
+        ('reviews', '0003_review_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employerreview',
+            index=models.Index(fields=['created_at'], name='review_created_at_idx'),
+        ),
+    ]
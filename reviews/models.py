@@ -19,7 +19,66 @@ class EmployerReview(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['employer', 'job_seeker', 'job'], name='unique_employer_review_per_job')
         ]
+        indexes = [
+            models.Index(fields=['employer', '-created_at', '-id'], name='review_employer_feed_idx'),
+            models.Index(fields=['job', '-created_at', '-id'], name='review_job_feed_idx'),
+            models.Index(fields=['created_at'], name='review_created_at_idx'),
+        ]
         ordering = ['-created_at']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember where the stored rating is counted so the summaries can move it on update
+        if all(name in instance.__dict__ for name in ('employer_id', 'job_id', 'rating')):
+            instance._loaded_summary_key = instance.summary_key()
+        return instance
+
+    def summary_key(self):
+        """(employer_id, job_id, rating): the summaries and bucket this review is counted in."""
+        return self.employer_id, self.job_id, self.rating
+
     def __str__(self):
         return f"Review {self.rating} for {self.employer.first_name} by {self.job_seeker.first_name}"
+
+
+class RatingSummary(models.Model):
+    """
+    Incrementally maintained rating aggregate (see reviews.signals).
+    `reconcile_ratings` rebuilds these from EmployerReview if they drift.
+    """
+    review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_total / self.review_count, 2)
+
+    @property
+    def histogram(self):
+        return {str(i): getattr(self, f'rating_{i}') for i in range(1, 6)}
+
+
+class EmployerRatingSummary(RatingSummary):
+    employer = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+
+    def __str__(self):
+        return f"Employer {self.employer_id}: {self.average} ({self.review_count} reviews)"
+
+
+class JobRatingSummary(RatingSummary):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+
+    def __str__(self):
+        return f"Job {self.job_id}: {self.average} ({self.review_count} reviews)"
@@ -0,0 +1,6 @@
+from rest_framework.pagination import CursorPagination
+
+class ReviewCursorPagination(CursorPagination):
+    # Keyset pagination: each page is an index range scan on created_at, no OFFSET
+    page_size = 20
+    ordering = ('-created_at', '-id')
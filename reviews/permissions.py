@@ -17,6 +17,6 @@ class CanReviewAcceptedJob(BasePermission):
         # Must have an accepted application for that job
         return Application.objects.filter(
             job_id=job_id,
-            applicant=user,
+            applicant_id=user.id,
             status='accepted'
         ).exists()
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models import F
+from reviews.models import EmployerRatingSummary, JobRatingSummary
+
+
+def _apply(model, pk, rating, delta):
+    changes = {
+        'review_count': F('review_count') + delta,
+        'rating_total': F('rating_total') + delta * rating,
+        f'rating_{rating}': F(f'rating_{rating}') + delta,
+    }
+    updated = model.objects.filter(pk=pk).update(**changes)
+    # Only create on add: during cascade deletes the summary row may already be gone
+    if not updated and delta > 0:
+        model.objects.bulk_create([model(pk=pk)], ignore_conflicts=True)
+        model.objects.filter(pk=pk).update(**changes)
+
+
+def record_rating(employer_id, job_id, rating, delta):
+    """Add (delta=1) or remove (delta=-1) one rating from the employer and job summaries."""
+    with transaction.atomic():
+        _apply(EmployerRatingSummary, employer_id, rating, delta)
+        _apply(JobRatingSummary, job_id, rating, delta)
@@ -1,3 +1,4 @@
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import serializers
 from reviews.models import EmployerReview
 
@@ -11,4 +12,30 @@ class EmployerReviewSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'job', 'job_seeker', 'employer',
             'created_at', 'updated_at'
-        ]
\ No newline at end of file
+        ]
+
+
+class EmployerReviewFeedSerializer(EmployerReviewSerializer):
+    reviewer_name = serializers.CharField(source='job_seeker.get_full_name', read_only=True)
+    job_title = serializers.CharField(source='job.title', read_only=True)
+
+    class Meta(EmployerReviewSerializer.Meta):
+        fields = EmployerReviewSerializer.Meta.fields + ['reviewer_name', 'job_title']
+        read_only_fields = fields
+
+
+class RatingSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField(source='review_count')
+    average = serializers.FloatField(allow_null=True)
+    histogram = serializers.DictField(child=serializers.IntegerField())
+
+    EMPTY = {'count': 0, 'average': None, 'histogram': {str(i): 0 for i in range(1, 6)}}
+
+    @classmethod
+    def for_instance(cls, instance):
+        """Serialize `instance.rating_summary`, which must be loaded with select_related."""
+        try:
+            summary = instance.rating_summary
+        except ObjectDoesNotExist:
+            return dict(cls.EMPTY, histogram=dict(cls.EMPTY['histogram']))
+        return cls(summary).data
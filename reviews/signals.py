@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from reviews.models import EmployerReview
+from reviews.ratings import record_rating
+
+
+@receiver(post_save, sender=EmployerReview)
+def update_rating_summaries(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_summary_key', None)
+    current = instance.summary_key()
+    if created:
+        record_rating(*current, 1)
+    elif previous is not None and previous != current:
+        # A new rating, or the review moved to another job or employer
+        record_rating(*previous, -1)
+        record_rating(*current, 1)
+    instance._loaded_summary_key = current
+
+
+@receiver(post_delete, sender=EmployerReview)
+def remove_rating_from_summaries(sender, instance, **kwargs):
+    # Where it was counted, even if the instance was changed in memory since
+    record_rating(*(getattr(instance, '_loaded_summary_key', None) or instance.summary_key()), -1)
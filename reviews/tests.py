@@ -1,3 +1,135 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Avg, Count, Q
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from jobs.models import Job
+from reviews.models import EmployerRatingSummary, EmployerReview, JobRatingSummary
 
 # Create your tests here.
+
+
+class ReviewQueryBudgetTests(TestCase):
+    """Listing reviews costs the same number of queries however many reviews are on the page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create_user(email='employer@example.com', password='x', role=User.Employer)
+        cls.jobs = [
+            Job.objects.create(employer=cls.employer, title=f'Job {i}', company_name='Acme', description='x')
+            for i in range(2)
+        ]
+        for i in range(30):
+            seeker = User.objects.create_user(email=f'seeker{i}@example.com', password='x', role=User.Job_Seeker,
+                                              first_name=f'Seeker{i}')
+            EmployerReview.objects.create(job=cls.jobs[i % 2], employer=cls.employer, job_seeker=seeker,
+                                          rating=i % 5 + 1, comment='Good')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_employer_feed(self):
+        url = f'/api/v1/employers/{self.employer.id}/reviews/'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertTrue(all(review['reviewer_name'] and review['job_title'] for review in response.data['results']))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_employer_feed_filtered(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/employers/{self.employer.id}/reviews/',
+                                       {'min_rating': 4, 'job': self.jobs[0].id})
+        self.assertTrue(all(review['rating'] >= 4 and review['job'] == self.jobs[0].id
+                            for review in response.data['results']))
+
+    def test_job_reviews(self):
+        self.client.force_authenticate(self.employer)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/jobs/{self.jobs[0].id}/reviews/')
+        self.assertEqual(len(response.data['results']), 15)
+
+
+class RatingSummaryTests(TestCase):
+    """The incrementally maintained summaries match a fresh aggregate after every change."""
+
+    def setUp(self):
+        self.employers = [User.objects.create_user(email=f'employer{i}@example.com', password='x', role=User.Employer)
+                          for i in range(2)]
+        self.jobs = [Job.objects.create(employer=employer, title='Engineer', company_name='Acme', description='x')
+                     for employer in self.employers]
+        self.seekers = [User.objects.create_user(email=f'seeker{i}@example.com', password='x', role=User.Job_Seeker)
+                        for i in range(3)]
+
+    def review(self, seeker, rating, job=None):
+        job = job or self.jobs[0]
+        return EmployerReview.objects.create(job=job, employer_id=job.employer_id, job_seeker=seeker, rating=rating)
+
+    def assertSummariesMatch(self):
+        aggregates = {'count': Count('id'), 'average': Avg('rating'),
+                      **{f'rating_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)}}
+        for model, field in ((EmployerRatingSummary, 'employer_id'), (JobRatingSummary, 'job_id')):
+            expected = {row.pop(field): row for row in
+                        EmployerReview.objects.order_by().values(field).annotate(**aggregates)}
+            for summary in model.objects.all():
+                row = expected.pop(summary.pk, {'count': 0, 'average': None,
+                                                **{f'rating_{i}': 0 for i in range(1, 6)}})
+                self.assertEqual(summary.review_count, row['count'], (model.__name__, summary.pk))
+                self.assertEqual(summary.average,
+                                 None if row['average'] is None else round(row['average'], 2))
+                self.assertEqual([getattr(summary, f'rating_{i}') for i in range(1, 6)],
+                                 [row[f'rating_{i}'] for i in range(1, 6)])
+            self.assertEqual(expected, {}, f"{model.__name__} rows missing")
+
+    def test_create(self):
+        self.review(self.seekers[0], 5)
+        self.review(self.seekers[1], 2)
+        self.review(self.seekers[2], 4, job=self.jobs[1])
+        self.assertSummariesMatch()
+
+    def test_rating_edit(self):
+        review = self.review(self.seekers[0], 5)
+        self.review(self.seekers[1], 3)
+        review = EmployerReview.objects.get(pk=review.pk)
+        review.rating = 1
+        review.save()
+        review.comment = 'Edited'  # a save that doesn't change the rating
+        review.save()
+        self.assertSummariesMatch()
+        self.assertEqual(JobRatingSummary.objects.get(pk=self.jobs[0].pk).rating_1, 1)
+
+    def test_delete(self):
+        review = self.review(self.seekers[0], 5)
+        self.review(self.seekers[1], 3)
+        EmployerReview.objects.get(pk=review.pk).delete()
+        self.assertSummariesMatch()
+
+    def test_moved_to_another_job(self):
+        review = EmployerReview.objects.get(pk=self.review(self.seekers[0], 4).pk)
+        review.job = self.jobs[1]
+        review.employer = self.employers[1]
+        review.rating = 2
+        review.save()
+        self.assertSummariesMatch()
+        self.assertEqual(JobRatingSummary.objects.get(pk=self.jobs[1].pk).rating_2, 1)
+
+    def test_reconcile_repairs_corrupted_summary(self):
+        self.review(self.seekers[0], 5)
+        self.review(self.seekers[1], 3, job=self.jobs[1])
+        EmployerRatingSummary.objects.filter(pk=self.employers[0].pk).update(review_count=7, rating_total=1, rating_5=0)
+        JobRatingSummary.objects.filter(pk=self.jobs[1].pk).delete()
+        reviewless = Job.objects.create(employer=self.employers[0], title='Designer', company_name='Acme',
+                                        description='x')
+        JobRatingSummary.objects.create(job=reviewless, review_count=1, rating_total=4, rating_4=1)
+
+        output = StringIO()
+        call_command('reconcile_ratings', stdout=output)
+        self.assertSummariesMatch()
+        self.assertIn('EmployerRatingSummary: 2 rebuilt, 1 had drifted', output.getvalue())
+        self.assertIn('JobRatingSummary: 2 rebuilt, 1 had drifted, 1 stale removed', output.getvalue())
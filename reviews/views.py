@@ -1,9 +1,12 @@
-from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.exceptions import PermissionDenied
+from django_filters.rest_framework import DjangoFilterBackend
 from reviews.models import EmployerReview
-from reviews.serializers import EmployerReviewSerializer
+from reviews.serializers import EmployerReviewSerializer, EmployerReviewFeedSerializer
 from reviews.permissions import CanReviewAcceptedJob
+from reviews.paginations import ReviewCursorPagination
+from reviews.filters import EmployerReviewFilter
 from jobs.models import Job
 from drf_yasg.utils import swagger_auto_schema
 
@@ -13,6 +16,8 @@ class EmployerReviewViewSet(ModelViewSet):
     """
     serializer_class = EmployerReviewSerializer
     permission_classes = [IsAuthenticated, CanReviewAcceptedJob]
+    pagination_class = ReviewCursorPagination
+    token_user_reads = True
 
     def get_queryset(self):
         # Avoid running when drf_yasg generates schema
@@ -51,3 +56,30 @@ class EmployerReviewViewSet(ModelViewSet):
         if not getattr(self, "swagger_fake_view", False):
             context["job_id"] = self.kwargs.get("job_pk")
         return context
+
+
+class EmployerReviewFeedViewSet(ReadOnlyModelViewSet):
+    """
+    All reviews across an employer's jobs, newest first. Expects `employer_pk` from nested route.
+    Cursor paginated; filter with ?rating=5, ?min_rating=4, ?max_rating=2 or ?job=<id>.
+    """
+    serializer_class = EmployerReviewFeedSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ReviewCursorPagination
+    token_user_reads = True
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EmployerReviewFilter
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return EmployerReview.objects.none()
+
+        return (
+            EmployerReview.objects
+            .filter(employer_id=self.kwargs.get("employer_pk"))
+            .select_related("job_seeker", "job")
+        )
+
+    @swagger_auto_schema(operation_summary="List all reviews for an employer")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
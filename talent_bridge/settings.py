@@ -10,10 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 from datetime import timedelta
-import cloudinary
+from decimal import Decimal
+from importlib.util import find_spec
+import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,7 +38,8 @@ AUTH_USER_MODEL = 'accounts.User'
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are discovered on first use (talent_bridge.urls)
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -59,9 +62,13 @@ INSTALLED_APPS = [
     'notifications',
     'payments',
     'reviews',
+    'tasks',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,6 +108,42 @@ CORS_ALLOWED_ORIGINS = [
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse (api.pooling). Opening a PostgreSQL connection (TCP, TLS, auth) is
+# often most of a fast request, so connections outlive requests and warm serverless
+# invocations. DB_POOL uses Django's psycopg 3 pool (needs `psycopg[binary,pool]`) of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections per process; otherwise each worker keeps
+# one connection for DB_CONN_MAX_AGE seconds. Either way a connection is checked before
+# reuse. Behind a transaction-mode pooler (PgBouncer, Supabase/Neon poolers) set
+# DB_TRANSACTION_POOLER: no server-side cursors or prepared statements.
+
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=1, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=4, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_TRANSACTION_POOLER = config('DB_TRANSACTION_POOLER', default=False, cast=bool)
+
+DATABASE_OPTIONS = {}
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASE_OPTIONS['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+        'check': ConnectionPool.check_connection,
+    }
+if DB_TRANSACTION_POOLER and find_spec('psycopg'):
+    # psycopg 3 prepares statements server-side after 5 runs; another client may get the connection
+    DATABASE_OPTIONS['prepare_threshold'] = None
+
+DATABASE_CONNECTION = {
+    # Django's pool requires CONN_MAX_AGE = 0 and checks connections itself
+    'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+    'CONN_HEALTH_CHECKS': not DB_POOL,
+    'DISABLE_SERVER_SIDE_CURSORS': DB_TRANSACTION_POOLER,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -108,10 +151,90 @@ DATABASES = {
         'USER': config('user'),
         'PASSWORD': config('password'),
         'HOST': config('host'),
-        'PORT': config('port')
+        'PORT': config('port'),
+        'OPTIONS': dict(DATABASE_OPTIONS),
+        **DATABASE_CONNECTION,
+    }
+}
+
+# Read replicas (api.replicas). DATABASE_REPLICA_URLS is a comma-separated list of
+# database URLs that safe-method requests read from; DATABASE_ANALYTICS_URL is an
+# optional replica that views with `read_replica = 'analytics'` (the dashboards) use.
+# After a write, the user reads from the primary for REPLICA_STICKY_SECONDS.
+
+DATABASE_REPLICAS = []
+for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv()), start=1):
+    DATABASES[f'replica_{index}'] = {**dj_database_url.parse(url), 'OPTIONS': dict(DATABASE_OPTIONS),
+                                     **DATABASE_CONNECTION, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{index}')
+if config('DATABASE_ANALYTICS_URL', default=''):
+    DATABASES['analytics'] = {**dj_database_url.parse(config('DATABASE_ANALYTICS_URL')), 'OPTIONS': dict(DATABASE_OPTIONS),
+                              **DATABASE_CONNECTION, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache) in production.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='talent-bridge'),
     }
 }
 
+# Dashboard responses are fresh for DASHBOARD_CACHE_TTL seconds, then served stale
+# (while one request rebuilds them) for up to DASHBOARD_CACHE_STALE_TTL seconds.
+
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=30, cast=int)
+DASHBOARD_CACHE_STALE_TTL = config('DASHBOARD_CACHE_STALE_TTL', default=300, cast=int)
+
+# Completed time-series buckets are invalidated by signals when history changes; the
+# TTL bounds staleness after bulk changes that send no signals.
+
+TIMESERIES_CACHE_TTL = config('TIMESERIES_CACHE_TTL', default=6 * 60 * 60, cast=int)
+
+
+# Request performance metrics (api.middleware). A PERF_SAMPLE_RATE fraction of requests
+# records query count/time and serializer time, returns them in a Server-Timing header
+# and logs them as JSON. Queries slower than PERF_SLOW_QUERY_MS are logged on every
+# request (0 disables either).
+
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=0.01, cast=float)
+PERF_SLOW_QUERY_MS = config('PERF_SLOW_QUERY_MS', default=200, cast=float)
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=True, cast=bool)
+
+# Request profiling (api.profiling). Admins get a profile of a request by sending
+# `X-Profile: 1` (or `cprofile` / `sample`); PROFILING_SAMPLE_RATE profiles a random
+# share of all requests. List and aggregate them with `manage.py profiles`.
+
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_ALLOW_HEADER = config('PROFILING_ALLOW_HEADER', default=True, cast=bool)
+PROFILING_MODE = config('PROFILING_MODE', default='cprofile')
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=5, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'api.middleware': {
+            'handlers': ['console'],
+            'level': config('PERF_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,7 +259,7 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.VersionedJWTAuthentication',
     ),
     # 'DEFAULT_FILTER_BACKENDS': (
     #     'django_filters.rest_framework.DjangoFilterBackend',
@@ -172,13 +295,14 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Cloudinary configuration
+# Applied when the SDK is first used (accounts.fields), not at startup.
 
-cloudinary.config( 
-    cloud_name = config('cloud_name'), 
-    api_key = config('api_key'), 
-    api_secret = config('api_secret'),
-    secure=True
-)
+CLOUDINARY = {
+    'cloud_name': config('cloud_name'),
+    'api_key': config('api_key'),
+    'api_secret': config('api_secret'),
+    'secure': True,
+}
 
 # Media storage for cloudinary
 
@@ -206,8 +330,16 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('JWT',),
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
+    # Tokens carry role and token version claims; see accounts.tokens
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.tokens.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.tokens.TokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'accounts.tokens.ClaimsUser',
 }
 
+# Seconds a user's token version stays cached. With a per-process cache
+# (the LocMemCache default) a revocation reaches other workers within this window.
+AUTH_VERSION_CACHE_TTL = config('AUTH_VERSION_CACHE_TTL', default=300, cast=int)
+
 
 # Djoser Configuration
 
@@ -222,12 +354,23 @@ DJOSER = {
         'user_create': 'accounts.serializers.UserCreateSerializer',
         'current_user': 'accounts.serializers.UserSerializer'
     },
+    # Emails are rendered in the request and delivered by `manage.py run_worker`
+    'EMAIL': {
+        'activation': 'accounts.email.ActivationEmail',
+        'confirmation': 'accounts.email.ConfirmationEmail',
+        'password_reset': 'accounts.email.PasswordResetEmail',
+        'password_changed_confirmation': 'accounts.email.PasswordChangedConfirmationEmail',
+        'username_changed_confirmation': 'accounts.email.UsernameChangedConfirmationEmail',
+        'username_reset': 'accounts.email.UsernameResetEmail',
+    },
 }
 
 
 # Swagger Configuration
 
 SWAGGER_SETTINGS = {
+    # The UIs load the prebuilt schema (api.schema) instead of generating it per request
+    'SPEC_URL': 'openapi-schema',
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'apiKey',
@@ -238,6 +381,19 @@ SWAGGER_SETTINGS = {
     }
 }
 
+REDOC_SETTINGS = {
+    'SPEC_URL': 'openapi-schema',
+}
+
+# OpenAPI schema artifact written by `manage.py build_openapi_schema` and served at
+# /swagger.json with an ETag. OPENAPI_SCHEMA_RUNTIME generates it in-process (once per
+# process) when the file is missing or older than the code; otherwise a missing
+# artifact is a 503.
+
+OPENAPI_SCHEMA_FILE = config('OPENAPI_SCHEMA_FILE', default=str(BASE_DIR / 'openapi.json'))
+OPENAPI_SCHEMA_RUNTIME = config('OPENAPI_SCHEMA_RUNTIME', default=False, cast=bool)
+OPENAPI_SCHEMA_MAX_AGE = config('OPENAPI_SCHEMA_MAX_AGE', default=86400, cast=int)
+
 
 EMAIL_BACKEND = config('EMAIL_BACKEND')
 EMAIL_HOST = config('EMAIL_HOST')
@@ -246,5 +402,35 @@ EMAIL_PORT = config('EMAIL_PORT')
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Outbound mail is queued and sent by `manage.py send_emails` over one SMTP
+# connection, at most EMAIL_RATE_LIMIT messages per second (0 = unlimited).
+EMAIL_RATE_LIMIT = config('EMAIL_RATE_LIMIT', default=10, cast=int)
+EMAIL_CHUNK_SIZE = config('EMAIL_CHUNK_SIZE', default=20, cast=int)
+
+
+# Background tasks
+# Set TASKS_EAGER=True to run tasks inline (no worker needed) in local development.
+
+TASKS_EAGER = config('TASKS_EAGER', default=False, cast=bool)
+
+
+# Live event stream (/api/v1/events/stream/)
+# The in-process broker only reaches clients connected to the same worker; use
+# notifications.pubsub.PostgresBroker when running several ASGI workers.
+
+PUBSUB_BACKEND = config('PUBSUB_BACKEND', default='notifications.pubsub.InProcessBroker')
+SSE_HEARTBEAT_SECONDS = config('SSE_HEARTBEAT_SECONDS', default=15, cast=int)
+# Browsers open the stream with a single-use ticket from POST /api/v1/events/ticket/
+SSE_TICKET_SECONDS = config('SSE_TICKET_SECONDS', default=60, cast=int)
+
+
+# Featured listings. The gateway signs webhooks (/api/v1/payments/webhook/) with
+# PAYMENTS_WEBHOOK_SECRET; requests older than PAYMENTS_WEBHOOK_TOLERANCE seconds are rejected.
+
+FEATURED_LISTING_PRICE = config('FEATURED_LISTING_PRICE', default='49.00', cast=Decimal)
+PAYMENTS_CURRENCY = config('PAYMENTS_CURRENCY', default='USD')
+PAYMENTS_WEBHOOK_SECRET = config('PAYMENTS_WEBHOOK_SECRET', default='')
+PAYMENTS_WEBHOOK_TOLERANCE = config('PAYMENTS_WEBHOOK_TOLERANCE', default=300, cast=int)
+
 # BACKEND_URL = config("BACKEND_URL")
 # FRONTEND_URL = config("FRONTEND_URL")
\ No newline at end of file
@@ -11,24 +11,22 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
+from django.utils.functional import cached_property
 from django.shortcuts import redirect
 
-# --- Swagger schema configuration ---
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Talent Bridge API",
-        default_version='v1',
-        description="Comprehensive API documentation for the Talent Bridge project.",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="support@talentbridge.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from api.schema import openapi_schema, schema_ui
+
+
+# --- Admin ---
+# The admin app is installed with SimpleAdminConfig (no autodiscovery at startup);
+# the admin modules are imported the first time an admin URL is resolved, or any URL
+# is reversed (reverse() populates the resolver, which reads every include). Their
+# system checks run in api.tests.AdminChecksTests.
+class AdminURLs:
+    @cached_property
+    def urlpatterns(self):
+        admin.autodiscover()
+        return admin.site.get_urls()
 
 
 # --- API root redirect (to DRF's root view) ---
@@ -37,13 +35,14 @@ def api_root_view(request):
 
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    path('admin/', (AdminURLs(), 'admin', admin.site.name)),
     path('', api_root_view, name='home'),
     path('api/v1/', include('api.urls'), name='api-root'),
 
-    # Swagger documentation
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='redoc-ui'),
+    # Swagger documentation (schema prebuilt by `manage.py build_openapi_schema`)
+    path('swagger.json', openapi_schema, name='openapi-schema'),
+    path('swagger/', schema_ui('swagger'), name='swagger-ui'),
+    path('redoc/', schema_ui('redoc'), name='redoc-ui'),
 ]
 
 if settings.DEBUG:
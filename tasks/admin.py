@@ -0,0 +1,10 @@
+from django.contrib import admin
+from tasks.models import Task
+
+# Register your models here.
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'finished_at', 'locked_at')
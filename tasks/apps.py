@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tasks'
+
+    def ready(self):
+        # Register task handlers declared in each app's tasks.py
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
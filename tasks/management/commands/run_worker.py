@@ -0,0 +1,83 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim_rows, get_handler, retry_delay
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (emails and other deferred side effects)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Tasks claimed per poll.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Worker threads.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--lock-timeout', type=int, default=600,
+                            help="Seconds after which a running task is considered abandoned.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            while True:
+                tasks = self.claim_batch(options['batch_size'], options['lock_timeout'])
+                if not tasks:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                # Group by handler so batched handlers get a single call per poll
+                groups = defaultdict(list)
+                for task in tasks:
+                    groups[task.name].append(task)
+
+                futures = []
+                for name, group in groups.items():
+                    try:
+                        handler = get_handler(name)
+                    except LookupError as exc:
+                        self.finish_failed(group, exc)
+                        continue
+                    if handler.batch:
+                        futures.append(executor.submit(self.run_group, handler, group))
+                    else:
+                        futures.extend(executor.submit(self.run_group, handler, [task]) for task in group)
+
+                for future in futures:
+                    future.result()
+
+    def claim_batch(self, batch_size, lock_timeout):
+        return claim_rows(Task.objects.all(), Q(status=Task.QUEUED, run_at__lte=timezone.now()), Task.RUNNING,
+                          ('run_at', 'id'), batch_size, lock_timeout)
+
+    def run_group(self, handler, group):
+        try:
+            handler.run([task.payload for task in group])
+        except Exception as exc:
+            self.finish_failed(group, exc)
+        else:
+            Task.objects.filter(id__in=[task.id for task in group]).update(
+                status=Task.SUCCEEDED, finished_at=timezone.now(), locked_at=None, last_error=''
+            )
+        finally:
+            close_old_connections()
+
+    def finish_failed(self, group, exc):
+        now = timezone.now()
+        for task in group:
+            task.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+            task.locked_at = None
+            if task.attempts >= task.max_attempts:
+                task.status = Task.FAILED
+                task.finished_at = now
+            else:
+                task.status = Task.QUEUED
+                task.run_at = now + retry_delay(task.attempts)
+        Task.objects.bulk_update(group, ['status', 'last_error', 'locked_at', 'finished_at', 'run_at'])
+        self.stderr.write(f"{group[0].name}: {len(group)} task(s) failed: {exc}")
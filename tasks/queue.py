@@ -0,0 +1,109 @@
+"""
+Lightweight DB-backed task queue.
+
+Handlers are registered with the `task` decorator in an app's `tasks.py`:
+
+    @task('accounts.assign_user_group', batch=True)
+    def assign_user_group(payloads):
+        ...
+
+and scheduled with `enqueue('accounts.assign_user_group', user_id=..., role=...)`. The row is
+written in the caller's transaction, so a task never runs for data that was
+rolled back. `python manage.py run_worker` executes queued tasks.
+
+`claim_rows` is the claim step shared by every polling worker (tasks, resume
+indexing, outbound email).
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tasks.models import Task
+
+_registry = {}
+
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60 * 60
+
+
+class TaskHandler:
+    def __init__(self, name, func, batch=False, max_attempts=5):
+        self.name = name
+        self.func = func
+        self.batch = batch
+        self.max_attempts = max_attempts
+
+    def run(self, payloads):
+        """Run the handler for a list of payloads (one call per payload unless batched)."""
+        if self.batch:
+            self.func(payloads)
+        else:
+            for payload in payloads:
+                self.func(**payload)
+
+
+def task(name, batch=False, max_attempts=5):
+    """
+    Register a task handler. Batched handlers receive a list of payload dicts,
+    other handlers receive the payload as keyword arguments.
+    """
+    def decorator(func):
+        _registry[name] = TaskHandler(name, func, batch=batch, max_attempts=max_attempts)
+        return func
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"No task handler registered for '{name}'.")
+
+
+def enqueue(name, delay=None, **payload):
+    """Queue a task. With TASKS_EAGER enabled it runs immediately instead."""
+    handler = get_handler(name)
+    if getattr(settings, 'TASKS_EAGER', False):
+        handler.run([payload])
+        return None
+
+    run_at = timezone.now() + delay if delay else timezone.now()
+    return Task.objects.create(name=name, payload=payload, run_at=run_at, max_attempts=handler.max_attempts)
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, capped at RETRY_MAX_SECONDS."""
+    seconds = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def claim_rows(queryset, ready, claimed_status, order_by, batch_size, lock_timeout):
+    """
+    Claim up to `batch_size` rows for this worker: rows matching `ready`, and
+    rows a crashed worker left in `claimed_status` for over `lock_timeout`
+    seconds. SELECT ... FOR UPDATE SKIP LOCKED lets concurrent workers claim
+    disjoint batches. The rows are marked `claimed_status` with `locked_at`
+    set and `attempts` incremented, then returned from `queryset` (so it can
+    select_related what the worker needs) in `order_by` order.
+    """
+    model = queryset.model
+    now = timezone.now()
+    stale = now - timedelta(seconds=lock_timeout)
+    with transaction.atomic():
+        ids = list(
+            model._default_manager
+            .select_for_update(skip_locked=True)
+            .filter(ready | Q(status=claimed_status, locked_at__lt=stale))
+            .order_by(*order_by)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        model._default_manager.filter(id__in=ids).update(
+            status=claimed_status, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(queryset.filter(id__in=ids).order_by(*order_by))
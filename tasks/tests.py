@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import claim_rows
+
+
+class ClaimRowsTests(TestCase):
+    def claim(self, batch_size=10):
+        return claim_rows(Task.objects.all(), Q(status=Task.QUEUED, run_at__lte=timezone.now()), Task.RUNNING,
+                          ('run_at', 'id'), batch_size, lock_timeout=600)
+
+    def test_claims_due_rows_in_order(self):
+        now = timezone.now()
+        later = Task.objects.create(name='t', run_at=now - timedelta(seconds=1))
+        first = Task.objects.create(name='t', run_at=now - timedelta(seconds=2))
+        Task.objects.create(name='t', run_at=now + timedelta(hours=1))
+
+        claimed = self.claim()
+        self.assertEqual([task.id for task in claimed], [first.id, later.id])
+        self.assertTrue(all(task.status == Task.RUNNING and task.attempts == 1 and task.locked_at for task in claimed))
+        self.assertEqual(self.claim(), [])
+
+    def test_batch_size(self):
+        for _ in range(3):
+            Task.objects.create(name='t')
+        self.assertEqual(len(self.claim(batch_size=2)), 2)
+        self.assertEqual(len(self.claim(batch_size=2)), 1)
+
+    def test_reclaims_abandoned_rows(self):
+        task = Task.objects.create(name='t', status=Task.RUNNING, attempts=1,
+                                   locked_at=timezone.now() - timedelta(seconds=601))
+        Task.objects.create(name='t', status=Task.RUNNING, attempts=1, locked_at=timezone.now())
+
+        claimed = self.claim()
+        self.assertEqual([(t.id, t.attempts) for t in claimed], [(task.id, 2)])